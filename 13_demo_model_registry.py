@@ -0,0 +1,60 @@
+import os
+import time
+from core.model_registry import model_registry
+from core.vector_store import VectorStoreManager
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (Linux /proc, falls back to peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def simulate_sessions(num_sessions: int, shared: bool) -> None:
+    """
+    Build one VectorStoreManager per simulated browser session and report
+    startup time and RSS growth.
+
+    With ``shared=False`` the registry is cleared before every session,
+    which reproduces the old behaviour of loading one model per session.
+    """
+    label = "shared registry" if shared else "per-session load"
+    model_registry.clear()
+
+    sessions = []
+    rss_start = current_rss_mb()
+
+    for index in range(1, num_sessions + 1):
+        if not shared:
+            model_registry.clear()
+
+        start = time.perf_counter()
+        sessions.append(VectorStoreManager())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"[{label}] session {index}: startup {elapsed_ms:8.1f} ms | RSS {current_rss_mb():8.1f} MB")
+
+    print(f"[{label}] RSS growth for {num_sessions} sessions: {current_rss_mb() - rss_start:.1f} MB\n")
+
+
+def main():
+    print("Program started")
+
+    num_sessions = 3
+
+    print("Before: every session loads its own embedding model")
+    simulate_sessions(num_sessions, shared=False)
+
+    print("After: every session shares one model from the registry")
+    simulate_sessions(num_sessions, shared=True)
+
+    print("Program execution finished")
+
+
+if __name__ == "__main__":
+    main()
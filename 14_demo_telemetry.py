@@ -0,0 +1,35 @@
+import json
+import logging
+from core.document_processor import DocumentProcessor
+from core.vector_store import VectorStoreManager
+from core.telemetry import telemetry
+
+
+def main():
+    print("Program started")
+
+    # Structured JSON span logs go to the 'rag.telemetry' logger
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    telemetry.enable()
+
+    processor = DocumentProcessor(chunk_size=300, chunk_overlap=50)
+    chunks = processor.process(file_path="sample_file.txt")
+
+    vc_manager = VectorStoreManager()
+    vc_manager.add_documents(chunks)
+
+    for question in ["What is LangChain?", "How do agents use tools?", "Explain retrieval"]:
+        vc_manager.search(question, k=3)
+        vc_manager.search_with_scores(question, k=3)
+
+    print("\nPrometheus metrics:\n")
+    print(telemetry.export_prometheus())
+
+    print("JSON snapshot:\n")
+    print(json.dumps(telemetry.snapshot(), indent=2))
+
+    print("Program execution finished")
+
+
+if __name__ == "__main__":
+    main()
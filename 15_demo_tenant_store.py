@@ -0,0 +1,42 @@
+import tempfile
+import time
+from core.document_processor import DocumentProcessor
+from core.tenant_store import TenantStore
+
+
+def main():
+    print("Program started")
+
+    processor = DocumentProcessor(chunk_size=300, chunk_overlap=50)
+    handbook = processor.process(file_path="sample_file.txt")
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        # Only 3 namespaces stay in memory; colder ones are written to disk
+        store = TenantStore(root_dir=root_dir, max_resident=3)
+
+        num_users = 10
+        for user in range(num_users):
+            start = time.perf_counter()
+            embedded = store.add_documents(f"user-{user}", handbook)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"user-{user}: {len(handbook)} chunks uploaded, {embedded} embedded, {elapsed_ms:7.1f} ms")
+
+        # A private note only user-0 can see
+        private = processor.process(b"user-0 keeps a private note about LangChain agents.", filename="note.txt")
+        store.add_documents("user-0", private)
+
+        print("\nuser-0 (reloaded from disk) searches:")
+        for doc in store.search("user-0", "private note about agents", k=2):
+            print(f"  - {doc.metadata.get('source')}: {doc.page_content[:60]}...")
+
+        print("\nuser-5 searches (cannot see user-0's note):")
+        for doc in store.search("user-5", "private note about agents", k=2):
+            print(f"  - {doc.metadata.get('source')}: {doc.page_content[:60]}...")
+
+        print("\nStats:", store.stats())
+
+    print("Program execution finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import tempfile
+import time
+from core.document_processor import DocumentProcessor
+from core.vector_store import VectorStoreManager
+
+
+def timed_save(vector_store: VectorStoreManager, path: str) -> float:
+    start = time.perf_counter()
+    vector_store.save(path)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print("Program started")
+
+    processor = DocumentProcessor(chunk_size=300, chunk_overlap=50)
+    handbook = processor.process(file_path="sample_file.txt")
+    corpus = handbook * 50
+
+    with tempfile.TemporaryDirectory() as segmented_dir, tempfile.TemporaryDirectory() as single_dir:
+        segmented = VectorStoreManager(segmented=True)
+        single = VectorStoreManager(segmented=False)
+        segmented.create_from_documents(corpus)
+        single.create_from_documents(corpus)
+        print(f"First save ({len(corpus)} chunks): segmented {timed_save(segmented, segmented_dir):.1f} ms, "
+              f"single {timed_save(single, single_dir):.1f} ms")
+
+        # Each upload adds a few chunks; only the segmented save is proportional to them
+        for upload in range(5):
+            note = processor.process(f"Upload {upload} adds a short note.".encode(), filename=f"note-{upload}.txt")
+            segmented.add_documents(note)
+            single.add_documents(note)
+            print(f"Save after upload {upload}: segmented {timed_save(segmented, segmented_dir):.1f} ms, "
+                  f"single {timed_save(single, single_dir):.1f} ms")
+
+        deleted = segmented.delete(filter={"source": "note-0.txt"})
+        print(f"\nDeleted {deleted} chunk(s); save writes a tombstone: {timed_save(segmented, segmented_dir):.1f} ms")
+
+        # Give the background compactor a moment, then reload from the segments
+        time.sleep(1)
+        print("Segments:", segmented.segment_stats())
+
+        reloaded = VectorStoreManager()
+        reloaded.load(segmented_dir)
+        print(f"Reloaded {reloaded.vector_store.index.ntotal} chunks")
+        for doc in reloaded.search("short note", k=2):
+            print(f"  - {doc.metadata.get('source')}: {doc.page_content[:60]}")
+
+    print("Program execution finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import tempfile
+import threading
+import time
+from core.document_processor import DocumentProcessor
+from core.vector_store import VectorStoreManager
+
+
+def main():
+    print("Program started")
+
+    processor = DocumentProcessor(chunk_size=300, chunk_overlap=50)
+    handbook = processor.process(file_path="sample_file.txt")
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        vector_store = VectorStoreManager(segmented=True)
+        vector_store.create_from_documents(handbook * 20)
+        vector_store.save(index_dir)
+
+        # Searches keep running on the current version while uploads publish new ones
+        stop = threading.Event()
+        latencies = []
+
+        def search_loop():
+            while not stop.is_set():
+                start = time.perf_counter()
+                vector_store.search("vacation policy", k=3)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        searcher = threading.Thread(target=search_loop)
+        searcher.start()
+        for upload in range(5):
+            note = processor.process(f"Upload {upload} adds a short note.".encode(), filename=f"note-{upload}.txt")
+            vector_store.add_documents(note)
+            vector_store.save(index_dir)
+        stop.set()
+        searcher.join()
+
+        latencies.sort()
+        print(f"{len(latencies)} searches during 5 uploads: "
+              f"p50 {latencies[len(latencies) // 2]:.1f} ms, max {latencies[-1]:.1f} ms")
+        print("In memory:", vector_store.snapshot_stats())
+
+        # A search holding a version keeps it alive until it returns
+        pinned = vector_store.snapshot()
+        vector_store.add_documents(processor.process(b"One more note.", filename="late.txt"))
+        print(f"Pinned version {pinned.version} ({pinned.ntotal} chunks), current {vector_store.snapshot_stats()}")
+        del pinned
+        print("After release:", vector_store.snapshot_stats())
+
+        print("\nVersions on disk:")
+        for version in vector_store.versions(index_dir):
+            print(f"  v{version['version']}: {version['rows']} rows in {version['segments']} segment(s)"
+                  f"{' (current)' if version['current'] else ''}")
+
+        # Undo the last two uploads
+        target = vector_store.versions(index_dir)[-3]["version"]
+        vector_store.rollback(target, index_dir)
+        print(f"\nRolled back to v{target}: {vector_store.vector_store.index.ntotal} chunks, "
+              f"now v{vector_store.segment_stats()['version']}")
+
+    print("Program execution finished")
+
+
+if __name__ == "__main__":
+    main()
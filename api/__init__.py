@@ -0,0 +1,5 @@
+"""
+HTTP API for the RAG pipeline (``pip install .[api]``).
+
+``api.server`` needs FastAPI/uvicorn; ``api.client`` only needs requests.
+"""
@@ -0,0 +1,96 @@
+import json
+from typing import Generator, Iterable, Optional, Tuple
+import requests
+
+
+class RAGApiClient:
+    """
+    Thin blocking client for the RAG API (e.g. for Streamlit).
+
+    Streaming methods yield answer text as it arrives; the ``sources`` /
+    ``thread`` events are stored on the client (``last_sources``,
+    ``last_thread_id``) so the generators can be passed straight to
+    ``st.write_stream``.
+    """
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8000", timeout: float = 120):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+        self.last_sources: list = []
+        self.last_thread_id: Optional[str] = None
+
+    def _events(self, path: str, body: dict) -> Generator[Tuple[str, dict], None, None]:
+        with self._session.post(f"{self.base_url}{path}", json=body, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            event, data = "message", []
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data.append(line[len("data:"):].strip())
+                elif not line and data:
+                    yield event, json.loads("\n".join(data))
+                    event, data = "message", []
+
+    def _tokens(self, path: str, body: dict) -> Generator[str, None, None]:
+        for event, data in self._events(path, body):
+            if event == "token":
+                yield data["text"]
+            elif event == "sources":
+                self.last_sources = data["sources"]
+            elif event == "thread":
+                self.last_thread_id = data["thread_id"]
+            elif event == "error":
+                raise RuntimeError(data["detail"])
+
+    def health(self) -> dict:
+        return self._session.get(f"{self.base_url}/health", timeout=self.timeout).json()
+
+    def usage(self) -> dict:
+        """Aggregated token usage by turn kind and session."""
+        return self._session.get(f"{self.base_url}/usage", timeout=self.timeout).json()
+
+    def ingest(self, files: Iterable[Tuple[str, bytes]], namespace: str = None) -> dict:
+        """Upload (filename, content) pairs for indexing, optionally into a tenant namespace."""
+        response = self._session.post(
+            f"{self.base_url}/ingest",
+            files=[("files", (name, content)) for name, content in files],
+            data={"namespace": namespace} if namespace else None,
+            timeout=None
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def delete(self, filter: dict) -> dict:
+        """Delete the chunks matching a metadata filter."""
+        response = self._session.post(f"{self.base_url}/documents/delete", json={"filter": filter}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def versions(self) -> list:
+        """Index versions retained on the server's disk."""
+        response = self._session.get(f"{self.base_url}/index/versions", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def rollback(self, version: int) -> dict:
+        """Make a retained index version current again."""
+        response = self._session.post(f"{self.base_url}/index/rollback", json={"version": version}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def query(self, question: str, mode: str = "similarity", k: int = None, filter: dict = None, window: int = None, session_id: str = None, namespace: str = None) -> dict:
+        response = self._session.post(
+            f"{self.base_url}/query",
+            json={"question": question, "mode": mode, "k": k, "filter": filter, "window": window, "session_id": session_id, "namespace": namespace},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def query_stream(self, question: str, mode: str = "similarity", k: int = None, filter: dict = None, window: int = None, session_id: str = None, namespace: str = None) -> Generator[str, None, None]:
+        return self._tokens("/query/stream", {"question": question, "mode": mode, "k": k, "filter": filter, "window": window, "session_id": session_id, "namespace": namespace})
+
+    def chat_stream(self, message: str, thread_id: str = None) -> Generator[str, None, None]:
+        return self._tokens("/chat/stream", {"message": message, "thread_id": thread_id})
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Callable, Iterable
+
+_END = object()
+
+
+class Overloaded(Exception):
+    """Raised when a request is rejected because the server is at capacity."""
+
+
+class AdmissionController:
+    """
+    Bounded admission for one class of requests.
+
+    At most ``max_inflight`` requests run at once and at most ``max_queued``
+    wait for a slot; anything beyond that is rejected immediately with
+    ``Overloaded`` (HTTP 503) instead of piling up unbounded work.
+    """
+
+    def __init__(self, max_inflight: int, max_queued: int):
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_inflight)
+        self._waiting = 0
+        self.inflight = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked() and self._waiting >= self.max_queued:
+            self.rejected += 1
+            raise Overloaded("Server is at capacity, retry later")
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "queued": self._waiting,
+            "max_inflight": self.max_inflight,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+        }
+
+
+async def iterate_in_thread(
+    make_iterable: Callable[[], Iterable],
+    executor: Executor,
+    buffer_size: int = 64
+) -> AsyncGenerator:
+    """
+    Drive a blocking iterator on ``executor`` and yield its items asynchronously.
+
+    Items pass through a bounded queue: when the client reads slowly the
+    producer thread blocks instead of buffering the whole response. If the
+    consumer stops early (client disconnect), the producer notices within
+    a fraction of a second, closes the iterator and frees its worker.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+    cancelled = threading.Event()
+
+    def put(item) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.25)
+                return True
+            except FutureTimeoutError:
+                if cancelled.is_set():
+                    future.cancel()
+                    return False
+
+    def produce() -> None:
+        iterator = None
+        try:
+            iterator = iter(make_iterable())
+            for item in iterator:
+                if cancelled.is_set() or not put(item):
+                    return
+            put(_END)
+        except BaseException as exc:
+            if not cancelled.is_set():
+                put(exc)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        # Unblock a producer waiting on a full queue, then let it finish
+        while not queue.empty():
+            queue.get_nowait()
+        await asyncio.shield(producer)
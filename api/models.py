@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+SearchMode = Literal["similarity", "mmr", "hybrid"]
+
+
+class QueryRequest(BaseModel):
+    """Body of ``/query`` and ``/query/stream`` (``hybrid`` adds web search)."""
+
+    question: str = Field(..., min_length=1)
+    mode: SearchMode = "similarity"
+    k: Optional[int] = Field(None, ge=1, le=50)
+    filter: Optional[Dict[str, Any]] = None
+    # Neighbouring chunks added around each hit (small-to-big); server default if unset
+    window: Optional[int] = Field(None, ge=0, le=10)
+    # Token usage and budgets are tracked per session
+    session_id: Optional[str] = None
+    # Search this tenant namespace (settings.TENANT_STORE) instead of the shared index
+    namespace: Optional[str] = Field(None, min_length=1)
+
+
+class SourceDocument(BaseModel):
+    source: str
+    content: str
+    metadata: Dict[str, Any] = {}
+
+
+class QueryResponse(BaseModel):
+    answer: str
+    sources: List[str]
+    documents: List[SourceDocument]
+
+
+class ChatRequest(BaseModel):
+    """Body of ``/chat`` and ``/chat/stream`` (agent mode)."""
+
+    message: str = Field(..., min_length=1)
+    thread_id: Optional[str] = None
+
+
+class ChatResponse(BaseModel):
+    answer: str
+    thread_id: str
+
+
+class IngestResponse(BaseModel):
+    files: List[str]
+    chunks: int
+    total_vectors: int
+
+
+class DeleteRequest(BaseModel):
+    """Body of ``/documents/delete``: chunks matching a metadata filter."""
+
+    filter: Dict[str, Any] = Field(..., min_length=1)
+
+
+class DeleteResponse(BaseModel):
+    deleted: int
+    total_vectors: int
+
+
+class RollbackRequest(BaseModel):
+    """Body of ``/index/rollback``: a version listed by ``/index/versions``."""
+
+    version: int = Field(..., ge=1)
+
+
+class RollbackResponse(BaseModel):
+    version: int
+    total_vectors: int
@@ -0,0 +1,242 @@
+"""
+Async HTTP API for the RAG pipeline.
+
+Run with::
+
+    python -m api.server
+    # or: uvicorn api.server:app --host 0.0.0.0 --port 8000
+
+Streaming endpoints answer with Server-Sent Events::
+
+    event: sources   data: {"sources": [...], "documents": [...]}   (query)
+    event: thread    data: {"thread_id": "..."}                       (chat)
+    event: token     data: {"text": "..."}
+    event: done      data: {}
+    event: error     data: {"detail": "..."}
+"""
+import asyncio
+import json
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from config.settings import settings
+from core.telemetry import telemetry
+from api.concurrency import AdmissionController, Overloaded, iterate_in_thread
+from api.models import ChatRequest, ChatResponse, DeleteRequest, DeleteResponse, IngestResponse, QueryRequest, QueryResponse, RollbackRequest, RollbackResponse
+from api.service import RAGService
+from core.token_budget import BudgetExceeded, usage_tracker
+
+SUPPORTED_UPLOADS = (".txt", ".pdf")
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _documents_payload(documents) -> dict:
+    return {
+        "sources": sorted({doc.metadata.get("source", "Unknown") for doc in documents}),
+        "documents": [
+            {
+                "source": doc.metadata.get("source", "Unknown"),
+                "content": doc.page_content,
+                "metadata": doc.metadata
+            }
+            for doc in documents
+        ]
+    }
+
+
+def create_app(service: RAGService = None) -> FastAPI:
+    """
+    Build the API around a shared ``RAGService``.
+
+    Blocking work runs on two bounded pools: ``cpu`` (parsing, embedding,
+    search) sized to the cores, and ``stream`` for long-lived LLM/agent
+    streams, which are mostly waiting on the network. Admission controllers
+    cap in-flight and queued requests and answer 503 + ``Retry-After``
+    beyond that, and every stream goes through a bounded buffer so a slow
+    client stalls its producer instead of growing memory.
+
+    Args:
+        service: Pipeline to serve (a new RAGService by default)
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.service = (service or RAGService()).start()
+        app.state.cpu_pool = ThreadPoolExecutor(settings.API_CPU_WORKERS, thread_name_prefix="api-cpu")
+        app.state.stream_pool = ThreadPoolExecutor(settings.API_MAX_INFLIGHT, thread_name_prefix="api-stream")
+        app.state.query_admission = AdmissionController(settings.API_MAX_INFLIGHT, settings.API_MAX_QUEUED)
+        app.state.ingest_admission = AdmissionController(settings.API_INGEST_CONCURRENCY, settings.API_MAX_QUEUED)
+        try:
+            yield
+        finally:
+            app.state.cpu_pool.shutdown(wait=False, cancel_futures=True)
+            app.state.stream_pool.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(title="RAG API", lifespan=lifespan)
+
+    async def run_blocking(request: Request, pool: str, func, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(getattr(request.app.state, pool), func, *args)
+        try:
+            return await asyncio.wait_for(future, timeout=settings.API_REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Request timed out")
+
+    def event_stream(request: Request, stack: AsyncExitStack, make_iterable, first_event: tuple = None):
+        """SSE body that releases the admission slot in ``stack`` when it ends."""
+        async def events():
+            try:
+                if first_event:
+                    yield _sse(*first_event)
+                tokens = iterate_in_thread(make_iterable, request.app.state.stream_pool, settings.API_STREAM_BUFFER)
+                async for token in tokens:
+                    yield _sse("token", {"text": token})
+                yield _sse("done", {})
+            except Exception as exc:
+                yield _sse("error", {"detail": str(exc)})
+            finally:
+                await stack.aclose()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    @app.exception_handler(Overloaded)
+    async def overloaded_handler(request: Request, exc: Overloaded):
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+    @app.exception_handler(BudgetExceeded)
+    async def budget_handler(request: Request, exc: BudgetExceeded):
+        # 413: this request is too large; 429: the session has spent its budget
+        return JSONResponse(status_code=413 if exc.scope == "turn" else 429, content={"detail": str(exc)})
+
+    @app.exception_handler(ValueError)
+    async def value_error_handler(request: Request, exc: ValueError):
+        return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+    @app.get("/health")
+    async def health(request: Request):
+        state = request.app.state
+        return {
+            "status": state.service.warm_start.state,
+            "error": state.service.warm_start.error,
+            "total_vectors": state.service.total_vectors,
+            "query": state.query_admission.stats(),
+            "ingest": state.ingest_admission.stats(),
+            "adaptive_k": state.service.rag_chain.k_selector.stats(),
+            "segments": state.service.vector_store.segment_stats(),
+            "index": state.service.vector_store.snapshot_stats()
+        }
+
+    @app.get("/usage")
+    async def usage():
+        return usage_tracker.report()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return telemetry.export_prometheus()
+
+    @app.post("/ingest", response_model=IngestResponse)
+    async def ingest(request: Request, files: List[UploadFile] = File(...), namespace: Optional[str] = Form(None)):
+        for upload in files:
+            if not upload.filename or not upload.filename.lower().endswith(SUPPORTED_UPLOADS):
+                raise HTTPException(status_code=415, detail=f"Unsupported file '{upload.filename}'. Use .txt or .pdf")
+
+        async with request.app.state.ingest_admission.slot():
+            payload = [(upload.filename, await upload.read()) for upload in files]
+            loop = asyncio.get_running_loop()
+            # No request timeout: large uploads legitimately take a while
+            return await loop.run_in_executor(request.app.state.cpu_pool, request.app.state.service.ingest, payload, namespace)
+
+    @app.post("/documents/delete", response_model=DeleteResponse)
+    async def delete_documents(request: Request, body: DeleteRequest):
+        async with request.app.state.ingest_admission.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(request.app.state.cpu_pool, request.app.state.service.delete, body.filter)
+
+    @app.get("/index/versions")
+    async def index_versions(request: Request):
+        return await run_blocking(request, "cpu_pool", request.app.state.service.versions)
+
+    @app.post("/index/rollback", response_model=RollbackResponse)
+    async def index_rollback(request: Request, body: RollbackRequest):
+        async with request.app.state.ingest_admission.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(request.app.state.cpu_pool, request.app.state.service.rollback, body.version)
+
+    @app.post("/query", response_model=QueryResponse)
+    async def query(request: Request, body: QueryRequest):
+        service = request.app.state.service
+        async with request.app.state.query_admission.slot():
+            documents, context = await run_blocking(request, "cpu_pool", service.retrieve, body.question, body.mode, body.k, body.filter, body.window, body.namespace)
+            answer = await run_blocking(request, "stream_pool", service.answer, body.question, context, body.session_id)
+        return {"answer": answer, **_documents_payload(documents)}
+
+    @app.post("/query/stream")
+    async def query_stream(request: Request, body: QueryRequest):
+        service = request.app.state.service
+        stack = AsyncExitStack()
+        await stack.enter_async_context(request.app.state.query_admission.slot())
+        try:
+            documents, context = await run_blocking(request, "cpu_pool", service.retrieve, body.question, body.mode, body.k, body.filter, body.window, body.namespace)
+            # Refused turns get their 413/429 before the stream starts
+            turn = await run_blocking(request, "cpu_pool", service.begin_answer, body.question, context, body.session_id)
+        except BaseException:
+            await stack.aclose()
+            raise
+
+        return event_stream(
+            request,
+            stack,
+            lambda: service.answer_stream(body.question, context, body.session_id, turn),
+            first_event=("sources", _documents_payload(documents))
+        )
+
+    @app.post("/chat", response_model=ChatResponse)
+    async def chat(request: Request, body: ChatRequest):
+        thread_id = body.thread_id or secrets.token_urlsafe(16)
+        async with request.app.state.query_admission.slot():
+            answer = await run_blocking(request, "stream_pool", request.app.state.service.chat, body.message, thread_id)
+        return {"answer": answer, "thread_id": thread_id}
+
+    @app.post("/chat/stream")
+    async def chat_stream(request: Request, body: ChatRequest):
+        service = request.app.state.service
+        thread_id = body.thread_id or secrets.token_urlsafe(16)
+        stack = AsyncExitStack()
+        await stack.enter_async_context(request.app.state.query_admission.slot())
+        try:
+            turn = await run_blocking(request, "cpu_pool", service.begin_chat, body.message, thread_id)
+        except BaseException:
+            await stack.aclose()
+            raise
+
+        return event_stream(
+            request,
+            stack,
+            lambda: service.chat_stream(body.message, thread_id, turn),
+            first_event=("thread", {"thread_id": thread_id})
+        )
+
+    return app
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+
+    uvicorn.run(app, host=settings.API_HOST, port=settings.API_PORT)
+
+
+if __name__ == "__main__":
+    main()
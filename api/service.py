@@ -0,0 +1,238 @@
+import os
+import threading
+from typing import Generator, List, Optional, Tuple
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from config.settings import settings
+from core.chain import RAGchain
+from core.document_processor import DocumentProcessor
+from core.startup import WarmStartManager
+from core.tenant_store import shared_tenant_store
+from core.token_budget import Turn
+from core.vector_store import VectorStoreManager
+from tools.tavily_search import HybridSearchManager, TavilySearchTool
+
+
+class RAGService:
+    """
+    Process-wide RAG pipeline shared by every API request.
+
+    Holds one vector store (embedding model from the model registry), one
+    RAG chain and one agent, instead of one set per Streamlit session. All
+    methods are blocking and are run on the server's worker pools; the
+    vector store publishes each write as a new immutable version, so
+    searches never wait for ingestion.
+
+    Each replica restores the saved index on start-up, so several replicas
+    can sit behind a load balancer; ingestion updates the replica that
+    receives it and the saved index on disk.
+
+    Requests that name a ``namespace`` use that namespace of the
+    process-wide ``TenantStore`` instead (settings.TENANT_STORE, off by
+    default): uploads are visible only to it and identical chunks are
+    embedded once.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreManager = None,
+        llm: BaseChatModel = None,
+        tavily_search: TavilySearchTool = None
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            vector_store: Vector store to serve (a new one by default)
+            llm: Chat model for answers (Groq by default)
+            tavily_search: Web search tool for hybrid mode (Tavily by default)
+        """
+        self.vector_store = vector_store or VectorStoreManager()
+        self.doc_processor = DocumentProcessor()
+        self.rag_chain = RAGchain(self.vector_store, llm=llm)
+        self.warm_start = WarmStartManager(self.vector_store)
+
+        self._tavily_search = tavily_search
+        self._hybrid_search: Optional[HybridSearchManager] = None
+        self._agent = None
+        self._lazy_lock = threading.Lock()
+
+    def start(self) -> "RAGService":
+        """Restore the saved index and warm the models in the background."""
+        if settings.WARM_START:
+            self.warm_start.start()
+        return self
+
+    @property
+    def hybrid_search(self) -> HybridSearchManager:
+        with self._lazy_lock:
+            if self._hybrid_search is None:
+                self._tavily_search = self._tavily_search or TavilySearchTool()
+                self._hybrid_search = HybridSearchManager(self.vector_store, self._tavily_search)
+            return self._hybrid_search
+
+    @property
+    def agent(self):
+        """Agent with the chat tools, created on first use."""
+        with self._lazy_lock:
+            if self._agent is None:
+                from core.agent import AgentManager
+                from tools.tools_for_chat import get_all_tools
+
+                self._agent = AgentManager()
+                self._agent.agent_initialization(tools=get_all_tools())
+            return self._agent
+
+    @property
+    def total_vectors(self) -> int:
+        if not self.vector_store.is_initialized:
+            return 0
+        return self.vector_store.vector_store.index.ntotal
+
+    def _tenant_chain(self, namespace: str) -> RAGchain:
+        if not settings.TENANT_STORE:
+            raise ValueError("Namespaces need the tenant store (TENANT_STORE=true).")
+        chain = RAGchain(
+            shared_tenant_store().view(namespace, settings.TENANT_SHARED_NAMESPACES),
+            llm=self.rag_chain.llm,
+            usage=self.rag_chain.usage
+        )
+        # One set of adaptive-k statistics for /health
+        chain.k_selector = self.rag_chain.k_selector
+        return chain
+
+    def ingest(self, files: List[Tuple[str, bytes]], namespace: str = None) -> dict:
+        """
+        Parse, chunk and index uploaded files.
+
+        Files are parsed and embedded while searches keep running; the
+        chunks are then published as a new index version.
+
+        Args:
+            files: (filename, content) pairs; .txt and .pdf are supported
+            namespace: Tenant namespace to add them to instead of the
+                shared index (then 'total_vectors' counts the namespace)
+
+        Returns:
+            Dictionary with 'files', 'chunks' and 'total_vectors'
+        """
+        self.warm_start.wait()
+
+        chunks: List[Document] = []
+        for name, content in files:
+            file_name = os.path.basename(name)
+            file_chunks = self.doc_processor.process(content, filename=file_name)
+            for chunk in file_chunks:
+                chunk.metadata["source"] = file_name
+            chunks.extend(file_chunks)
+
+        if namespace is not None:
+            view = self._tenant_chain(namespace).vector_store
+            view.add_documents(chunks)
+            return {
+                "files": [os.path.basename(name) for name, _ in files],
+                "chunks": len(chunks),
+                "total_vectors": view.store.size(namespace)
+            }
+
+        if chunks:
+            self.vector_store.add_documents(chunks)
+            if settings.AUTO_SAVE_INDEX and self.vector_store.index_path:
+                self.vector_store.save()
+
+        return {
+            "files": [os.path.basename(name) for name, _ in files],
+            "chunks": len(chunks),
+            "total_vectors": self.total_vectors
+        }
+
+    def delete(self, metadata_filter: dict) -> dict:
+        """
+        Remove the chunks matching a metadata filter, e.g. ``{"source": "a.pdf"}``.
+
+        With a segmented index, saving records tombstones instead of
+        rewriting the index.
+
+        Returns:
+            Dictionary with 'deleted' and 'total_vectors'
+        """
+        self.warm_start.wait()
+
+        deleted = 0
+        if self.vector_store.is_initialized:
+            deleted = self.vector_store.delete(filter=metadata_filter)
+            if deleted and settings.AUTO_SAVE_INDEX and self.vector_store.index_path:
+                self.vector_store.save()
+
+        return {"deleted": deleted, "total_vectors": self.total_vectors}
+
+    def versions(self) -> List[dict]:
+        """Index versions retained on disk, oldest first."""
+        self.warm_start.wait()
+        return self.vector_store.versions()
+
+    def rollback(self, version: int) -> dict:
+        """
+        Serve a retained on-disk index version again.
+
+        Searches in flight finish on the version they started with.
+
+        Returns:
+            Dictionary with 'version' (the rollback's own version) and 'total_vectors'
+        """
+        self.warm_start.wait()
+        self.vector_store.rollback(version)
+        return {"version": self.vector_store.segment_stats()["version"], "total_vectors": self.total_vectors}
+
+    def retrieve(
+        self,
+        question: str,
+        mode: str = "similarity",
+        k: int = None,
+        metadata_filter: dict = None,
+        window: int = None,
+        namespace: str = None
+    ) -> Tuple[List[Document], str]:
+        """
+        Retrieve documents (and web results in hybrid mode) and build the context.
+
+        Args:
+            namespace: Search this tenant namespace instead of the shared index
+
+        Returns:
+            (documents, context string)
+        """
+        rag_chain = self.rag_chain if namespace is None else self._tenant_chain(namespace)
+        documents: List[Document] = []
+        if rag_chain.vector_store.is_initialized:
+            if mode == "mmr":
+                documents = rag_chain.retrieve_mmr(question, k=k, filter=metadata_filter)
+            else:
+                documents = rag_chain.retrieve(question, k=k, filter=metadata_filter, window=window)
+
+        if mode == "hybrid":
+            hybrid = self.hybrid_search
+            web_results = hybrid.tavily.search(question)
+            return documents, hybrid.format_hybrid_context(documents, web_results)
+
+        return documents, self.rag_chain._format_context(documents)
+
+    def answer(self, question: str, context: str, session_id: str = None) -> str:
+        return self.rag_chain.generate(question, context, session_id=session_id)
+
+    def begin_answer(self, question: str, context: str, session_id: str = None) -> Turn:
+        """Check budgets for a streamed answer before the response starts (raises ``BudgetExceeded``)."""
+        return self.rag_chain.begin_turn(question, context, session_id)
+
+    def answer_stream(self, question: str, context: str, session_id: str = None, turn: Turn = None) -> Generator[str, None, None]:
+        return self.rag_chain.generate_stream(question, context, session_id=session_id, turn=turn)
+
+    def chat(self, message: str, thread_id: str) -> str:
+        return self.agent.get_response(message, thread_id=thread_id)
+
+    def begin_chat(self, message: str, thread_id: str) -> Turn:
+        """Check budgets for a streamed agent turn before the response starts."""
+        return self.agent.begin_turn(message, thread_id)
+
+    def chat_stream(self, message: str, thread_id: str, turn: Turn = None) -> Generator[str, None, None]:
+        return self.agent.get_response_stream(message, thread_id=thread_id, turn=turn)
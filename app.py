@@ -8,9 +8,14 @@ from ui.components import (
     display_sidebar_info,
     display_file_uploader,
     display_processing_status,
+    display_ingestion_jobs,
+    display_readiness_status,
+    display_profiling_toggle,
+    display_token_usage,
     create_web_search_toggle_mmr
 )
 from ui.chat_interface import ChatInterface
+from config.settings import settings
 
 st.set_page_config(
     page_title="AI Advocate RAG Chatbot",
@@ -29,15 +34,24 @@ def main():
     # Initialize chat interface
     if "chat_interface" not in st.session_state:
         try:
-            st.session_state.chat_interface = ChatInterface()
+            # ?user=<id> keeps a user's uploads across threads; otherwise they belong to the thread
+            namespace = st.query_params.get("user") or st.session_state.thread_id
+            st.session_state.chat_interface = ChatInterface(namespace=namespace)
         except Exception as e:
             st.error(f"❌ Failed to initialize: {str(e)}")
             st.stop()
     
     chat = st.session_state.chat_interface
+
+    # Pick up the index restored by the background warm start
+    if chat.warm_start.is_ready and chat.vector_store.is_initialized:
+        st.session_state.vector_store_initialized = True
     
     # Display sidebar (includes mode switcher)
     display_sidebar_info()
+    display_readiness_status(chat.warm_start.state, chat.warm_start.error)
+    st.session_state.profile_request = display_profiling_toggle()
+    display_token_usage(chat.usage.session(chat.session_id))
     
 
     if st.session_state.chat_mode == 'rag':
@@ -59,18 +73,22 @@ def display_rag_mode(chat):
 
         if uploaded_files:
             if st.button("🚀 Process Documents", type="primary"):
-                with st.spinner("Processing..."):
-                    try:
-                        num_chunks = chat.process_uploaded_files(uploaded_files)
-                        display_processing_status(
-                            f"✅ Processed {len(uploaded_files)} file(s) into {num_chunks} chunks!",
-                            "success"
-                        )
-                    except Exception as e:
-                        display_processing_status(f"❌ Error: {str(e)}", "error")
+                try:
+                    job_id = chat.submit_ingestion(
+                        uploaded_files,
+                        profile=st.session_state.profile_request
+                    )
+                    display_processing_status(
+                        f"📥 Queued {len(uploaded_files)} file(s) as job {job_id[:8]} - you can keep chatting",
+                        "info"
+                    )
+                except Exception as e:
+                    display_processing_status(f"❌ Error: {str(e)}", "error")
+
+        display_ingestion_jobs(chat.ingestion)
 
     # Search options
-    use_web_search, use_mmr = create_web_search_toggle_mmr()
+    use_web_search, use_mmr = create_web_search_toggle_mmr(routing=settings.QUERY_ROUTING)
     
     st.divider()
     
@@ -86,21 +104,18 @@ def display_rag_mode(chat):
         
         with st.chat_message("assistant"):
             try:
-                # Classify query
-                # from core.query_classifier import QueryClassifier
-                # classifier = QueryClassifier()
-                # query_type = classifier.classify(prompt)
-                
-                # # Show query type
-                # if query_type == "document":
-                #     st.info("📄 Document-based query detected")
-                #     use_web_search = False
-                # elif query_type == "web":
-                #     st.info("🌐 Web search query detected")
-                #     use_web_search = True
-                # else:
-                #     st.info("🔀 Hybrid query detected - using both sources")
-                #     use_web_search = True
+                # Classify query locally so Tavily is only called when needed
+                if settings.QUERY_ROUTING:
+                    route = chat.query_classifier.route(prompt)
+
+                    # Show query type
+                    if route.label == "document":
+                        st.info(f"📄 Document-based query detected (confidence {route.confidence:.0%})")
+                    elif route.label == "web":
+                        st.info(f"🌐 Web search query detected (confidence {route.confidence:.0%})")
+                    else:
+                        st.info(f"🔀 Hybrid query detected - using both sources (confidence {route.confidence:.0%})")
+                    use_web_search = route.use_web_search
                 
                 # Get response
                 if use_mmr:
@@ -110,8 +125,16 @@ def display_rag_mode(chat):
                     response_gen = chat.get_response(prompt, use_web_search)
                     sources = chat.get_sources(prompt, use_web_search)
                 
-                # Stream response
+                # Stream response (profiled when requested or sampled),
+                # batching tokens into fewer UI updates
+                response_gen = chat.coalescer.wrap(chat.profiler.profile_stream(
+                    response_gen,
+                    "chat_turn",
+                    force=st.session_state.profile_request
+                ))
                 response = st.write_stream(response_gen)
+                if st.session_state.profile_request:
+                    st.caption(f"🖥️ {response_gen.stats.summary()}")
                 
             
                 tab1, tab2, tab3 = st.tabs(["📄 Answer", "📚 Document Evidence", "🌐 Web Evidence"])
@@ -128,7 +151,7 @@ def display_rag_mode(chat):
                             st.markdown(f"📄 **{source}**")
                         
                         # Get document summaries
-                        summaries = chat.rag_chain.get_document_summaries(prompt, k=3)
+                        summaries = chat.rag_chain.get_document_summaries(prompt, k=3, session_id=chat.session_id)
                         if summaries.get("summaries"):
                             st.markdown("**Document Summaries:**")
                             for summary in summaries["summaries"]:
@@ -179,7 +202,14 @@ def display_general_mode(chat):
         
         with st.chat_message("assistant"):
             try:
-                response = st.write_stream(chat.get_general_response(prompt))
+                response_gen = chat.coalescer.wrap(chat.profiler.profile_stream(
+                    chat.get_general_response(prompt),
+                    "agent_turn",
+                    force=st.session_state.profile_request
+                ))
+                response = st.write_stream(response_gen)
+                if st.session_state.profile_request:
+                    st.caption(f"🖥️ {response_gen.stats.summary()}")
                 add_message("assistant", response)
                 
             except Exception as e:
@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the RAG pipeline.
+
+Run a module directly, e.g.::
+
+    python -m benchmarks.retrieval --sizes 1000 5000 --output retrieval.json
+"""
@@ -0,0 +1,98 @@
+import json
+import os
+import platform
+import time
+from typing import Callable, Dict, List
+from langchain_core.embeddings import Embeddings
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Linear-interpolated percentile of ``values``.
+
+    Args:
+        values: Samples (need not be sorted)
+        pct: Percentile in [0, 100]
+
+    Returns:
+        The percentile value (0.0 for an empty list)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    """Summarise latency samples (milliseconds) as mean/p50/p95/p99/max."""
+    if not samples_ms:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "count": len(samples_ms),
+        "mean_ms": sum(samples_ms) / len(samples_ms),
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms),
+    }
+
+
+def timed(func: Callable, *args, **kwargs):
+    """Call ``func`` and return ``(result, elapsed_ms)``."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (falls back to peak RSS off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def environment_info() -> dict:
+    """Host details recorded with every report so runs can be compared."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_report(report: dict, output_path: str = None) -> None:
+    """Print ``report`` as JSON and optionally write it to ``output_path``."""
+    text = json.dumps(report, indent=2, default=str)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Report written to {output_path}")
+    else:
+        print(text)
+
+
+class CachedEmbeddings(Embeddings):
+    """Memoises embeddings so benchmark variants index identical vectors without re-encoding."""
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+        self._cache = {}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing = [t for t in dict.fromkeys(texts) if t not in self._cache]
+        if missing:
+            self._cache.update(zip(missing, self.inner.embed_documents(missing)))
+        return [self._cache[t] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if text not in self._cache:
+            self._cache[text] = self.inner.embed_query(text)
+        return self._cache[text]
@@ -0,0 +1,99 @@
+import glob
+import os
+import random
+from typing import List
+from langchain_core.documents import Document
+from core.document_processor import DocumentProcessor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_TEXT_PATH = os.path.join(REPO_ROOT, "sample_file.txt")
+SAMPLE_PDF_DIR = os.path.join(REPO_ROOT, "pdf")
+
+TOPICS = {
+    "cricket": ["batsman", "bowler", "wicket", "innings", "century", "captain", "stadium", "over"],
+    "finance": ["market", "equity", "bond", "inflation", "interest", "portfolio", "dividend", "revenue"],
+    "medicine": ["patient", "diagnosis", "therapy", "clinical", "symptom", "dose", "vaccine", "trial"],
+    "software": ["compiler", "thread", "latency", "cache", "database", "index", "deploy", "kernel"],
+    "climate": ["emission", "carbon", "rainfall", "glacier", "temperature", "forest", "ocean", "drought"],
+    "history": ["empire", "dynasty", "treaty", "revolution", "monarch", "battle", "colony", "archive"],
+}
+FILLER = ["the", "a", "of", "with", "during", "after", "because", "and", "while", "its", "for", "on"]
+
+
+def _tag(chunks: List[Document], corpus_name: str) -> List[Document]:
+    for index, chunk in enumerate(chunks):
+        chunk.metadata["chunk_id"] = f"{corpus_name}-{index}"
+    return chunks
+
+
+def synthetic_corpus(num_chunks: int, words_per_chunk: int = 60, seed: int = 13) -> List[Document]:
+    """
+    Build a deterministic synthetic corpus of topical pseudo-sentences.
+
+    Args:
+        num_chunks: Number of chunks to generate
+        words_per_chunk: Approximate words per chunk
+        seed: Random seed (same seed -> same corpus)
+
+    Returns:
+        List of Documents with ``source``, ``topic`` and ``chunk_id`` metadata
+    """
+    rng = random.Random(seed)
+    topic_names = list(TOPICS)
+    chunks = []
+
+    for index in range(num_chunks):
+        topic = topic_names[index % len(topic_names)]
+        vocabulary = TOPICS[topic]
+        words = [
+            rng.choice(vocabulary) if rng.random() < 0.45 else rng.choice(FILLER)
+            for _ in range(words_per_chunk)
+        ]
+        chunks.append(Document(
+            page_content=" ".join(words).capitalize() + ".",
+            metadata={"source": f"synthetic_{topic}.txt", "topic": topic}
+        ))
+
+    return _tag(chunks, f"synthetic{num_chunks}")
+
+
+def sample_corpus(processor: DocumentProcessor = None) -> List[Document]:
+    """
+    Chunk ``sample_file.txt`` and every PDF in ``pdf/`` with the app's processor.
+
+    Returns:
+        List of chunk Documents (empty if no sample files are present)
+    """
+    processor = processor or DocumentProcessor()
+    paths = [SAMPLE_TEXT_PATH] if os.path.exists(SAMPLE_TEXT_PATH) else []
+    paths.extend(sorted(glob.glob(os.path.join(SAMPLE_PDF_DIR, "*.pdf"))))
+
+    chunks = []
+    for path in paths:
+        chunks.extend(processor.process(path))
+
+    return _tag(chunks, "sample")
+
+
+def sample_queries(documents: List[Document], num_queries: int, seed: int = 7) -> List[str]:
+    """
+    Derive queries from the corpus by taking a short span of a random chunk.
+
+    Args:
+        documents: Corpus to draw from
+        num_queries: Number of queries
+        seed: Random seed
+
+    Returns:
+        List of query strings
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(num_queries):
+        words = rng.choice(documents).page_content.split()
+        if len(words) <= 8:
+            queries.append(" ".join(words))
+            continue
+        start = rng.randrange(0, len(words) - 8)
+        queries.append(" ".join(words[start:start + 8]))
+    return queries
@@ -0,0 +1,88 @@
+import argparse
+from typing import List
+import numpy as np
+from core.dim_reduction import REDUCTION_MODES
+from core.embeddings import EmbeddingManager
+from core.vector_store import VectorStoreManager
+from benchmarks.common import CachedEmbeddings, environment_info, latency_summary, timed, write_report
+from benchmarks.corpus import sample_queries, synthetic_corpus
+from benchmarks.retrieval import corpus_matrix, exact_top_k, index_size_bytes, recall_at_k
+
+
+def benchmark_variant(mode: str, target_dim: int, documents, queries, exact, k: int, embedding_manager) -> dict:
+    """Index with one reduction setting and measure recall against full-dimension exact search."""
+    vector_store = VectorStoreManager(embedding_manager, reduction=mode, target_dim=target_dim)
+    _, build_ms = timed(vector_store.create_from_documents, documents)
+
+    for query in queries[:3]:
+        vector_store.search(query, k=k)
+
+    latencies, recalls = [], []
+    for query, exact_ids in zip(queries, exact):
+        docs, elapsed_ms = timed(vector_store.search, query, k=k)
+        latencies.append(elapsed_ms)
+        recalls.append(recall_at_k(docs, exact_ids))
+
+    return {
+        "mode": mode,
+        "dimension": vector_store.vector_store.index.d,
+        "build_ms": build_ms,
+        "index_bytes": index_size_bytes(vector_store),
+        "recall_at_k": sum(recalls) / len(recalls),
+        "latency": latency_summary(latencies),
+    }
+
+
+def run(size: int, num_queries: int, k: int, target_dims: List[int], modes: List[str]) -> dict:
+    embedding_manager = EmbeddingManager()
+    embedding_manager._embeddings = CachedEmbeddings(embedding_manager.embeddings)
+
+    documents = synthetic_corpus(size)
+    queries = sample_queries(documents, num_queries)
+
+    full = VectorStoreManager(embedding_manager, reduction="none")
+    full.create_from_documents(documents)
+    matrix, chunk_ids = corpus_matrix(full)
+    query_vectors = np.asarray(embedding_manager.embeddings.embed_documents(queries), dtype="float32")
+    exact = [exact_top_k(matrix, chunk_ids, vector, k) for vector in query_vectors]
+
+    results = [benchmark_variant("none", 0, documents, queries, exact, k, embedding_manager)]
+    for mode in modes:
+        for target_dim in target_dims:
+            if target_dim >= matrix.shape[1]:
+                continue
+            results.append(benchmark_variant(mode, target_dim, documents, queries, exact, k, embedding_manager))
+
+    baseline = results[0]
+    for result in results:
+        result["memory_ratio"] = result["index_bytes"] / baseline["index_bytes"]
+        result["recall_loss"] = baseline["recall_at_k"] - result["recall_at_k"]
+        result["p50_speedup"] = baseline["latency"]["p50_ms"] / max(result["latency"]["p50_ms"], 1e-9)
+        print(f"  {result['mode']:<9} d={result['dimension']:<4} memory x{result['memory_ratio']:.2f} "
+              f"recall@{k}={result['recall_at_k']:.3f} p50={result['latency']['p50_ms']:.2f}ms")
+
+    return {
+        "benchmark": "dim_reduction",
+        "embedding_model": embedding_manager.model_name,
+        "environment": environment_info(),
+        "num_chunks": size,
+        "k": k,
+        "results": results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recall / memory / latency of reduced-dimension embeddings")
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 128, 64, 32])
+    parser.add_argument("--modes", nargs="+", default=["pca", "truncate"], choices=REDUCTION_MODES[1:])
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    write_report(run(args.size, args.queries, args.k, args.dims, args.modes), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from langchain_core.embeddings import Embeddings
+from core.chain import RAGchain
+from core.embeddings import EmbeddingManager
+from core.vector_store import VectorStoreManager
+from ui.chat_interface import ChatInterface
+from benchmarks.common import environment_info, latency_summary, write_report
+from benchmarks.corpus import sample_corpus, sample_queries, synthetic_corpus
+from benchmarks.fakes import FakeStreamingChatModel, FakeTavilySearchTool
+
+STAGES = ["embed", "search", "web_search", "format", "generate"]
+
+
+class StageRecorder:
+    """Per-thread accumulator of stage durations (ms) for the current request."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        self._local.stages = {}
+
+    def add(self, stage: str, elapsed_ms: float) -> None:
+        stages = getattr(self._local, "stages", None)
+        if stages is None:
+            stages = self._local.stages = {}
+        stages[stage] = stages.get(stage, 0.0) + elapsed_ms
+
+    def snapshot(self) -> Dict[str, float]:
+        return dict(getattr(self._local, "stages", {}))
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Return ``func`` instrumented to add its duration to ``stage``."""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings proxy that reports query embedding time to a recorder."""
+
+    def __init__(self, inner: Embeddings, recorder: StageRecorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.recorder.wrap("embed", self.inner.embed_query)(text)
+
+
+def build_pipeline(documents, recorder: StageRecorder, llm: FakeStreamingChatModel, tavily: FakeTavilySearchTool):
+    """
+    Wire a RAGchain and ChatInterface around the local stand-ins.
+
+    Stage hooks are installed on the instances only, so the production
+    classes are untouched.
+    """
+    embedding_manager = EmbeddingManager()
+    embedding_manager._embeddings = TimedEmbeddings(embedding_manager.embeddings, recorder)
+
+    vector_store = VectorStoreManager(embedding_manager)
+    vector_store.create_from_documents(documents)
+    vector_store.search = recorder.wrap("retrieve", vector_store.search)
+
+    tavily.search = recorder.wrap("web_search", tavily.search)
+
+    chat = ChatInterface(vector_store=vector_store, tavily_search=tavily, llm=llm)
+    chat.warm_start.wait()
+    chat.initialize_rag_chain()
+
+    rag_chain: RAGchain = chat.rag_chain
+    rag_chain.retrieve_mmr = recorder.wrap("retrieve", rag_chain.retrieve_mmr)
+    rag_chain._format_context = recorder.wrap("format", rag_chain._format_context)
+
+    return rag_chain, chat
+
+
+def scenarios(rag_chain: RAGchain, chat: ChatInterface, k: int) -> Dict[str, Callable]:
+    """Entry points under test; each returns an iterable of answer chunks."""
+    return {
+        "query": lambda q: [rag_chain.query(q, k=k)["answer"]],
+        "query_stream": lambda q: rag_chain.query_stream(q, k=k),
+        "query_stream_mmr": lambda q: rag_chain.query_stream_mmr(q, k=k),
+        "hybrid": lambda q: chat.get_response(q, use_web_search=True),
+        "hybrid_mmr": lambda q: chat.get_mmr_response(q, use_web_search=True),
+    }
+
+
+def run_request(entry: Callable, query: str, recorder: StageRecorder) -> dict:
+    """Drive one request to completion and return its timings."""
+    recorder.reset()
+    start = time.perf_counter()
+    first_chunk_at = None
+
+    for _ in entry(query):
+        if first_chunk_at is None:
+            first_chunk_at = time.perf_counter()
+
+    end = time.perf_counter()
+    stages = recorder.snapshot()
+    total_ms = (end - start) * 1000
+
+    # Retrieval includes query embedding; everything left after the
+    # pre-generation stages is time spent in the model.
+    stages["search"] = max(stages.pop("retrieve", 0.0) - stages.get("embed", 0.0), 0.0)
+    stages["generate"] = max(total_ms - sum(stages.values()), 0.0)
+
+    return {
+        "ttft_ms": ((first_chunk_at or end) - start) * 1000,
+        "total_ms": total_ms,
+        "stages": stages,
+    }
+
+
+def run(
+    documents,
+    queries: List[str],
+    k: int,
+    concurrency: int,
+    ttft_ms: float,
+    tokens_per_second: float,
+    num_tokens: int,
+    web_latency_ms: float
+) -> dict:
+    recorder = StageRecorder()
+    llm = FakeStreamingChatModel(ttft_ms=ttft_ms, tokens_per_second=tokens_per_second, num_tokens=num_tokens)
+    tavily = FakeTavilySearchTool(latency_ms=web_latency_ms)
+    rag_chain, chat = build_pipeline(documents, recorder, llm, tavily)
+
+    results = {}
+    for name, entry in scenarios(rag_chain, chat, k).items():
+        run_request(entry, queries[0], recorder)  # warm-up
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(lambda q: run_request(entry, q, recorder), queries))
+        wall_seconds = time.perf_counter() - start
+
+        results[name] = {
+            "ttft": latency_summary([s["ttft_ms"] for s in samples]),
+            "total": latency_summary([s["total_ms"] for s in samples]),
+            "stages_mean_ms": {
+                stage: sum(s["stages"].get(stage, 0.0) for s in samples) / len(samples)
+                for stage in STAGES
+            },
+            "throughput_rps": len(samples) / wall_seconds if wall_seconds else 0.0,
+        }
+        print(f"  {name:<18} ttft p50={results[name]['ttft']['p50_ms']:.1f}ms "
+              f"total p50={results[name]['total']['p50_ms']:.1f}ms "
+              f"p99={results[name]['total']['p99_ms']:.1f}ms")
+
+    return {
+        "benchmark": "e2e",
+        "environment": environment_info(),
+        "config": {
+            "num_chunks": len(documents),
+            "num_queries": len(queries),
+            "k": k,
+            "concurrency": concurrency,
+            "llm": {"ttft_ms": ttft_ms, "tokens_per_second": tokens_per_second, "num_tokens": num_tokens},
+            "web_latency_ms": web_latency_ms,
+        },
+        "results": results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end RAG latency harness (offline)")
+    parser.add_argument("--corpus", choices=["sample", "synthetic"], default="sample")
+    parser.add_argument("--size", type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Fake LLM time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Fake LLM decode speed")
+    parser.add_argument("--num-tokens", type=int, default=120, help="Tokens per fake answer")
+    parser.add_argument("--web-latency-ms", type=float, default=400.0, help="Fake Tavily round trip")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    documents = sample_corpus() if args.corpus == "sample" else synthetic_corpus(args.size)
+    queries = sample_queries(documents, args.queries)
+
+    report = run(
+        documents, queries, args.k, args.concurrency,
+        args.ttft_ms, args.tokens_per_second, args.num_tokens, args.web_latency_ms
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
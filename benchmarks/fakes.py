@@ -0,0 +1,110 @@
+import time
+from typing import Any, Iterator, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeTavilySearchTool:
+    """
+    Offline stand-in for ``TavilySearchTool``.
+
+    Exposes the same ``search`` / ``search_with_context`` surface so
+    ``HybridSearchManager`` and ``ChatInterface`` can run without a network
+    connection or API key. ``latency_ms`` simulates the network round trip.
+    """
+
+    def __init__(self, max_results: int = 5, latency_ms: float = 0.0):
+        self.max_results = max_results
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _raw_results(self, query: str) -> dict:
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        return {
+            "answer": f"Offline summary for: {query}",
+            "results": [
+                {
+                    "title": f"Result {i} for {query}",
+                    "content": f"Synthetic web content {i} about {query}.",
+                    "url": f"https://example.invalid/{i}"
+                }
+                for i in range(1, self.max_results + 1)
+            ]
+        }
+
+    def _format_results(self, results: dict) -> str:
+
+        parts = [f"Summary: {results['answer']}"]
+        for i, result in enumerate(results["results"], 1):
+            parts.append(f"[{i}] {result['title']}\n{result['content']}\nSource: {result['url']}")
+        return "\n\n".join(parts)
+
+    def search(self, query: str) -> str:
+        self.calls += 1
+        return self._format_results(self._raw_results(query))
+
+    def search_with_context(self, query: str) -> dict:
+        self.calls += 1
+        raw_results = self._raw_results(query)
+        return {
+            "query": query,
+            "results": raw_results,
+            "formatted": self._format_results(raw_results),
+            "source": "fake_web_search"
+        }
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """
+    Local chat model with a configurable latency profile.
+
+    Sleeps ``ttft_ms`` before the first token, then emits ``num_tokens``
+    tokens at ``tokens_per_second``. Supports ``invoke`` and ``stream`` so it
+    drops into ``prompt | llm | parser`` chains in place of ``ChatGroq``.
+    """
+
+    ttft_ms: float = 300.0
+    tokens_per_second: float = 200.0
+    num_tokens: int = 120
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat"
+
+    def _tokens(self) -> Iterator[str]:
+
+        for index in range(self.num_tokens):
+            yield f"tok{index} "
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = "".join(chunk.message.content for chunk in self._stream(messages, stop, run_manager, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.ttft_ms / 1000)
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+
+        for index, token in enumerate(self._tokens()):
+            if index and interval:
+                time.sleep(interval)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
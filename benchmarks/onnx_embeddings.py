@@ -0,0 +1,110 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import List
+import numpy as np
+from core.embeddings import EMBEDDING_BACKENDS, EmbeddingManager
+from benchmarks.common import environment_info, write_report
+from benchmarks.corpus import synthetic_corpus
+
+# Minimum cosine similarity between a backend's vector and the torch vector
+TOLERANCE = {"onnx": 0.9999, "onnx-int8": 0.98}
+
+
+def cold_start_child(backend: str) -> None:
+    """Runs in a fresh interpreter: time imports + model load + first embedding."""
+    start = time.perf_counter()
+    manager = EmbeddingManager(backend=backend)
+    loaded = time.perf_counter()
+    manager.embeddings.embed_query("first query after a cold start")
+    done = time.perf_counter()
+    print(json.dumps({
+        "load_ms": (loaded - start) * 1000,
+        "first_embedding_ms": (done - loaded) * 1000,
+        "torch_imported": "torch" in sys.modules,
+    }))
+
+
+def measure_cold_start(backend: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.onnx_embeddings", "--cold-start-child", backend],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_throughput(manager: EmbeddingManager, texts: List[str], repeats: int) -> dict:
+    manager.embeddings.embed_documents(texts[:8])  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        manager.embeddings.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    return {"texts_per_second": len(texts) * repeats / elapsed, "batch_seconds": elapsed / repeats}
+
+
+def tolerance_check(reference: np.ndarray, candidate: np.ndarray, backend: str) -> dict:
+    """Compare a backend's vectors with the torch reference."""
+    cosine = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    result = {
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_abs_diff": float(np.abs(reference - candidate).max()),
+        "threshold": TOLERANCE[backend],
+    }
+    result["passed"] = result["min_cosine"] >= result["threshold"]
+    return result
+
+
+def run(num_texts: int, repeats: int, backends: List[str]) -> dict:
+    texts = [doc.page_content for doc in synthetic_corpus(num_texts)]
+    report = {"benchmark": "onnx_embeddings", "environment": environment_info(), "num_texts": num_texts, "backends": {}}
+
+    reference = None
+    for backend in backends:
+        manager = EmbeddingManager(backend=backend)
+        vectors = np.asarray(manager.embeddings.embed_documents(texts), dtype="float32")
+        entry = {
+            "cold_start": measure_cold_start(backend),
+            "throughput": measure_throughput(manager, texts, repeats),
+        }
+        if backend == "torch":
+            reference = vectors
+        elif reference is not None:
+            entry["tolerance"] = tolerance_check(reference, vectors, backend)
+
+        report["backends"][backend] = entry
+        print(f"  {backend:<10} load={entry['cold_start']['load_ms']:.0f}ms "
+              f"throughput={entry['throughput']['texts_per_second']:.1f} texts/s "
+              f"{'tolerance ok' if entry.get('tolerance', {}).get('passed', True) else 'TOLERANCE FAILED'}")
+
+    return report
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Torch vs ONNX Runtime embedding backends")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--cold-start-child", choices=EMBEDDING_BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    if args.cold_start_child:
+        cold_start_child(args.cold_start_child)
+        return
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    report = run(args.texts, args.repeats, backends)
+    write_report(report, args.output)
+
+    failed = [b for b, entry in report["backends"].items() if not entry.get("tolerance", {}).get("passed", True)]
+    if failed:
+        sys.exit(f"Embeddings outside tolerance for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import shutil
+import tempfile
+from typing import List
+import numpy as np
+from core.embeddings import EmbeddingManager
+from core.quantization import QUANTIZATION_MODES
+from core.vector_store import VectorStoreManager
+from benchmarks.common import CachedEmbeddings, environment_info, latency_summary, timed, write_report
+from benchmarks.corpus import sample_queries, synthetic_corpus
+from benchmarks.retrieval import corpus_matrix, exact_top_k, index_size_bytes, recall_at_k
+
+
+def benchmark_mode(mode: str, documents, queries, exact, k: int, embedding_manager) -> dict:
+    """Build, persist and reload one storage mode, then measure memory, latency and recall."""
+    folder = tempfile.mkdtemp(prefix=f"quant-{mode}-")
+    try:
+        builder = VectorStoreManager(embedding_manager, quantization=mode)
+        _, build_ms = timed(builder.create_from_documents, documents)
+        builder.save(folder)
+
+        # Reload so compressed modes serve rescoring from memory-mapped vectors
+        vector_store = VectorStoreManager(embedding_manager, quantization=mode)
+        vector_store.load(folder)
+
+        for query in queries[:3]:
+            vector_store.search(query, k=k)
+
+        latencies, recalls = [], []
+        for query, exact_ids in zip(queries, exact):
+            docs, elapsed_ms = timed(vector_store.search, query, k=k)
+            latencies.append(elapsed_ms)
+            recalls.append(recall_at_k(docs, exact_ids))
+
+        return {
+            "mode": mode,
+            "build_ms": build_ms,
+            "index_resident_bytes": index_size_bytes(vector_store),
+            "recall_at_k": sum(recalls) / len(recalls),
+            "latency": latency_summary(latencies),
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def run(sizes: List[int], num_queries: int, k: int, modes: List[str]) -> dict:
+    embedding_manager = EmbeddingManager()
+    embedding_manager._embeddings = CachedEmbeddings(embedding_manager.embeddings)
+
+    results = []
+    for size in sizes:
+        documents = synthetic_corpus(size)
+        queries = sample_queries(documents, num_queries)
+
+        reference = VectorStoreManager(embedding_manager, quantization="none")
+        reference.create_from_documents(documents)
+        matrix, chunk_ids = corpus_matrix(reference)
+        query_vectors = np.asarray(embedding_manager.embeddings.embed_documents(queries), dtype="float32")
+        exact = [exact_top_k(matrix, chunk_ids, vector, k) for vector in query_vectors]
+
+        for mode in modes:
+            result = benchmark_mode(mode, documents, queries, exact, k, embedding_manager)
+            result["num_chunks"] = size
+            results.append(result)
+            print(f"  {size:>7} {mode:<8} resident={result['index_resident_bytes'] / 1024:.0f}KB "
+                  f"recall@{k}={result['recall_at_k']:.3f} p50={result['latency']['p50_ms']:.2f}ms")
+
+    return {
+        "benchmark": "quantization",
+        "embedding_model": embedding_manager.model_name,
+        "environment": environment_info(),
+        "k": k,
+        "results": results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Memory / latency / recall of compressed vector storage")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=list(QUANTIZATION_MODES), choices=QUANTIZATION_MODES)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    write_report(run(args.sizes, args.queries, args.k, args.modes), args.output)
+
+
+if __name__ == "__main__":
+    main()
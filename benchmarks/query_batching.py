@@ -0,0 +1,68 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from langchain_core.embeddings import Embeddings
+from core.embeddings import EmbeddingManager
+from core.query_batcher import MicroBatchingEmbeddings
+from benchmarks.common import environment_info, latency_summary, timed, write_report
+from benchmarks.corpus import sample_queries, synthetic_corpus
+
+
+def load_test(embeddings: Embeddings, queries: List[str], concurrency: int) -> dict:
+    """Fire ``queries`` through ``embed_query`` from ``concurrency`` threads."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [ms for _, ms in pool.map(lambda q: timed(embeddings.embed_query, q), queries)]
+    wall_seconds = time.perf_counter() - start
+    return {
+        "queries_per_second": len(queries) / wall_seconds if wall_seconds else 0.0,
+        "latency": latency_summary(latencies),
+    }
+
+
+def run(concurrency_levels: List[int], queries_per_level: int, max_batch_size: int, max_wait_ms: float) -> dict:
+    direct = EmbeddingManager(micro_batching=False).embeddings
+    documents = synthetic_corpus(max(queries_per_level, 200))
+    report = {
+        "benchmark": "query_batching",
+        "environment": environment_info(),
+        "config": {"max_batch_size": max_batch_size, "max_wait_ms": max_wait_ms, "queries_per_level": queries_per_level},
+        "levels": {},
+    }
+
+    direct.embed_query("warm up")
+    for concurrency in concurrency_levels:
+        queries = sample_queries(documents, queries_per_level)
+        # Fresh batcher per level so its stats describe this level only
+        batched = MicroBatchingEmbeddings(direct, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+        baseline = load_test(direct, queries, concurrency)
+        result = load_test(batched, queries, concurrency)
+        result["batcher"] = batched.stats()
+        speedup = result["queries_per_second"] / baseline["queries_per_second"] if baseline["queries_per_second"] else 0.0
+
+        report["levels"][concurrency] = {"direct": baseline, "micro_batched": result, "throughput_speedup": speedup}
+        print(f"  concurrency={concurrency:<4} direct={baseline['queries_per_second']:.1f} q/s "
+              f"batched={result['queries_per_second']:.1f} q/s (x{speedup:.2f}, "
+              f"mean batch {result['batcher']['mean_batch_size']:.1f}) "
+              f"p99 {baseline['latency']['p99_ms']:.1f}ms -> {result['latency']['p99_ms']:.1f}ms")
+
+    return report
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query embedding micro-batching load test")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--queries", type=int, default=400, help="Queries per concurrency level")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = run(args.concurrency, args.queries, args.max_batch_size, args.max_wait_ms)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from core.embeddings import EmbeddingManager
+from core.vector_store import VectorStoreManager
+from tools.tavily_search import HybridSearchManager
+from benchmarks.common import current_rss_mb, environment_info, latency_summary, timed, write_report
+from benchmarks.corpus import sample_corpus, sample_queries, synthetic_corpus
+from benchmarks.fakes import FakeTavilySearchTool
+
+
+def corpus_matrix(vector_store: VectorStoreManager) -> Tuple[np.ndarray, List[str]]:
+    """
+    Pull every stored vector and its ``chunk_id`` out of the FAISS store.
+
+    Returns:
+        (matrix of shape [ntotal, dim], chunk ids in index order)
+    """
+    store = vector_store.vector_store
+    matrix = store.index.reconstruct_n(0, store.index.ntotal)
+    chunk_ids = [
+        store.docstore.search(store.index_to_docstore_id[position]).metadata["chunk_id"]
+        for position in range(store.index.ntotal)
+    ]
+    return np.asarray(matrix, dtype="float32"), chunk_ids
+
+
+def exact_top_k(matrix: np.ndarray, chunk_ids: List[str], query_vector: np.ndarray, k: int) -> List[str]:
+    """Brute-force top-k by inner product (embeddings are L2-normalised)."""
+    scores = matrix @ query_vector
+    k = min(k, len(chunk_ids))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [chunk_ids[i] for i in top]
+
+
+def recall_at_k(retrieved: List[Document], exact_ids: List[str]) -> float:
+    """Fraction of the exact top-k that the retriever returned."""
+    if not exact_ids:
+        return 1.0
+    retrieved_ids = {doc.metadata.get("chunk_id") for doc in retrieved}
+    return len(retrieved_ids.intersection(exact_ids)) / len(exact_ids)
+
+
+def index_size_bytes(vector_store: VectorStoreManager) -> int:
+    """Resident size of the index (vectors + index structures)."""
+    index = vector_store.vector_store.index
+    if hasattr(index, "memory_bytes"):
+        return sum(index.memory_bytes().values())
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def retrieval_methods(vector_store: VectorStoreManager, k: int) -> Dict[str, Callable[[str], List[Document]]]:
+    """Every retrieval path the app exposes, keyed by report name."""
+    hybrid = HybridSearchManager(vector_store, FakeTavilySearchTool())
+
+    return {
+        "search": lambda q: vector_store.search(q, k=k),
+        "search_with_scores": lambda q: [doc for doc, _ in vector_store.search_with_scores(q, k=k)],
+        "mmr": lambda q: vector_store.get_mmr_retriever(k=k).invoke(q),
+        "hybrid": lambda q: hybrid.search(q, use_web_search=True, doc_k=k)["document_results"],
+    }
+
+
+def benchmark_corpus(
+    name: str,
+    documents: List[Document],
+    queries: List[str],
+    k: int,
+    embedding_manager: EmbeddingManager,
+    warmup: int = 3
+) -> dict:
+    """
+    Index ``documents`` and measure every retrieval method against exact search.
+
+    Args:
+        name: Corpus label for the report
+        documents: Chunks to index (must carry ``chunk_id`` metadata)
+        queries: Query strings
+        k: Results per query
+        embedding_manager: Shared embedding manager
+        warmup: Untimed queries per method before measuring
+
+    Returns:
+        Report section for this corpus
+    """
+    rss_before = current_rss_mb()
+    vector_store = VectorStoreManager(embedding_manager)
+    _, build_ms = timed(vector_store.create_from_documents, documents)
+    rss_after = current_rss_mb()
+
+    matrix, chunk_ids = corpus_matrix(vector_store)
+    query_vectors = np.asarray(embedding_manager.embeddings.embed_documents(queries), dtype="float32")
+    exact = [exact_top_k(matrix, chunk_ids, vector, k) for vector in query_vectors]
+
+    embed_latencies = [timed(embedding_manager.embeddings.embed_query, q)[1] for q in queries]
+
+    methods = {}
+    for method_name, retrieve in retrieval_methods(vector_store, k).items():
+        for query in queries[:warmup]:
+            retrieve(query)
+
+        latencies, recalls = [], []
+        for query, exact_ids in zip(queries, exact):
+            docs, elapsed_ms = timed(retrieve, query)
+            latencies.append(elapsed_ms)
+            recalls.append(recall_at_k(docs, exact_ids))
+
+        methods[method_name] = {
+            "recall_at_k": sum(recalls) / len(recalls),
+            "latency": latency_summary(latencies),
+        }
+        print(f"  {name:<20} {method_name:<20} recall@{k}={methods[method_name]['recall_at_k']:.3f} "
+              f"p50={methods[method_name]['latency']['p50_ms']:.2f}ms "
+              f"p99={methods[method_name]['latency']['p99_ms']:.2f}ms")
+
+    return {
+        "corpus": name,
+        "num_chunks": len(documents),
+        "dimension": int(matrix.shape[1]),
+        "num_queries": len(queries),
+        "k": k,
+        "build_ms": build_ms,
+        "memory": {
+            "index_bytes": index_size_bytes(vector_store),
+            "raw_vector_bytes": int(matrix.nbytes),
+            "rss_delta_mb": rss_after - rss_before,
+        },
+        "embed_query_latency": latency_summary(embed_latencies),
+        "methods": methods,
+    }
+
+
+def run(sizes: List[int], num_queries: int, k: int, include_sample: bool = True) -> dict:
+    """
+    Run the retrieval benchmark over synthetic corpora and the sample files.
+
+    Args:
+        sizes: Synthetic corpus sizes (number of chunks)
+        num_queries: Queries per corpus
+        k: Results per query
+        include_sample: Also benchmark ``sample_file.txt`` + ``pdf/``
+
+    Returns:
+        Machine-readable report
+    """
+    embedding_manager = EmbeddingManager()
+    corpora = [(f"synthetic_{size}", synthetic_corpus(size)) for size in sizes]
+    if include_sample:
+        sample = sample_corpus()
+        if sample:
+            corpora.append(("sample_files", sample))
+
+    results = []
+    for name, documents in corpora:
+        queries = sample_queries(documents, num_queries)
+        results.append(benchmark_corpus(name, documents, queries, k, embedding_manager))
+
+    return {
+        "benchmark": "retrieval",
+        "embedding_model": embedding_manager.model_name,
+        "environment": environment_info(),
+        "results": results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Retrieval recall and latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000], help="Synthetic corpus sizes")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per corpus")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--no-sample", action="store_true", help="Skip sample_file.txt and pdf/")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = run(args.sizes, args.queries, args.k, include_sample=not args.no_sample)
+    report["total_seconds"] = time.perf_counter() - start
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
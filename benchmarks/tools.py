@@ -0,0 +1,119 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+import requests
+from config.settings import settings
+from benchmarks.common import environment_info, latency_summary, timed, write_report
+
+# tools_for_chat builds a Tavily client at import; no network call is made here
+settings.TAVILY_API_KEY = settings.TAVILY_API_KEY or "offline-benchmark"
+
+
+class WeatherStandIn(BaseHTTPRequestHandler):
+    """
+    Local OpenWeather-compatible endpoint.
+
+    Class attributes shape its behaviour: ``latency_ms`` per response,
+    ``fail_pattern`` (e.g. ``[503, 503, 200]`` cycles through statuses) and
+    ``requests_served`` counts hits so cache effectiveness is visible.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooling is measurable
+    latency_ms = 0.0
+    fail_pattern: List[int] = []
+    requests_served = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        with WeatherStandIn._lock:
+            index = WeatherStandIn.requests_served
+            WeatherStandIn.requests_served += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        status = self.fail_pattern[index % len(self.fail_pattern)] if self.fail_pattern else 200
+        city = parse_qs(urlparse(self.path).query).get("q", ["Nowhere"])[0]
+        body = json.dumps({
+            "name": city,
+            "sys": {"country": "XX"},
+            "main": {"temp": 21.5, "feels_like": 20.9, "humidity": 40},
+            "weather": [{"description": "clear sky"}],
+            "wind": {"speed": 3.2},
+        } if status == 200 else {"message": "unavailable"}).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def configure(latency_ms: float = 0.0, fail_pattern: List[int] = None) -> None:
+    WeatherStandIn.latency_ms = latency_ms
+    WeatherStandIn.fail_pattern = fail_pattern or []
+    WeatherStandIn.requests_served = 0
+
+
+def run(calls: int, latency_ms: float) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WeatherStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.OPENWEATHER_BASE_URL = f"http://127.0.0.1:{server.server_port}/data/2.5/weather"
+
+    from tools.tool_executor import tool_executor
+    from tools.tools_for_chat import get_weather
+
+    report = {"benchmark": "tools", "environment": environment_info(), "calls": calls, "latency_ms": latency_ms, "scenarios": {}}
+    cities = [f"City{i}" for i in range(calls)]
+
+    def record(name: str, samples: List[float], **extra):
+        report["scenarios"][name] = {"latency": latency_summary(samples), "upstream_requests": WeatherStandIn.requests_served, **extra}
+        print(f"  {name:<22} p50={report['scenarios'][name]['latency']['p50_ms']:.2f}ms "
+              f"upstream={WeatherStandIn.requests_served}")
+
+    # 1. Baseline: a new connection per call, as before
+    configure(latency_ms)
+    samples = [timed(requests.get, settings.OPENWEATHER_BASE_URL, params={"q": c}, timeout=10)[1] for c in cities]
+    record("unpooled_requests_get", samples)
+
+    # 2. Pooled session, distinct arguments (no cache hits)
+    configure(latency_ms)
+    tool_executor.clear_cache()
+    samples = [timed(get_weather.invoke, {"city": c})[1] for c in cities]
+    record("pooled_uncached", samples)
+
+    # 3. Same city repeatedly: served from the TTL cache
+    configure(latency_ms)
+    tool_executor.clear_cache()
+    samples = [timed(get_weather.invoke, {"city": "London"})[1] for _ in range(calls)]
+    record("repeated_city_cached", samples)
+
+    # 4. Flaky upstream: two 503s before every success, absorbed by retries
+    configure(latency_ms, fail_pattern=[503, 503, 200])
+    tool_executor.clear_cache()
+    results = [get_weather.invoke({"city": c}) for c in cities[:10]]
+    record("flaky_upstream", [], errors=sum(r.startswith("Error") for r in results))
+
+    report["tool_stats"] = tool_executor.stats()
+    server.shutdown()
+    return report
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Tool execution layer against a local HTTP stand-in")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated upstream latency")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    write_report(run(args.calls, args.latency_ms), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,74 @@ class Settings:
     LLM_TEMPERATURE:float = float(os.getenv('LLM_TEMPERATURE'))
     FAISS_INDEX_PATH:str=os.getenv('FAISS_INDEX_PATH')
     TOP_K_RESULTS:int= int(os.getenv('TOP_K_RESULTS'))
+    WARM_START:bool = os.getenv('WARM_START', 'true').lower() == 'true'
+    AUTO_SAVE_INDEX:bool = os.getenv('AUTO_SAVE_INDEX', 'true').lower() == 'true'
+    SESSION_INDEX_DIR:str = os.getenv('SESSION_INDEX_DIR', 'data/sessions')
+    TELEMETRY_ENABLED:bool = os.getenv('TELEMETRY_ENABLED', 'false').lower() == 'true'
+    PROFILE_MODE:str = os.getenv('PROFILE_MODE', 'off')
+    PROFILE_SAMPLE_RATE:float = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_DIR:str = os.getenv('PROFILE_DIR', 'data/profiles')
+    VECTOR_QUANTIZATION:str = os.getenv('VECTOR_QUANTIZATION', 'none')
+    QUANTIZATION_RESCORE_FACTOR:int = int(os.getenv('QUANTIZATION_RESCORE_FACTOR', '4'))
+    EMBEDDING_BACKEND:str = os.getenv('EMBEDDING_BACKEND', 'torch')
+    ONNX_MODEL_DIR:str = os.getenv('ONNX_MODEL_DIR', 'data/onnx')
+    ONNX_INTRA_OP_THREADS:int = int(os.getenv('ONNX_INTRA_OP_THREADS', '0'))
+    EMBEDDING_REDUCTION:str = os.getenv('EMBEDDING_REDUCTION', 'none')
+    EMBEDDING_TARGET_DIM:int = int(os.getenv('EMBEDDING_TARGET_DIM', '0'))
+    FILTERABLE_METADATA_FIELDS:tuple = tuple(os.getenv('FILTERABLE_METADATA_FIELDS', 'source,page,upload_batch,tags').split(','))
+    FILTER_BRUTE_FORCE_MAX:int = int(os.getenv('FILTER_BRUTE_FORCE_MAX', '10000'))
+    TENANT_STORE_DIR:str = os.getenv('TENANT_STORE_DIR', 'data/tenants')
+    TENANT_MAX_RESIDENT:int = int(os.getenv('TENANT_MAX_RESIDENT', '64'))
+    # Opt-in: tenant views have no small-to-big expansion, deletes, versions or dimension reduction yet
+    TENANT_STORE:bool = os.getenv('TENANT_STORE', 'false').lower() == 'true'
+    TENANT_SHARED_NAMESPACES:tuple = tuple(n for n in os.getenv('TENANT_SHARED_NAMESPACES', '').split(',') if n)
+    QUERY_MICRO_BATCHING:bool = os.getenv('QUERY_MICRO_BATCHING', 'false').lower() == 'true'
+    QUERY_BATCH_MAX_SIZE:int = int(os.getenv('QUERY_BATCH_MAX_SIZE', '32'))
+    QUERY_BATCH_MAX_WAIT_MS:float = float(os.getenv('QUERY_BATCH_MAX_WAIT_MS', '2'))
+    QUERY_ROUTING:bool = os.getenv('QUERY_ROUTING', 'true').lower() == 'true'
+    OPENWEATHER_BASE_URL:str = os.getenv('OPENWEATHER_BASE_URL', 'https://api.openweathermap.org/data/2.5/weather')
+    TOOL_TIMEOUT_SECONDS:float = float(os.getenv('TOOL_TIMEOUT_SECONDS', '10'))
+    TOOL_MAX_RETRIES:int = int(os.getenv('TOOL_MAX_RETRIES', '2'))
+    TOOL_HTTP_POOL_SIZE:int = int(os.getenv('TOOL_HTTP_POOL_SIZE', '16'))
+    WEATHER_CACHE_TTL:float = float(os.getenv('WEATHER_CACHE_TTL', '600'))
+    WEB_SEARCH_CACHE_TTL:float = float(os.getenv('WEB_SEARCH_CACHE_TTL', '300'))
+    AGENT_MAX_PARALLEL_TOOLS:int = int(os.getenv('AGENT_MAX_PARALLEL_TOOLS', '8'))
+    ADAPTIVE_K:bool = os.getenv('ADAPTIVE_K', 'false').lower() == 'true'
+    ADAPTIVE_K_MIN:int = int(os.getenv('ADAPTIVE_K_MIN', '1'))
+    ADAPTIVE_K_MAX:int = int(os.getenv('ADAPTIVE_K_MAX', '8'))
+    ADAPTIVE_MIN_SIMILARITY:float = float(os.getenv('ADAPTIVE_MIN_SIMILARITY', '0.3'))
+    ADAPTIVE_SCORE_GAP:float = float(os.getenv('ADAPTIVE_SCORE_GAP', '0.1'))
+    SMALL_TO_BIG_WINDOW:int = int(os.getenv('SMALL_TO_BIG_WINDOW', '0'))
+    SMALL_TO_BIG_EXPAND:str = os.getenv('SMALL_TO_BIG_EXPAND', 'window')
+    SMALL_TO_BIG_MAX_CHUNKS:int = int(os.getenv('SMALL_TO_BIG_MAX_CHUNKS', '8'))
+    TOKENIZER_ENCODING:str = os.getenv('TOKENIZER_ENCODING', 'cl100k_base')
+    TOKEN_BUDGET_PER_TURN:int = int(os.getenv('TOKEN_BUDGET_PER_TURN', '0'))
+    TOKEN_BUDGET_PER_SESSION:int = int(os.getenv('TOKEN_BUDGET_PER_SESSION', '0'))
+    TOKEN_COMPLETION_RESERVE:int = int(os.getenv('TOKEN_COMPLETION_RESERVE', '1024'))
+    TOKEN_USAGE_MAX_SESSIONS:int = int(os.getenv('TOKEN_USAGE_MAX_SESSIONS', '10000'))
+    LLM_INPUT_COST_PER_1K:float = float(os.getenv('LLM_INPUT_COST_PER_1K', '0'))
+    LLM_OUTPUT_COST_PER_1K:float = float(os.getenv('LLM_OUTPUT_COST_PER_1K', '0'))
+    STREAM_COALESCE:bool = os.getenv('STREAM_COALESCE', 'true').lower() == 'true'
+    STREAM_FLUSH_INTERVAL_MS:float = float(os.getenv('STREAM_FLUSH_INTERVAL_MS', '50'))
+    STREAM_FLUSH_CHARS:int = int(os.getenv('STREAM_FLUSH_CHARS', '256'))
+    SEGMENTED_INDEX:bool = os.getenv('SEGMENTED_INDEX', 'true').lower() == 'true'
+    INDEX_COMPACT_MAX_SEGMENTS:int = int(os.getenv('INDEX_COMPACT_MAX_SEGMENTS', '8'))
+    INDEX_COMPACT_TOMBSTONE_RATIO:float = float(os.getenv('INDEX_COMPACT_TOMBSTONE_RATIO', '0.2'))
+    INDEX_KEEP_VERSIONS:int = int(os.getenv('INDEX_KEEP_VERSIONS', '5'))
+    CHAT_HISTORY_PAGE_SIZE:int = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', '20'))
+    CHAT_HISTORY_PERSIST:bool = os.getenv('CHAT_HISTORY_PERSIST', 'true').lower() == 'true'
+    CHAT_HISTORY_DB:str = os.getenv('CHAT_HISTORY_DB', 'data/database/chatbot.db')
+    AGENT_CHECKPOINT_DB:str = os.getenv('AGENT_CHECKPOINT_DB', 'data/database/chatbot.db')
+    INGEST_WORKERS:int = int(os.getenv('INGEST_WORKERS', '2'))
+    INGEST_EMBED_BATCH_SIZE:int = int(os.getenv('INGEST_EMBED_BATCH_SIZE', '64'))
+    API_HOST:str = os.getenv('API_HOST', '127.0.0.1')
+    API_PORT:int = int(os.getenv('API_PORT', '8000'))
+    API_CPU_WORKERS:int = int(os.getenv('API_CPU_WORKERS', str(os.cpu_count() or 4)))
+    API_MAX_INFLIGHT:int = int(os.getenv('API_MAX_INFLIGHT', '32'))
+    API_MAX_QUEUED:int = int(os.getenv('API_MAX_QUEUED', '64'))
+    API_INGEST_CONCURRENCY:int = int(os.getenv('API_INGEST_CONCURRENCY', '2'))
+    API_STREAM_BUFFER:int = int(os.getenv('API_STREAM_BUFFER', '64'))
+    API_REQUEST_TIMEOUT:float = float(os.getenv('API_REQUEST_TIMEOUT', '60'))
 
     def validate(self) -> bool:
 
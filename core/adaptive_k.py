@@ -0,0 +1,167 @@
+import threading
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Dict, List, Sequence, Tuple
+from langchain_core.documents import Document
+from config.settings import settings
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def similarity(distance: float) -> float:
+    """Cosine similarity from the squared L2 distance of normalized vectors."""
+    return 1.0 - float(distance) / 2.0
+
+
+@dataclass(frozen=True)
+class KPolicy:
+    """
+    How many retrieved documents are worth sending to the LLM.
+
+    Candidates below ``min_similarity`` are dropped, the list is cut at
+    the largest drop between consecutive similarities when that drop is at
+    least ``score_gap``, and the result is clamped to ``[min_k, max_k]``.
+    """
+
+    min_k: int = 1
+    max_k: int = 8
+    min_similarity: float = 0.3
+    score_gap: float = 0.1
+
+
+def default_policies() -> Dict[str, KPolicy]:
+    """Per-mode policies derived from settings."""
+    base = KPolicy(
+        min_k=settings.ADAPTIVE_K_MIN,
+        max_k=settings.ADAPTIVE_K_MAX,
+        min_similarity=settings.ADAPTIVE_MIN_SIMILARITY,
+        score_gap=settings.ADAPTIVE_SCORE_GAP
+    )
+    return {
+        "similarity": base,
+        # MMR needs a few candidates to diversify over
+        "mmr": replace(base, min_k=max(base.min_k, 2)),
+        # Every summarized document costs an LLM call
+        "summaries": replace(base, max_k=min(base.max_k, 3), min_similarity=base.min_similarity + 0.1),
+    }
+
+
+class _ModeStats:
+    __slots__ = ("requests", "selected", "candidates", "tokens_sent", "tokens_saved", "cutoffs")
+
+    def __init__(self):
+        self.requests = 0
+        self.selected = 0
+        self.candidates = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+        self.cutoffs: Counter = Counter()
+
+    def to_dict(self) -> dict:
+        requests = self.requests or 1
+        return {
+            "requests": self.requests,
+            "avg_k": round(self.selected / requests, 3),
+            "avg_candidates": round(self.candidates / requests, 3),
+            "tokens_sent": self.tokens_sent,
+            "tokens_saved": self.tokens_saved,
+            "cutoffs": dict(self.cutoffs),
+        }
+
+
+class AdaptiveK:
+    """
+    Adaptive top-k on top of ``search_with_scores``.
+
+    ``select`` trims a ranked candidate list per the mode's ``KPolicy`` and
+    records, per mode, the average k and the prompt tokens saved compared
+    with always sending the fixed ``baseline_k`` documents.
+    """
+
+    def __init__(self, policies: Dict[str, KPolicy] = None):
+        """
+        Initialize the selector.
+
+        Args:
+            policies: Mode -> policy overrides, merged over ``default_policies()``
+        """
+        self.policies = {**default_policies(), **(policies or {})}
+        self._stats: Dict[str, _ModeStats] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, mode: str) -> KPolicy:
+        if mode not in self.policies:
+            raise ValueError(f"No adaptive-k policy for mode '{mode}'. Known modes: {sorted(self.policies)}")
+        return self.policies[mode]
+
+    @staticmethod
+    def cutoff(similarities: Sequence[float], policy: KPolicy) -> Tuple[int, str]:
+        """
+        Number of leading candidates to keep and why the list was cut.
+
+        Reasons: ``threshold``, ``gap``, ``max_k``, ``min_k`` or ``all``.
+        """
+        limit = min(len(similarities), policy.max_k)
+        reason = "max_k" if len(similarities) > policy.max_k else "all"
+
+        keep = limit
+        for i in range(limit):
+            if similarities[i] < policy.min_similarity:
+                keep, reason = i, "threshold"
+                break
+
+        if keep >= 2:
+            gaps = [similarities[i] - similarities[i + 1] for i in range(keep - 1)]
+            largest = max(range(len(gaps)), key=gaps.__getitem__)
+            if gaps[largest] >= policy.score_gap:
+                keep, reason = largest + 1, "gap"
+
+        if keep < min(policy.min_k, len(similarities)):
+            keep, reason = min(policy.min_k, len(similarities)), "min_k"
+        return keep, reason
+
+    def select(
+        self,
+        mode: str,
+        scored: List[Tuple[Document, float]],
+        baseline_k: int = None
+    ) -> List[Document]:
+        """
+        Keep the candidates worth sending for ``mode``.
+
+        Args:
+            mode: Retrieval mode ('similarity', 'mmr', 'summaries')
+            scored: (Document, squared L2 distance) pairs, best first
+            baseline_k: Fixed k the savings are measured against
+                (settings.TOP_K_RESULTS)
+
+        Returns:
+            Selected documents, best first
+        """
+        policy = self.policy(mode)
+        baseline_k = baseline_k or settings.TOP_K_RESULTS
+        keep, reason = self.cutoff([similarity(distance) for _, distance in scored], policy)
+        documents = [doc for doc, _ in scored[:keep]]
+
+        sent = sum(estimate_tokens(doc.page_content) for doc in documents)
+        baseline = sum(estimate_tokens(doc.page_content) for doc, _ in scored[:baseline_k])
+        with self._lock:
+            stats = self._stats.setdefault(mode, _ModeStats())
+            stats.requests += 1
+            stats.selected += keep
+            stats.candidates += len(scored)
+            stats.tokens_sent += sent
+            stats.tokens_saved += baseline - sent
+            stats.cutoffs[reason] += 1
+        return documents
+
+    def stats(self) -> dict:
+        """Per-mode average k, tokens sent/saved and cutoff reasons."""
+        with self._lock:
+            return {mode: stats.to_dict() for mode, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
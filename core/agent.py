@@ -4,9 +4,11 @@ from langgraph.checkpoint.sqlite import SqliteSaver
 import sqlite3
 import os
 from config.settings import settings
-from langchain_core.messages import HumanMessage , AIMessageChunk
+from langchain_core.messages import HumanMessage , AIMessage , AIMessageChunk
 from typing import List ,Generator
 from langchain_core.tools import tool
+from core.telemetry import telemetry
+from core.token_budget import Turn, usage_tracker
 
 class AgentManager:
 
@@ -16,9 +18,6 @@ class AgentManager:
     Provides conversational agent with tool calling capabilities
     and persistent memory across conversations.
     """
-    # Create the directory structure if it doesn't exist
-    os.makedirs('data/database', exist_ok=True)
-
     def __init__(self , model_name : str = None):
         """
         Initialize agent manager.
@@ -34,7 +33,11 @@ class AgentManager:
             api_key= settings.GROQ_API_KEY,
             streaming=True
         )
-        self._conn = sqlite3.connect(database="data/database/chatbot.db" , check_same_thread= False)
+        # Create the directory structure if it doesn't exist
+        directory = os.path.dirname(settings.AGENT_CHECKPOINT_DB)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(database=settings.AGENT_CHECKPOINT_DB , check_same_thread= False)
         self.checkpointer : SqliteSaver = SqliteSaver(conn=self._conn)
         self._agent = None
 
@@ -72,33 +75,67 @@ class AgentManager:
         
         return self._agent
     
-    def get_response(self,query :str, thread_id :str) -> str:
+    def _run_config(self, thread_id :str) -> dict:
+        """
+        Graph config for one turn.
+
+        The tool node fans the tool calls of a step out over an executor
+        bounded by ``max_concurrency`` and returns their messages in call
+        order, so a multi-tool step takes as long as its slowest tool.
+        Tools run in the node's own threads, with the run's callbacks;
+        network tools are time-limited per attempt by ``tool_executor``.
+        """
+        return {
+            "configurable": {"thread_id": thread_id},
+            "max_concurrency": settings.AGENT_MAX_PARALLEL_TOOLS
+        }
+
+    def get_response(self,query :str, thread_id :str, session_id :str = None) -> str:
         """
         Get non-streaming response from agent.
         
         Args:
             query: User's question
             thread_id: Thread ID for conversation memory
+            session_id: Session the tokens are billed to (the thread by default)
             
         Returns:
             Agent's response text
             
         Raises:
             ValueError: If agent is not initialized
+            BudgetExceeded: If the request or session is over budget
         """
 
         if not self.is_initialized :
             raise ValueError("Agent is not initialized. Call agent_initialization() first.")
         
-        config={"configurable": {"thread_id": thread_id}}
+        config=self._run_config(thread_id)
+
+        with usage_tracker.begin(session_id or thread_id, "agent", query) as turn, telemetry.span("agent_turn", thread_id=thread_id):
+            response = self._agent.invoke({"messages": [HumanMessage(content=query)]},config=config)
 
-        response = self._agent.invoke({"messages": [HumanMessage(content=query)]},config=config)
+            # Every model call of this turn (one per tool round) comes after our message
+            for message in reversed(response['messages']):
+                if isinstance(message, HumanMessage):
+                    break
+                if isinstance(message, AIMessage):
+                    turn.observe(message)
 
         result = response['messages'][-1].content
 
         return result
     
-    def get_response_stream(self,query :str , thread_id :str) -> Generator[str, None, None]:
+    def begin_turn(self, query :str, thread_id :str, session_id :str = None) -> Turn:
+        """
+        Check token budgets for an agent turn.
+
+        Raises:
+            BudgetExceeded: If the request or session is over budget
+        """
+        return usage_tracker.begin(session_id or thread_id, "agent", query)
+
+    def get_response_stream(self,query :str , thread_id :str, session_id :str = None, turn :Turn = None) -> Generator[str, None, None]:
 
         """
         Get streaming response from agent.
@@ -106,27 +143,33 @@ class AgentManager:
         Args:
             query: User's question
             thread_id: Thread ID for conversation memory
+            session_id: Session the tokens are billed to (the thread by default)
+            turn: Turn from ``begin_turn`` (begun on first iteration otherwise)
             
         Yields:
             Response chunks as they're generated
             
         Raises:
             ValueError: If agent is not initialized
+            BudgetExceeded: If the request or session is over budget
         """
 
 
         if not self.is_initialized:
             raise ValueError("Agent is not initialized. Call agent_initialization() first.")
         
-        config={"configurable": {"thread_id": thread_id}}
+        config=self._run_config(thread_id)
     
-        response = self._agent.stream({"messages": [HumanMessage(content=query)]},config=config , stream_mode='messages')
+        with turn or self.begin_turn(query, thread_id, session_id) as turn:
+            response = self._agent.stream({"messages": [HumanMessage(content=query)]},config=config , stream_mode='messages')
 
-        for chunk in response:
+            for chunk in telemetry.trace_stream(response, "agent"):
 
-            if isinstance(chunk[0] , AIMessageChunk) and chunk[0].content :
+                if isinstance(chunk[0] , AIMessageChunk):
+                    turn.observe(chunk[0])
 
-                yield chunk[0].content
+                    if chunk[0].content :
+                        yield chunk[0].content
     
 
 
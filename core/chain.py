@@ -2,9 +2,13 @@ from core.vector_store import VectorStoreManager
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.documents import Document
-from typing import List , Generator
+from langchain_core.language_models import BaseChatModel
+from typing import Dict, List , Generator
 from langchain_groq import ChatGroq
 from config.settings import settings
+from core.telemetry import telemetry
+from core.adaptive_k import AdaptiveK, KPolicy
+from core.token_budget import Turn, UsageTracker, usage_tracker
 
 RAG_PROMPT_TEMPLATE = """You are a helpful AI assistant. Use the following context to answer the user's question.
 If the context doesn't contain relevant information, say so and provide what help you can.
@@ -22,23 +26,35 @@ class RAGchain:
         self , 
         vectorstoremanager : VectorStoreManager = None,
         model_name : str = None,
-        temperature : float = None):
+        temperature : float = None,
+        llm : BaseChatModel = None,
+        adaptive_k : bool = None,
+        k_policies : Dict[str, KPolicy] = None,
+        usage : UsageTracker = None):
 
         self.vector_store = vectorstoremanager or VectorStoreManager()
         self.model_name = model_name or settings.LLM_MODEL 
 
         self.temperature = temperature or settings.LLM_TEMPERATURE
-        self._llm = ChatGroq(
+        # Any LangChain chat model can be injected (e.g. a local stand-in for load tests)
+        self._llm = llm or ChatGroq(
             model= self.model_name ,
             temperature= self.temperature,
             api_key= settings.GROQ_API_KEY
         )
 
+        # Send only the documents that clear the per-mode relevance policy
+        self.adaptive_k = settings.ADAPTIVE_K if adaptive_k is None else adaptive_k
+        self.k_selector = AdaptiveK(k_policies)
+
+        # Token accounting and budgets (process-wide tracker by default)
+        self.usage = usage or usage_tracker
+
         self._prompt = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
         self._output_parser = StrOutputParser()
     
     @property
-    def llm(self) -> ChatGroq:
+    def llm(self) -> BaseChatModel:
         """Get the LLM instance."""
         return self._llm
     
@@ -57,39 +73,57 @@ class RAGchain:
         if not documents:
             return "No relevant context found." 
         
-        context_parts = []
+        with telemetry.span("format", documents=len(documents)):
+            context_parts = []
 
-        for index , doc in enumerate(documents , start= 1 ) :
-            context_source = doc.metadata.get("source" , "Unknown")
-            context_parts.append(f"[Document {index}] (Source: {context_source})\n{doc.page_content}")
-        
-        return "\n\n".join(context_parts)
+            for index , doc in enumerate(documents , start= 1 ) :
+                context_source = doc.metadata.get("source" , "Unknown")
+                context_parts.append(f"[Document {index}] (Source: {context_source})\n{doc.page_content}")
+            
+            return "\n\n".join(context_parts)
 
-    def retrieve(self, query: str, k: int = None) -> List[Document]:
+    def retrieve(self, query: str, k: int = None, filter: dict = None, window: int = None) -> List[Document]:
         """
         Retrieve relevant documents for a query.
         
         Args:
             query: User's question
             k: Number of documents to retrieve
+            filter: Optional metadata filter, e.g. ``{"source": "report.pdf"}``
+            window: Expand each hit with this many neighbouring chunks per
+                side (small-to-big); 0 returns the chunks alone. Defaults
+                to settings.SMALL_TO_BIG_WINDOW
             
         Returns:
-            List of relevant documents
+            List of relevant documents (with adaptive k, between the
+            policy's min_k and max_k, capped by ``k``)
         """
     
         if not self.vector_store .is_initialized:
             return []
-        
-        return self.vector_store.search(query, k=k)
+
+        if self.adaptive_k:
+            scored = self.vector_store.search_with_scores(
+                query, k=k or self.k_selector.policy("similarity").max_k, filter=filter
+            )
+            documents = self.k_selector.select("similarity", scored, baseline_k=k)
+        else:
+            documents = self.vector_store.search(query, k=k, filter=filter)
+
+        window = settings.SMALL_TO_BIG_WINDOW if window is None else window
+        if window > 0:
+            return self.vector_store.expand_hits(documents, window=window)
+        return documents
     
     
-    def retrieve_mmr(self, query: str, k: int = None) -> List[Document]:
+    def retrieve_mmr(self, query: str, k: int = None, filter: dict = None) -> List[Document]:
         """
         Retrieve relevant documents for a query.
         
         Args:
             query: User's question
             k: Number of documents to retrieve
+            filter: Optional metadata filter, e.g. ``{"source": "report.pdf"}``
             
         Returns:
             List of relevant documents
@@ -97,62 +131,103 @@ class RAGchain:
     
         if not self.vector_store .is_initialized:
             return []
+
+        if self.adaptive_k:
+            # Relevance decides how many; MMR decides which
+            query_vector = self.vector_store.embed_query(query)
+            scored = self.vector_store.search_with_scores_by_vector(
+                query_vector, k=k or self.k_selector.policy("mmr").max_k, filter=filter
+            )
+            selected = self.k_selector.select("mmr", scored, baseline_k=k)
+            if not selected:
+                return []
+            # The selection is the top of the ranking, so fetching exactly that many
+            # keeps MMR to candidates that passed the threshold
+            reranked = self.vector_store.mmr_search_by_vector(
+                query_vector, k=len(selected), fetch_k=len(selected), filter=filter
+            )
+            allowed = {doc.id for doc in selected}
+            return [doc for doc in reranked if doc.id in allowed]
         
-        retriever = self.vector_store.get_mmr_retriever(k=k)
-        top_k_documents = retriever.invoke(query)
+        return self.vector_store.mmr_search(query, k=k, filter=filter)
+
+    def begin_turn(self, query: str, context: str, session_id: str = None) -> Turn:
+        """
+        Check token budgets and fit the context before calling the LLM.
 
-        return top_k_documents
+        Raises:
+            BudgetExceeded: If the request or session is over budget
+        """
+        prompt = self._prompt.format(context="", question=query)
+        return self.usage.begin(session_id, "rag", prompt, context)
 
-    def generate(self, query: str, context: str) -> str:
+    def generate(self, query: str, context: str, session_id: str = None) -> str:
         """
         Generate a response given query and context.
         
         Args:
             query: User's question
-            context: Retrieved context string
+            context: Retrieved context string (trimmed to the token budget)
+            session_id: Session the tokens are billed to
             
         Returns:
             Generated response
+
+        Raises:
+            BudgetExceeded: If the request or session is over budget
         """
-        # Create the chain: prompt -> llm -> parser
-        chain = self._prompt | self._llm | self._output_parser
+        # The parser runs after the model so its usage metadata can be read
+        chain = self._prompt | self._llm
         
         # Invoke the chain
-        response = chain.invoke({
-            "context": context,
-            "question": query
-        })
+        with self.begin_turn(query, context, session_id) as turn, telemetry.span("llm_generate"):
+            message = chain.invoke({
+                "context": turn.context,
+                "question": query
+            })
+            turn.observe(message)
 
-        return response
+        return self._output_parser.invoke(message)
     
-    def generate_stream(self, query: str, context: str) -> Generator[str, None, None]:
+    def generate_stream(self, query: str, context: str, session_id: str = None, turn: Turn = None) -> Generator[str, None, None]:
         """
         Generate a streaming response.
         
         Args:
             query: User's question
-            context: Retrieved context string
+            context: Retrieved context string (trimmed to the token budget)
+            session_id: Session the tokens are billed to
+            turn: Turn from ``begin_turn``, so budgets can be checked before
+                the stream is handed out (begun on first iteration otherwise)
             
         Yields:
             Response chunks as they're generated
+
+        Raises:
+            BudgetExceeded: If the request or session is over budget
         """
         # Create the chain
-        chain = self._prompt | self._llm | self._output_parser
+        chain = self._prompt | self._llm
         
         # Stream the response
-        for chunk in chain.stream({
-            "context": context,
-            "question": query
-        }):
-            yield chunk
+        with turn or self.begin_turn(query, context, session_id) as turn:
+            stream = chain.stream({
+                "context": turn.context,
+                "question": query
+            })
+            for chunk in telemetry.trace_stream(stream, "llm"):
+                turn.observe(chunk)
+                if chunk.content:
+                    yield chunk.content
     
-    def query(self, question: str, k: int = None) -> dict:
+    def query(self, question: str, k: int = None, session_id: str = None) -> dict:
         """
         Complete RAG pipeline: retrieve and generate.
         
         Args:
             question: User's question
             k: Number of documents to retrieve
+            session_id: Session the tokens are billed to
             
         Returns:
             Dictionary with 'answer', 'sources', and 'context'
@@ -164,7 +239,7 @@ class RAGchain:
         context = self._format_context(documents)
         
         # Step 3: Generate response
-        answer = self.generate(question, context)
+        answer = self.generate(question, context, session_id=session_id)
         
         # Extract sources
         sources = [doc.metadata.get("source", "Unknown") for doc in documents]
@@ -176,13 +251,14 @@ class RAGchain:
             "documents": documents
         }
     
-    def query_mmr(self, question: str, k: int = None) -> dict:
+    def query_mmr(self, question: str, k: int = None, session_id: str = None) -> dict:
         """
         Complete RAG pipeline: retrieve and generate.
         
         Args:
             question: User's question
             k: Number of documents to retrieve
+            session_id: Session the tokens are billed to
             
         Returns:
             Dictionary with 'answer', 'sources', and 'context'
@@ -194,7 +270,7 @@ class RAGchain:
         context = self._format_context(documents)
         
         # Step 3: Generate response
-        answer = self.generate(question, context)
+        answer = self.generate(question, context, session_id=session_id)
         
         # Extract sources
         sources = [doc.metadata.get("source", "Unknown") for doc in documents]
@@ -206,13 +282,14 @@ class RAGchain:
             "documents": documents
         }
 
-    def query_stream(self, question: str, k: int = None) -> Generator[str, None, None]:
+    def query_stream(self, question: str, k: int = None, session_id: str = None) -> Generator[str, None, None]:
         """
         Complete RAG pipeline with streaming response.
         
         Args:
             question: User's question
             k: Number of documents to retrieve
+            session_id: Session the tokens are billed to
             
         Yields:
             Response chunks as they're generated
@@ -224,16 +301,17 @@ class RAGchain:
         context = self._format_context(documents)
         
         # Step 3: Stream response
-        for chunk in self.generate_stream(question, context):
+        for chunk in self.generate_stream(question, context, session_id=session_id):
             yield chunk
 
-    def query_stream_mmr(self, question: str, k: int = None) -> Generator[str, None, None]:
+    def query_stream_mmr(self, question: str, k: int = None, session_id: str = None) -> Generator[str, None, None]:
         """
         Complete RAG pipeline with streaming response.
         
         Args:
             question: User's question
             k: Number of documents to retrieve
+            session_id: Session the tokens are billed to
             
         Yields:
             Response chunks as they're generated
@@ -245,17 +323,18 @@ class RAGchain:
         context = self._format_context(documents)
         
         # Step 3: Stream response
-        for chunk in self.generate_stream(question, context):
+        for chunk in self.generate_stream(question, context, session_id=session_id):
             yield chunk
 
     
-    def get_document_summaries(self, query: str, k: int = 3) -> dict:
+    def get_document_summaries(self, query: str, k: int = 3, session_id: str = None) -> dict:
         """
         Get summaries of top-N relevant documents.
         
         Args:
             query: User's question
             k: Number of documents to summarize
+            session_id: Session the tokens are billed to
             
         Returns:
             Dictionary with document summaries
@@ -263,8 +342,12 @@ class RAGchain:
         if not self.vector_store.is_initialized:
             return {"summaries": [], "message": "No documents available"}
         
-        # Retrieve top documents
-        documents = self.vector_store.search(query, k=k)
+        # Retrieve top documents; with adaptive k weak matches are not summarized
+        if self.adaptive_k:
+            scored = self.vector_store.search_with_scores(query, k=k)
+            documents = self.k_selector.select("summaries", scored, baseline_k=k)
+        else:
+            documents = self.vector_store.search(query, k=k)
         
         summaries = []
         
@@ -274,8 +357,11 @@ class RAGchain:
                 "Summarize this document chunk in 2-3 sentences:\n\n{content}\n\nSummary:"
             )
             
-            chain = summary_prompt | self._llm | self._output_parser
-            summary = chain.invoke({"content": doc.page_content})
+            chain = summary_prompt | self._llm
+            with self.usage.begin(session_id, "summary", summary_prompt.format(content=""), doc.page_content) as turn:
+                message = chain.invoke({"content": turn.context})
+                turn.observe(message)
+            summary = self._output_parser.invoke(message)
             
             summaries.append({
                 "rank": i,
@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from config.settings import settings
+
+
+class ChatMessage(NamedTuple):
+    """One rendered chat message; sources are stored as a tuple of labels."""
+
+    role: str
+    content: str
+    sources: Tuple[str, ...] = ()
+
+
+class ChatHistoryStore:
+    """
+    SQLite session store for chat transcripts, one row per message.
+
+    Rows are keyed by ``(thread_id, seq)`` so a window of a thread is a
+    single range scan. ``seq`` is assigned by the database, so two tabs
+    appending to the same thread never overwrite each other. The connection is opened on first use and shared
+    by all Streamlit sessions behind a lock.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.CHAT_HISTORY_DB
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS chat_messages ("
+                    "thread_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, "
+                    "content TEXT NOT NULL, sources TEXT, PRIMARY KEY (thread_id, seq)) WITHOUT ROWID"
+                )
+                conn.commit()
+                self._conn = conn
+            return self._conn
+
+    def count(self, thread_id: str) -> int:
+        conn = self.conn
+        with self._lock:
+            row = conn.execute("SELECT COUNT(*) FROM chat_messages WHERE thread_id = ?", (thread_id,)).fetchone()
+        return row[0]
+
+    def append(self, thread_id: str, message: ChatMessage) -> int:
+        """Store a message after the thread's last one and return its seq."""
+        sources = json.dumps(list(message.sources)) if message.sources else None
+        conn = self.conn
+        with self._lock:
+            # IMMEDIATE takes the write lock before reading MAX(seq), so
+            # other processes cannot pick the same seq
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (seq,) = conn.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM chat_messages WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO chat_messages (thread_id, seq, role, content, sources) VALUES (?, ?, ?, ?, ?)",
+                    (thread_id, seq, message.role, message.content, sources)
+                )
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        return seq
+
+    def load(self, thread_id: str, start: int, stop: int) -> List[ChatMessage]:
+        """Messages ``start <= seq < stop`` of a thread, oldest first."""
+        conn = self.conn
+        with self._lock:
+            rows = conn.execute(
+                "SELECT role, content, sources FROM chat_messages WHERE thread_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (thread_id, start, stop)
+            ).fetchall()
+        return [ChatMessage(role, content, tuple(json.loads(sources)) if sources else ()) for role, content, sources in rows]
+
+    def clear(self, thread_id: str) -> None:
+        conn = self.conn
+        with self._lock:
+            conn.execute("DELETE FROM chat_messages WHERE thread_id = ?", (thread_id,))
+            conn.commit()
+
+
+def checkpoint_messages(checkpointer, thread_id: str) -> List[ChatMessage]:
+    """
+    User and assistant messages of an agent thread, read from its latest
+    LangGraph checkpoint. Tool calls and tool results are skipped.
+    """
+    checkpoint = checkpointer.get_tuple({"configurable": {"thread_id": thread_id}})
+    if checkpoint is None:
+        return []
+
+    messages = []
+    for message in checkpoint.checkpoint.get("channel_values", {}).get("messages", []):
+        content = message.content
+        if not isinstance(content, str):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        if not content:
+            continue
+        if message.type == "human":
+            messages.append(ChatMessage("user", content))
+        elif message.type == "ai":
+            messages.append(ChatMessage("assistant", content))
+    return messages
+
+
+class ChatHistory:
+    """
+    Append-only transcript of one chat thread with windowed reads.
+
+    With a store, only the last window (the ``count`` of the latest
+    ``window`` call) is kept in memory; older messages are read from the
+    store when a window reaches back to them, so a long thread does not
+    load or accumulate all of it. Without a store everything stays in
+    memory.
+    """
+
+    def __init__(self, thread_id: str, store: ChatHistoryStore = None):
+        self.thread_id = thread_id
+        self.store = store
+        self._length = store.count(thread_id) if store is not None else 0
+        # Messages [_start, _length) are in memory
+        self._start = self._length
+        self._messages: List[ChatMessage] = []
+        self._keep = settings.CHAT_HISTORY_PAGE_SIZE
+
+    @classmethod
+    def load(cls, thread_id: str, store: ChatHistoryStore = None, checkpointer=None) -> "ChatHistory":
+        """
+        Open a thread's history, importing it from the agent checkpoint
+        when the store has nothing for it yet.
+        """
+        history = cls(thread_id, store)
+        if not len(history) and checkpointer is not None:
+            history.extend(checkpoint_messages(checkpointer, thread_id))
+        return history
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, role: str, content: str, sources: Iterable[str] = None) -> ChatMessage:
+        message = ChatMessage(role, content, tuple(sources or ()))
+        if self.store is not None:
+            seq = self.store.append(self.thread_id, message)
+            if seq != self._length:
+                # Another tab wrote to the thread; its messages are read from the store
+                self._messages = []
+                self._start = self._length = seq
+        self._messages.append(message)
+        self._length += 1
+        self._trim()
+        return message
+
+    def _trim(self) -> None:
+        # Messages before the window are dropped; the store still has them
+        excess = len(self._messages) - self._keep
+        if self.store is not None and excess > 0:
+            del self._messages[:excess]
+            self._start += excess
+
+    def extend(self, messages: Iterable[ChatMessage]) -> None:
+        for message in messages:
+            self.append(*message)
+
+    def window(self, count: int) -> Tuple[int, List[ChatMessage]]:
+        """
+        The latest ``count`` messages.
+
+        Returns:
+            (index of the first returned message, messages oldest first)
+        """
+        self._keep = count
+        start = max(0, self._length - count)
+        if start < self._start:
+            older = self.store.load(self.thread_id, start, self._start) if self.store is not None else []
+            self._messages[:0] = older
+            self._start -= len(older)
+            start = max(start, self._start)
+        self._trim()
+        return start, self._messages[start - self._start:]
+
+    def clear(self) -> None:
+        if self.store is not None:
+            self.store.clear(self.thread_id)
+        self._messages = []
+        self._length = self._start = 0
+
+
+# Shared by all UI sessions; the database is opened on first use
+chat_history_store = ChatHistoryStore()
+
+_checkpoint_reader = None
+_checkpoint_reader_lock = threading.Lock()
+
+
+def agent_checkpointer():
+    """
+    Read-only view of the agent's checkpoints (settings.AGENT_CHECKPOINT_DB)
+    on a connection of its own, or None when LangGraph's SQLite saver is
+    not installed or the agent has not written anything yet.
+    """
+    global _checkpoint_reader
+    with _checkpoint_reader_lock:
+        if _checkpoint_reader is None and os.path.exists(settings.AGENT_CHECKPOINT_DB):
+            try:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+            except ImportError:
+                return None
+            conn = sqlite3.connect(settings.AGENT_CHECKPOINT_DB, check_same_thread=False)
+            _checkpoint_reader = SqliteSaver(conn=conn)
+        return _checkpoint_reader
+
+
+def open_history(thread_id: str) -> ChatHistory:
+    """
+    History for a UI thread: persisted in ``chat_history_store`` when
+    settings.CHAT_HISTORY_PERSIST is on (falling back to the agent's
+    checkpoint for threads the store has not seen), otherwise in memory.
+    """
+    if not settings.CHAT_HISTORY_PERSIST:
+        return ChatHistory(thread_id)
+    return ChatHistory.load(thread_id, chat_history_store, agent_checkpointer())
@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+
+EXPAND_MODES = ("window", "section")
+
+
+def document_key(metadata: dict) -> tuple:
+    """Identifies the uploaded document a chunk came from."""
+    return (metadata.get("source"), metadata.get("upload_batch"))
+
+
+def number_chunks(chunks: List[Document]) -> List[Document]:
+    """
+    Record each chunk's position within its source as ``chunk_index``.
+
+    Chunks must be in document order (as returned by the splitter); the
+    index runs across pages so neighbours can be found across page breaks.
+    """
+    counters: Dict[str, int] = {}
+    for chunk in chunks:
+        source = chunk.metadata.get("source")
+        chunk.metadata["chunk_index"] = counters.get(source, 0)
+        counters[source] = chunk.metadata["chunk_index"] + 1
+    return chunks
+
+
+class ChunkNeighborIndex:
+    """
+    ``(document, chunk_index) -> FAISS position`` for small-to-big retrieval.
+
+    Neighbour lookups are O(1) dict hits instead of metadata scans. Each
+    document also keeps the chunk range of every section (PDF page), so a
+    hit can be expanded to its parent section. Synced lazily from the
+    docstore, like ``MetadataIndex``.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._positions: Dict[Tuple[tuple, int], int] = {}
+        self._sections: Dict[Tuple[tuple, object], List[int]] = {}
+        self.size = 0
+
+    def copy(self) -> "ChunkNeighborIndex":
+        """Independent copy, to extend for the next index version."""
+        other = ChunkNeighborIndex()
+        other._positions = dict(self._positions)
+        other._sections = {key: list(bounds) for key, bounds in self._sections.items()}
+        other.size = self.size
+        return other
+
+    def add(self, position: int, metadata: dict) -> None:
+        if "chunk_index" not in metadata:
+            return
+        key = document_key(metadata)
+        index = metadata["chunk_index"]
+        self._positions[(key, index)] = position
+
+        if "page" in metadata:
+            bounds = self._sections.setdefault((key, metadata["page"]), [index, index])
+            bounds[0], bounds[1] = min(bounds[0], index), max(bounds[1], index)
+
+    def sync(self, vector_store) -> None:
+        """Index positions added to a LangChain FAISS store since the last sync."""
+        ntotal = vector_store.index.ntotal
+        if ntotal < self.size:
+            self.reset()
+        for position in range(self.size, ntotal):
+            document = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+            self.add(position, getattr(document, "metadata", {}) or {})
+        self.size = ntotal
+
+    def position(self, key: tuple, chunk_index: int) -> Optional[int]:
+        return self._positions.get((key, chunk_index))
+
+    def span(self, metadata: dict, window: int, expand: str = "window", max_chunks: int = None) -> Optional[Tuple[int, int]]:
+        """
+        Chunk range ``(first, last)`` a hit expands to, or None if the hit
+        has no recorded position (indexed before chunks were numbered).
+
+        ``section`` expands to the hit's page, capped at ``max_chunks``
+        around the hit; without a page it falls back to ``window``.
+        """
+        if "chunk_index" not in metadata:
+            return None
+        index = metadata["chunk_index"]
+
+        if expand == "section" and "page" in metadata:
+            first, last = self._sections.get((document_key(metadata), metadata["page"]), (index, index))
+            if max_chunks:
+                radius = max(0, (max_chunks - 1) // 2)
+                first, last = max(first, index - radius), min(last, index + radius)
+            return first, last
+
+        return max(0, index - window), index + window
+
+
+def merge_spans(hits: List[Tuple[tuple, Tuple[int, int]]]) -> List[Tuple[tuple, int, int, int]]:
+    """
+    Merge overlapping or adjacent spans of the same document.
+
+    Args:
+        hits: ``(document key, (first, last))`` in rank order
+
+    Returns:
+        ``(document key, first, last, rank)`` with ``rank`` the best
+        (lowest) hit rank inside the merged span, sorted by that rank
+    """
+    by_document: Dict[tuple, List[List[int]]] = {}
+    for rank, (key, (first, last)) in enumerate(hits):
+        by_document.setdefault(key, []).append([first, last, rank])
+
+    merged = []
+    for key, spans in by_document.items():
+        spans.sort()
+        current = spans[0]
+        for first, last, rank in spans[1:]:
+            if first <= current[1] + 1:
+                current[1] = max(current[1], last)
+                current[2] = min(current[2], rank)
+            else:
+                merged.append((key, *current))
+                current = [first, last, rank]
+        merged.append((key, *current))
+
+    return sorted(merged, key=lambda item: item[3])
+
+
+def join_chunks(chunks: List[Document]) -> str:
+    """
+    Concatenate consecutive chunks, dropping the splitter's overlap.
+
+    Uses ``start_index`` (offset within the page or file) when both chunks
+    come from the same page; otherwise chunks are joined on a newline.
+    """
+    if not chunks:
+        return ""
+    text = chunks[0].page_content
+    previous = chunks[0]
+    for chunk in chunks[1:]:
+        same_page = previous.metadata.get("page") == chunk.metadata.get("page")
+        prev_start = previous.metadata.get("start_index")
+        start = chunk.metadata.get("start_index")
+        if same_page and prev_start is not None and start is not None and start >= prev_start:
+            overlap = prev_start + len(previous.page_content) - start
+            if overlap < 0:
+                # The splitter trimmed the whitespace between them
+                text += " " + chunk.page_content
+            elif overlap < len(chunk.page_content):
+                text += chunk.page_content[overlap:]
+        else:
+            text += "\n" + chunk.page_content
+        previous = chunk
+    return text
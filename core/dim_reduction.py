@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+REDUCTION_MODES = ("none", "pca", "truncate")
+
+REDUCER_META_FILE = "reducer.json"
+REDUCER_WEIGHTS_FILE = "reducer.npz"
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.clip(np.linalg.norm(x, axis=1, keepdims=True), 1e-12, None)
+
+
+class DimensionReducer:
+    """
+    Projects embeddings to a smaller dimension.
+
+    - ``pca``: learned projection onto the top principal components of the
+      corpus (fitted once, on the first indexed batch)
+    - ``truncate``: keep the first ``target_dim`` components, for
+      Matryoshka-trained models whose prefixes are themselves embeddings
+
+    Outputs are re-normalised so L2 distance keeps ranking like cosine
+    similarity. The same reducer must be applied at ingest and query time,
+    so it is saved next to the index.
+    """
+
+    def __init__(self, mode: str, target_dim: int, mean: np.ndarray = None, components: np.ndarray = None):
+        if mode not in REDUCTION_MODES or mode == "none":
+            raise ValueError(f"Unsupported reduction mode '{mode}'. Use one of {REDUCTION_MODES[1:]}")
+        if target_dim <= 0:
+            raise ValueError("target_dim must be positive")
+
+        self.mode = mode
+        self.target_dim = target_dim
+        self.mean = mean
+        self.components = components
+
+    @classmethod
+    def fit(cls, vectors, mode: str, target_dim: int) -> "DimensionReducer":
+        """
+        Build a reducer for ``vectors`` (PCA is fitted, truncation is not).
+
+        PCA needs at least ``target_dim`` samples; a smaller first batch
+        falls back to truncation with a warning.
+
+        Raises:
+            ValueError: If the target dimension is not smaller than the input
+        """
+        x = np.asarray(vectors, dtype="float32")
+        if target_dim >= x.shape[1]:
+            raise ValueError(f"target_dim {target_dim} must be smaller than the embedding dimension {x.shape[1]}")
+
+        if mode == "pca" and x.shape[0] < target_dim:
+            logger.warning(
+                "PCA to %d dims needs at least %d chunks in the first batch (got %d); truncating instead",
+                target_dim, target_dim, x.shape[0]
+            )
+            mode = "truncate"
+
+        if mode != "pca":
+            return cls(mode, target_dim)
+
+        mean = x.mean(axis=0)
+        _, _, vt = np.linalg.svd(x - mean, full_matrices=False)
+        return cls(mode, target_dim, mean.astype("float32"), vt[:target_dim].astype("float32"))
+
+    def transform(self, vectors) -> np.ndarray:
+        x = np.asarray(vectors, dtype="float32")
+        if x.ndim == 1:
+            return self.transform(x[None, :])[0]
+        if self.mode == "truncate":
+            return _normalize(x[:, :self.target_dim])
+        return _normalize((x - self.mean) @ self.components.T)
+
+    def same_as(self, other: "DimensionReducer") -> bool:
+        """True if both project vectors identically."""
+        if (self.mode, self.target_dim) != (other.mode, other.target_dim):
+            return False
+        return self.mode != "pca" or (
+            np.array_equal(self.mean, other.mean) and np.array_equal(self.components, other.components)
+        )
+
+    def save(self, folder: str) -> None:
+        with open(os.path.join(folder, REDUCER_META_FILE), "w") as f:
+            json.dump({"mode": self.mode, "target_dim": self.target_dim}, f)
+        if self.mode == "pca":
+            np.savez(os.path.join(folder, REDUCER_WEIGHTS_FILE), mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, folder: str) -> "DimensionReducer":
+        with open(os.path.join(folder, REDUCER_META_FILE)) as f:
+            meta = json.load(f)
+        if meta["mode"] != "pca":
+            return cls(meta["mode"], meta["target_dim"])
+        weights = np.load(os.path.join(folder, REDUCER_WEIGHTS_FILE))
+        return cls(meta["mode"], meta["target_dim"], weights["mean"], weights["components"])
+
+    @staticmethod
+    def is_saved_in(folder: str) -> bool:
+        return os.path.exists(os.path.join(folder, REDUCER_META_FILE))
+
+    @staticmethod
+    def remove_from(folder: str) -> None:
+        for name in (REDUCER_META_FILE, REDUCER_WEIGHTS_FILE):
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ReducedEmbeddings(Embeddings):
+    """Embeddings wrapper applying a ``DimensionReducer`` to every vector."""
+
+    def __init__(self, inner: Embeddings, reducer: DimensionReducer):
+        self.inner = inner
+        self.reducer = reducer
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.reducer.transform(self.inner.embed_documents(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.reducer.transform(self.inner.embed_query(text)).tolist()
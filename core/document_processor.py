@@ -1,11 +1,69 @@
 
 
-from typing import List
+import io
+import os
+from datetime import datetime
+from typing import List , Union , BinaryIO
 from pathlib import Path
 from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader , TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from config.settings import settings
+from core.telemetry import telemetry
+from core.chunk_windows import number_chunks
+
+# A path, raw bytes/buffer, or a binary file-like object (e.g. a Streamlit UploadedFile)
+DocumentSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+class _BufferStream(io.RawIOBase):
+    """Read-only seekable stream over a memoryview, so parsers can read a buffer without copying it first."""
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer.cast("B") if buffer.ndim != 1 or buffer.format != "B" else buffer
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        size = max(0, min(len(target), len(self._buffer) - self._position))
+        target[:size] = self._buffer[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._buffer)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+def _pdf_metadata(info: dict) -> dict:
+    """
+    Document info of a PDF normalized like PyPDFLoader: keys without the
+    leading ``/`` and lower-cased, values as str or int, dates in ISO format.
+    """
+    metadata = {}
+    for key, value in info.items():
+        key = key.lstrip("/").lower()
+        if not isinstance(value, (str, int)):
+            value = str(value)
+        if key in ("creationdate", "moddate"):
+            try:
+                value = datetime.strptime(value.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                pass
+        elif isinstance(value, str):
+            value = value.strip()
+        metadata[key] = value
+    return metadata
+
 
 class DocumentProcessor:
     
@@ -17,10 +75,41 @@ class DocumentProcessor:
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
             length_function=len,
-            separators=["\n\n","\n"," ",""]
+            separators=["\n\n","\n"," ",""],
+            # Offsets let small-to-big retrieval stitch neighbours without their overlap
+            add_start_index=True
         )
     
-    def load_document(self, file_path : str ) -> List[Document]:
+    def load_document(self, file_path : DocumentSource , filename : str = None) -> List[Document]:
+        """
+        Load a .txt or .pdf document from a path or from memory.
+
+        In-memory sources (bytes, buffers, file-like objects) are parsed
+        directly, without writing a temporary file.
+
+        Args:
+            file_path: File path, or the document itself as bytes/bytearray/
+                memoryview or a binary file-like object
+            filename: Name used for the file type and ``source`` metadata
+                (required for bytes; defaults to ``.name`` for file-likes)
+        """
+        source = file_path
+        if isinstance(source, (str, Path)):
+            return self._load_path(str(source))
+
+        filename = filename or getattr(source, "name", None)
+        if not filename:
+            raise ValueError("filename is required when loading a document from memory")
+        extension = Path(filename).suffix.lower()
+
+        with telemetry.span("parse", file=os.path.basename(filename)):
+            if extension == '.txt':
+                return [Document(page_content=self._read_text(source), metadata={"source": filename})]
+            if extension == '.pdf':
+                return self._read_pdf(source, filename)
+        raise ValueError(f'Unsupported file {extension} .Use .txt or pdf')
+
+    def _load_path(self, file_path : str) -> List[Document]:
         path = Path(file_path)
         extension = path.suffix.lower()
 
@@ -31,15 +120,63 @@ class DocumentProcessor:
         else:
             raise ValueError(f'Unsupported file {extension} .Use .txt or pdf')
         
-        return loader.load()
+        with telemetry.span("parse", file=path.name):
+            return loader.load()
+
+    @staticmethod
+    def _buffer(source) -> memoryview:
+        """Zero-copy view of bytes-like sources and BytesIO-style objects (incl. UploadedFile)."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return memoryview(source)
+        if hasattr(source, "getbuffer"):
+            return source.getbuffer()
+        return None
+
+    def _read_text(self, source) -> str:
+        buffer = self._buffer(source)
+        if buffer is not None:
+            return str(buffer, "utf-8")
+        data = source.read()
+        return data if isinstance(data, str) else data.decode("utf-8")
+
+    def _read_pdf(self, source, filename : str) -> List[Document]:
+        from pypdf import PdfReader
+
+        buffer = self._buffer(source)
+        if buffer is not None:
+            stream = _BufferStream(buffer)
+        else:
+            stream = source
+            if stream.seekable():
+                stream.seek(0)
+
+        reader = PdfReader(stream)
+        labels = reader.page_labels
+        # Same per-page documents and metadata (producer, creator, dates, ...) as PyPDFLoader
+        metadata = _pdf_metadata(
+            {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+            | dict(reader.metadata or {})
+            | {"source": filename, "total_pages": len(reader.pages)}
+        )
+        return [
+            Document(
+                page_content=(page.extract_text() or "").strip(),
+                metadata=metadata | {
+                    "page": number,
+                    "page_label": labels[number] if number < len(labels) else str(number + 1)
+                }
+            )
+            for number, page in enumerate(reader.pages)
+        ]
     
     def split_documents(self,documents : List[Document]) -> List[Document] :
 
-        return self.text_splitter.split_documents(documents)
+        with telemetry.span("split", documents=len(documents)):
+            return number_chunks(self.text_splitter.split_documents(documents))
     
-    def process(self , file_path :str ) -> List[Document]:
+    def process(self , file_path : DocumentSource , filename : str = None) -> List[Document]:
 
-        documents = self.load_document(file_path)
+        documents = self.load_document(file_path, filename=filename)
         chunks = self.split_documents(documents)
         return chunks
 
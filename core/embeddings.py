@@ -1,23 +1,70 @@
 from config.settings import settings
 # from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+from core.model_registry import model_registry
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
 
 class EmbeddingManager:
 
-    def __init__(self, model_name : str = None):
+    def __init__(self, model_name : str = None, backend : str = None, micro_batching : bool = None):
         
         self.model_name = model_name or settings.EMBEDDING_MODEL 
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        self.micro_batching = settings.QUERY_MICRO_BATCHING if micro_batching is None else micro_batching
+        if self.backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend}'. Use one of {EMBEDDING_BACKENDS}")
         # self._embeddings = GoogleGenerativeAIEmbeddings(
         #     model= self.model_name
         # )
 
-        self._embeddings = HuggingFaceEmbeddings(
+        # Loaded once per process and shared by every session
+        self._embeddings = model_registry.get_or_create(
+            ("embeddings", self.model_name, self.backend),
+            self._load_model
+        )
+
+        # One batcher per model, so concurrent sessions share forward passes
+        if self.micro_batching:
+            self._embeddings = model_registry.get_or_create(
+                ("query_batcher", self.model_name, self.backend),
+                self._load_batcher
+            )
+
+    def _load_batcher(self) -> Embeddings:
+
+        from core.query_batcher import MicroBatchingEmbeddings
+
+        return MicroBatchingEmbeddings(
+            self._embeddings,
+            max_batch_size= settings.QUERY_BATCH_MAX_SIZE,
+            max_wait_ms= settings.QUERY_BATCH_MAX_WAIT_MS
+        )
+
+    def _load_model(self) -> Embeddings:
+
+        if self.backend.startswith("onnx"):
+            # ONNX Runtime path: exported once, then served without torch
+            from core.onnx_embeddings import OnnxEmbeddings, default_export_dir, export_onnx
+
+            quantized = self.backend == "onnx-int8"
+            model_dir = default_export_dir(self.model_name, settings.ONNX_MODEL_DIR)
+            export_onnx(self.model_name, model_dir, quantize=quantized)
+            return OnnxEmbeddings(
+                model_dir,
+                quantized= quantized,
+                intra_op_threads= settings.ONNX_INTRA_OP_THREADS or None
+            )
+
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(
             model_name= self.model_name,
             model_kwargs={'device': 'cpu'} ,
             encode_kwargs={"normalize_embeddings": True} # Normalize for cosine similarity
         )
 
     @property
-    def embeddings(self) -> HuggingFaceEmbeddings:
+    def embeddings(self) -> Embeddings:
         return self._embeddings
     
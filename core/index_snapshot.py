@@ -0,0 +1,66 @@
+import time
+from typing import Optional
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from core.chunk_windows import ChunkNeighborIndex
+from core.dim_reduction import DimensionReducer
+from core.metadata_index import MetadataIndex
+from core.quantization import QuantizedFlatIndex
+
+
+class IndexSnapshot:
+    """
+    One published version of a ``VectorStoreManager`` index.
+
+    A snapshot is never modified after it is published: the FAISS store,
+    the reducer its vectors were projected with, and the metadata and
+    neighbour indexes (synced before publishing) all belong to this
+    version. Writers build the next snapshot from a copy and swap it in
+    with a single reference assignment (read-copy-update).
+
+    A search reads the current snapshot once and uses only that reference,
+    which pins the version for the duration of the search without taking
+    any lock. A retired version is freed by reference counting as soon as
+    the last search holding it returns.
+    """
+
+    __slots__ = ("version", "store", "reducer", "metadata_index", "neighbor_index", "created_at", "__weakref__")
+
+    def __init__(
+        self,
+        version: int,
+        store: FAISS,
+        reducer: Optional[DimensionReducer],
+        metadata_index: MetadataIndex,
+        neighbor_index: ChunkNeighborIndex
+    ):
+        self.version = version
+        self.store = store
+        self.reducer = reducer
+        self.metadata_index = metadata_index
+        self.neighbor_index = neighbor_index
+        self.created_at = time.time()
+
+    @property
+    def ntotal(self) -> int:
+        return self.store.index.ntotal
+
+
+def clone_store(store: FAISS) -> FAISS:
+    """
+    Copy a LangChain FAISS store so the copy can be modified while the
+    original keeps serving searches.
+
+    The vector index is copied (``QuantizedFlatIndex`` shares its float32
+    blocks); the docstore and id mapping are copied as dicts of references
+    to the same, immutable, documents.
+    """
+    index = store.index
+    index = index.clone() if isinstance(index, QuantizedFlatIndex) else faiss.clone_index(index)
+    return FAISS(
+        embedding_function= store.embedding_function,
+        index= index,
+        docstore= InMemoryDocstore(dict(store.docstore._dict)),
+        index_to_docstore_id= dict(store.index_to_docstore_id)
+    )
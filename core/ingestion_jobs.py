@@ -0,0 +1,372 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from langchain_core.documents import Document
+from config.settings import settings
+from core.document_processor import DocumentProcessor
+from core.profiling import TurnProfiler
+from core.telemetry import telemetry
+from core.vector_store import VectorStoreManager
+
+# Share of a file's progress reached when each stage finishes; embedding
+# dominates ingestion time, so it moves the bar from 10% to 95%.
+STAGE_PROGRESS = {
+    "queued": 0.0,
+    "parsing": 0.0,
+    "splitting": 0.05,
+    "embedding": 0.10,
+    "indexing": 0.95,
+    "done": 1.0,
+}
+
+ACTIVE_STATES = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+
+@dataclass
+class FileProgress:
+    """Progress of one file through parse -> split -> embed -> index."""
+
+    name: str
+    size: int = 0
+    stage: str = "queued"
+    chunks: int = 0
+    embedded: int = 0
+    error: Optional[str] = None
+    # The upload itself; held until the file is indexed so failures can be retried
+    source: Any = field(default=None, repr=False)
+
+    @property
+    def fraction(self) -> float:
+        if self.stage in ("failed", "cancelled"):
+            return 0.0
+        if self.stage == "embedding" and self.chunks:
+            span = STAGE_PROGRESS["indexing"] - STAGE_PROGRESS["embedding"]
+            return STAGE_PROGRESS["embedding"] + span * self.embedded / self.chunks
+        return STAGE_PROGRESS[self.stage]
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "stage": self.stage,
+            "chunks": self.chunks,
+            "embedded": self.embedded,
+            "progress": round(self.fraction, 4),
+            "error": self.error,
+        }
+
+
+@dataclass
+class IngestionJob:
+    """
+    One upload: a set of files indexed under the same ``upload_batch``.
+
+    States: ``queued`` -> ``running`` -> ``completed``, ``failed`` (some
+    files could not be indexed) or ``cancelled``. Finished jobs can be
+    retried, which re-queues only the files that were not indexed.
+    """
+
+    id: str
+    files: List[FileProgress]
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    profile: bool = False
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def progress(self) -> float:
+        """Completed fraction, weighting files by their size."""
+        weights = [max(f.size, 1) for f in self.files]
+        total = sum(weights)
+        return sum(w * f.fraction for w, f in zip(weights, self.files)) / total if total else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time extrapolated from progress so far (None until measurable)."""
+        if self.state != "running" or self.started_at is None:
+            return None
+        progress = self.progress
+        if progress <= 0.0:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed * (1.0 - progress) / progress
+
+    def snapshot(self) -> dict:
+        """Plain-dict view of the job for the UI and API."""
+        return {
+            "id": self.id,
+            "state": self.state,
+            "progress": round(self.progress, 4),
+            "eta_seconds": self.eta_seconds,
+            "chunks": sum(f.chunks for f in self.files if f.stage == "done"),
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "files": [f.to_dict() for f in self.files],
+        }
+
+
+def _source_size(source) -> int:
+    size = getattr(source, "size", None)
+    if size is None and isinstance(source, (bytes, bytearray, memoryview)):
+        size = len(source)
+    return int(size or 0)
+
+
+class IngestionQueue:
+    """
+    Background ingestion with per-file, per-stage progress.
+
+    ``submit`` returns a job id immediately; a small worker pool parses,
+    splits and embeds each file in batches, checking for cancellation
+    between batches. Files that were embedded completely are indexed
+    together when the job ends, so a cancelled or failed file never leaves
+    half its chunks in the index, and the job costs one copy of the index
+    (``VectorStoreManager`` copies it on every write) instead of one per
+    file. Searches keep running on the previous version meanwhile.
+
+    Callers poll ``get`` / ``jobs`` for snapshots (progress, ETA, errors).
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreManager,
+        doc_processor: DocumentProcessor = None,
+        max_workers: int = None,
+        batch_size: int = None,
+        wait_ready: Callable[[], Any] = None,
+        profiler: TurnProfiler = None
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            vector_store: Store the jobs index into
+            doc_processor: Parser/splitter (a default one if omitted)
+            max_workers: Jobs processed concurrently (settings.INGEST_WORKERS)
+            batch_size: Chunks embedded between progress updates and
+                cancellation checks (settings.INGEST_EMBED_BATCH_SIZE)
+            wait_ready: Called before indexing, e.g. ``WarmStartManager.wait``
+                so new documents are merged into the restored index
+            profiler: Profiles jobs (sampled, or forced per ``submit``)
+        """
+        self.vector_store = vector_store
+        self.doc_processor = doc_processor or DocumentProcessor()
+        self.max_workers = max(1, max_workers or settings.INGEST_WORKERS)
+        self.batch_size = max(1, batch_size or settings.INGEST_EMBED_BATCH_SIZE)
+        self.wait_ready = wait_ready
+        self.profiler = profiler
+
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _submit_job(self, job: IngestionJob) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+            job.state = "queued"
+            job.attempts += 1
+            job.finished_at = None
+            job.cancel_event.clear()
+            self._jobs[job.id] = job
+            self._executor.submit(self._run, job)
+
+    def submit(self, files: Sequence, profile: bool = False) -> str:
+        """
+        Queue files for ingestion.
+
+        Args:
+            files: Objects with ``.name`` and a buffer (e.g. Streamlit
+                UploadedFile) or ``(name, bytes)`` pairs; .txt and .pdf
+            profile: Force profiling of this job
+
+        Returns:
+            Job id, also used as the chunks' ``upload_batch`` metadata
+        """
+        job = IngestionJob(id=uuid.uuid4().hex, files=[], profile=profile)
+        for item in files:
+            name, source = item if isinstance(item, tuple) else (item.name, item)
+            job.files.append(FileProgress(name=name, size=_source_size(source), source=source))
+        if not job.files:
+            raise ValueError("No files to ingest.")
+
+        self._submit_job(job)
+        return job.id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Ask a job to stop. Files already indexed stay indexed.
+
+        Returns:
+            True if the job was still queued or running
+        """
+        job = self._jobs.get(job_id)
+        if job is None or not job.is_active:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def retry(self, job_id: str) -> bool:
+        """
+        Re-queue the files of a finished job that failed or were cancelled.
+
+        Returns:
+            True if anything was re-queued
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_active:
+                return False
+            pending = [f for f in job.files if f.stage in ("failed", "cancelled")]
+            if not pending:
+                return False
+            for file in pending:
+                file.stage, file.chunks, file.embedded, file.error = "queued", 0, 0, None
+
+        self._submit_job(job)
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def jobs(self) -> List[dict]:
+        """Snapshots of all known jobs, newest first."""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+        return [job.snapshot() for job in jobs]
+
+    @property
+    def active(self) -> bool:
+        return any(job.is_active for job in list(self._jobs.values()))
+
+    def clear_finished(self) -> None:
+        """Forget finished jobs (and the uploads held for retrying them)."""
+        with self._lock:
+            self._jobs = {job_id: job for job_id, job in self._jobs.items() if job.is_active}
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """Stop the worker pool, cancelling running jobs by default."""
+        if cancel:
+            for job in list(self._jobs.values()):
+                job.cancel_event.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def _check_cancelled(self, job: IngestionJob) -> None:
+        if job.cancel_event.is_set():
+            raise JobCancelled(job.id)
+
+    def _run(self, job: IngestionJob) -> None:
+        job.state = "running"
+        job.started_at = time.time()
+        job.error = None
+        indexed = 0
+        # Files embedded completely, indexed together at the end
+        pending: List[tuple] = []
+
+        profiling = self.profiler.profile("ingest", force=job.profile) if self.profiler else nullcontext()
+        try:
+            with profiling, telemetry.span("ingest_job", files=len(job.files)):
+                if self.wait_ready is not None:
+                    self.wait_ready()
+
+                for file in job.files:
+                    if file.stage != "queued":
+                        continue
+                    if job.cancel_event.is_set():
+                        file.stage = "cancelled"
+                        continue
+                    try:
+                        chunks, vectors = self._ingest_file(job, file)
+                        if chunks:
+                            pending.append((file, chunks, vectors))
+                        else:
+                            file.source = None
+                    except JobCancelled:
+                        file.stage = "cancelled"
+                    except Exception as e:
+                        file.stage = "failed"
+                        file.error = str(e)
+
+                indexed = self._index_files(pending)
+
+                if indexed and settings.AUTO_SAVE_INDEX and self.vector_store.index_path:
+                    self.vector_store.save()
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            if job.error or any(f.stage == "failed" for f in job.files):
+                job.state = "failed"
+            elif any(f.stage == "cancelled" for f in job.files):
+                job.state = "cancelled"
+            else:
+                job.state = "completed"
+            job.finished_at = time.time()
+
+    def _index_files(self, pending: List[tuple]) -> int:
+        """Add the embedded files to the store in one write; returns how many were indexed."""
+        if not pending:
+            return 0
+        try:
+            self.vector_store.add_documents(
+                [chunk for _, chunks, _ in pending for chunk in chunks],
+                embeddings=[vector for _, _, vectors in pending for vector in vectors]
+            )
+        except Exception as e:
+            for file, _, _ in pending:
+                file.stage = "failed"
+                file.error = str(e)
+            return 0
+        for file, _, _ in pending:
+            file.stage = "done"
+            file.source = None
+        return len(pending)
+
+    def _ingest_file(self, job: IngestionJob, file: FileProgress) -> tuple:
+        """Parse, split and embed one file; returns (chunks, vectors) for indexing."""
+        file.stage = "parsing"
+        documents = self.doc_processor.load_document(file.source, filename=file.name)
+        self._check_cancelled(job)
+
+        file.stage = "splitting"
+        chunks: List[Document] = self.doc_processor.split_documents(documents)
+        # Lets retrieval be restricted to one upload via filter={"upload_batch": ...}
+        for chunk in chunks:
+            chunk.metadata["source"] = file.name
+            chunk.metadata["upload_batch"] = job.id
+        file.chunks = len(chunks)
+        if not chunks:
+            file.stage = "done"
+            return [], []
+
+        file.stage = "embedding"
+        vectors: List[List[float]] = []
+        for start in range(0, len(chunks), self.batch_size):
+            self._check_cancelled(job)
+            vectors.extend(self.vector_store.embed_documents(chunks[start:start + self.batch_size]))
+            file.embedded = len(vectors)
+
+        self._check_cancelled(job)
+        file.stage = "indexing"
+        return chunks, vectors
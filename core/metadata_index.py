@@ -0,0 +1,112 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set
+import numpy as np
+
+RANGE_OPERATORS = {
+    "gte": lambda value, bound: value >= bound,
+    "gt": lambda value, bound: value > bound,
+    "lte": lambda value, bound: value <= bound,
+    "lt": lambda value, bound: value < bound,
+}
+
+
+class MetadataIndex:
+    """
+    Inverted index from chunk metadata to FAISS positions.
+
+    Maps ``field -> value -> {position}`` for the configured fields so a
+    metadata filter resolves to an ID set without touching the vectors.
+    List-valued metadata (e.g. ``tags``) indexes every element.
+
+    Filters are dicts of ``field -> condition`` combined with AND:
+
+    - ``{"source": "report.pdf"}``                   equality
+    - ``{"source": ["a.pdf", "b.pdf"]}``             any of
+    - ``{"page": {"gte": 2, "lte": 5}}``             range (gte / gt / lte / lt)
+    - ``{"tags": "contracts"}``                      list membership
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[Any, Set[int]]] = {field: defaultdict(set) for field in self.fields}
+        self.size = 0
+
+    def reset(self) -> None:
+        self._postings = {field: defaultdict(set) for field in self.fields}
+        self.size = 0
+
+    def copy(self) -> "MetadataIndex":
+        """Independent copy, to extend for the next index version."""
+        other = MetadataIndex(self.fields)
+        for field, postings in self._postings.items():
+            other._postings[field].update((value, set(positions)) for value, positions in postings.items())
+        other.size = self.size
+        return other
+
+    def add(self, position: int, metadata: dict) -> None:
+        for field in self.fields:
+            if field not in metadata:
+                continue
+            value = metadata[field]
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            for item in values:
+                self._postings[field][item].add(position)
+        self.size = max(self.size, position + 1)
+
+    def sync(self, vector_store) -> None:
+        """Index positions added to a LangChain FAISS store since the last sync."""
+        ntotal = vector_store.index.ntotal
+        if ntotal < self.size:
+            self.reset()
+        for position in range(self.size, ntotal):
+            document = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+            self.add(position, getattr(document, "metadata", {}) or {})
+        self.size = ntotal
+
+    def _match(self, field: str, condition: Any) -> Set[int]:
+        postings = self._postings[field]
+
+        if isinstance(condition, dict):
+            unknown = set(condition) - set(RANGE_OPERATORS)
+            if unknown:
+                raise ValueError(f"Unsupported filter operators {sorted(unknown)} for '{field}'")
+            matched: Set[int] = set()
+            for value, positions in postings.items():
+                try:
+                    if all(RANGE_OPERATORS[op](value, bound) for op, bound in condition.items()):
+                        matched |= positions
+                except TypeError:
+                    continue  # value not comparable with the bound
+            return matched
+
+        if isinstance(condition, (list, tuple, set)):
+            matched = set()
+            for value in condition:
+                matched |= postings.get(value, set())
+            return matched
+
+        return set(postings.get(condition, set()))
+
+    def resolve(self, metadata_filter: Optional[dict]) -> Optional[np.ndarray]:
+        """
+        Resolve a filter to sorted FAISS positions.
+
+        Returns:
+            int64 array of matching positions, or None if there is no filter
+
+        Raises:
+            ValueError: If the filter uses a field that is not indexed
+        """
+        if not metadata_filter:
+            return None
+
+        result: Optional[Set[int]] = None
+        for field, condition in metadata_filter.items():
+            if field not in self._postings:
+                raise ValueError(f"Metadata field '{field}' is not indexed. Indexed fields: {self.fields}")
+            matched = self._match(field, condition)
+            result = matched if result is None else result & matched
+            if not result:
+                break
+
+        return np.fromiter(sorted(result or ()), dtype="int64")
@@ -0,0 +1,71 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of heavy, read-only objects.
+
+    Streamlit creates a new ``ChatInterface`` for every browser session, and
+    each one used to load its own copy of the sentence-transformer. The
+    registry keeps exactly one instance per key for the lifetime of the
+    process, so every session shares the same loaded model.
+
+    Construction is guarded by a per-key lock: concurrent callers asking for
+    the same key wait for the first one to finish loading instead of loading
+    the model twice, while callers asking for different keys do not block
+    each other.
+    """
+
+    def __init__(self):
+        self._objects: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lock_for(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the object registered under ``key``, building it on first use.
+
+        Args:
+            key: Hashable identifier (e.g. ``("embeddings", model_name)``)
+            factory: Zero-argument callable that builds the object
+
+        Returns:
+            The shared object for ``key``
+        """
+        # Fast path: no locking once the object exists
+        obj = self._objects.get(key)
+        if obj is not None:
+            return obj
+
+        with self._lock_for(key):
+            obj = self._objects.get(key)
+            if obj is None:
+                obj = factory()
+                self._objects[key] = obj
+            return obj
+
+    def contains(self, key: Hashable) -> bool:
+        """Check whether an object is already loaded under ``key``."""
+        return key in self._objects
+
+    def evict(self, key: Hashable) -> None:
+        """Drop the object registered under ``key`` (next access reloads it)."""
+        with self._lock_for(key):
+            self._objects.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every registered object."""
+        with self._lock:
+            self._objects.clear()
+            self._key_locks.clear()
+
+
+# Shared by every session in the process
+model_registry = ModelRegistry()
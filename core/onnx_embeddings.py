@@ -0,0 +1,165 @@
+import json
+import os
+import re
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+POOLING_FILE = "pooling.json"
+
+
+def default_export_dir(model_name: str, root: str = "data/onnx") -> str:
+    """Per-model export directory, e.g. ``data/onnx/sentence-transformers__all-MiniLM-L6-v2``."""
+    return os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]", "__", model_name))
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = False, opset: int = 17) -> str:
+    """
+    Export a sentence-transformers model to ONNX (one-off, needs torch).
+
+    Writes ``model.onnx``, the fast tokenizer files and ``pooling.json``
+    (pooling mode and max sequence length), and optionally a dynamically
+    int8-quantized ``model.int8.onnx``.
+
+    Args:
+        model_name: HuggingFace model id (settings.EMBEDDING_MODEL)
+        output_dir: Directory to write into
+        quantize: Also write the int8 model
+        opset: ONNX opset version
+
+    Returns:
+        Path of the model the backend should load
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, MODEL_FILE)
+
+    if not os.path.exists(model_path):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        st_model = SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+        tokenizer.save_pretrained(output_dir)
+
+        pooling = "mean"
+        if len(st_model) > 1 and hasattr(st_model[1], "get_pooling_mode_str"):
+            pooling = st_model[1].get_pooling_mode_str()
+        with open(os.path.join(output_dir, POOLING_FILE), "w") as f:
+            json.dump({"pooling": pooling, "max_seq_length": st_model.max_seq_length}, f)
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(sample[name] for name in input_names),
+                model_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+            )
+
+    if not quantize:
+        return model_path
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    CPU embeddings through ONNX Runtime, without importing torch.
+
+    Reproduces the sentence-transformers pipeline (tokenize -> transformer
+    -> pooling -> L2 normalise) so vectors stay interchangeable with
+    ``HuggingFaceEmbeddings(normalize_embeddings=True)``.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        intra_op_threads: int = None,
+        batch_size: int = 32,
+        normalize: bool = True
+    ):
+        """
+        Initialize the ONNX backend.
+
+        Args:
+            model_dir: Directory written by ``export_onnx``
+            quantized: Load the int8 model instead of the float32 one
+            intra_op_threads: ONNX Runtime intra-op threads (default: physical cores)
+            batch_size: Texts per forward pass
+            normalize: L2-normalise output vectors
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, POOLING_FILE)) as f:
+            pooling_config = json.load(f)
+        self.pooling = pooling_config.get("pooling", "mean")
+        self.batch_size = batch_size
+        self.normalize = normalize
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=pooling_config.get("max_seq_length", 512))
+        if self._tokenizer.padding is None:
+            self._tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        self._session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        if self.pooling == "max":
+            return np.where(mask[..., None] > 0, hidden, -np.inf).max(axis=1)
+        weights = mask[..., None].astype("float32")
+        return (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        outputs = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self._tokenizer.encode_batch(texts[start:start + self.batch_size])
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype="int64"),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype="int64"),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype="int64"),
+            }
+            feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+
+            hidden = self._session.run(None, feeds)[0]
+            vectors = self._pool(hidden, feeds["attention_mask"])
+            if self.normalize:
+                vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+            outputs.append(vectors.astype("float32"))
+
+        return np.concatenate(outputs) if outputs else np.empty((0, 0), dtype="float32")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
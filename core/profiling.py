@@ -0,0 +1,227 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Generator, Iterable, List, Optional
+from config.settings import settings
+
+PROFILE_MODES = ("off", "cprofile", "sampling")
+
+# cProfile hooks the whole interpreter, so only one deterministic profile can run at a time
+_deterministic_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for a single thread.
+
+    A background thread snapshots the target thread's stack every
+    ``interval`` seconds via ``sys._current_frames()`` and counts collapsed
+    stacks. The result is written in the folded format understood by
+    flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self) -> None:
+        while not self._stopped.is_set():
+            if self._active.is_set():
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is not None:
+                    stack = []
+                    while frame is not None:
+                        stack.append(self._frame_label(frame))
+                        frame = frame.f_back
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+            time.sleep(self.interval)
+
+    def enable(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        self._active.set()
+
+    def disable(self) -> None:
+        self._active.clear()
+
+    def stop(self) -> None:
+        self._active.clear()
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        """Collapsed stacks, one ``frame;frame;frame count`` line per stack."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def hotspots(self, top_n: int) -> List[tuple]:
+        """Functions with the most samples at the top of the stack (self time)."""
+        self_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        return self_counts.most_common(top_n)
+
+
+class TurnProfiler:
+    """
+    Opt-in profiling of chat turns and ingestion jobs.
+
+    Modes (``PROFILE_MODE``):
+        ``off``       - never profile unless ``force=True`` (then uses cProfile)
+        ``cprofile``  - deterministic profile, writes ``.prof`` (snakeviz, flameprof)
+        ``sampling``  - statistical profile, writes ``.folded`` (flamegraph, speedscope)
+
+    ``PROFILE_SAMPLE_RATE`` picks the fraction of requests profiled in
+    production. Every profiled run writes its profile plus a top-N hotspot
+    summary (``.txt``) into ``PROFILE_DIR``.
+    """
+
+    def __init__(
+        self,
+        mode: str = None,
+        sample_rate: float = None,
+        output_dir: str = None,
+        top_n: int = 25
+    ):
+        self.mode = (mode or settings.PROFILE_MODE).lower()
+        if self.mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{self.mode}'. Use one of {PROFILE_MODES}")
+
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.output_dir = output_dir or settings.PROFILE_DIR
+        self.top_n = top_n
+        self.last_summary_path: Optional[str] = None
+
+    def should_profile(self, force: bool = False) -> bool:
+        """Decide whether this request is profiled."""
+        if force:
+            return True
+        if self.mode == "off" or self.sample_rate <= 0:
+            return False
+        return random.random() < self.sample_rate
+
+    def _start(self):
+        """Start a profiler, or return None if a deterministic one is already running."""
+        if self.mode == "sampling":
+            profiler = SamplingProfiler()
+        else:
+            if not _deterministic_lock.acquire(blocking=False):
+                return None
+            profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _finish(self, name: str, profiler, elapsed: float) -> None:
+
+        try:
+            self._write(name, profiler, elapsed)
+        finally:
+            if isinstance(profiler, cProfile.Profile):
+                _deterministic_lock.release()
+
+    def _write(self, name: str, profiler, elapsed: float) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{random.randrange(1 << 16):04x}")
+        header = f"{name}: {elapsed * 1000:.1f} ms wall\n\n"
+
+        if isinstance(profiler, SamplingProfiler):
+            profiler.stop()
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                f.write(profiler.folded())
+            lines = [f"{count:6d} samples  {frame}" for frame, count in profiler.hotspots(self.top_n)]
+            summary = header + f"{profiler.samples} samples, top {self.top_n} by self time:\n" + "\n".join(lines) + "\n"
+        else:
+            profiler.dump_stats(f"{base}.prof")
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(self.top_n)
+            summary = header + stream.getvalue()
+
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+
+        self.last_summary_path = f"{base}.txt"
+        return self.last_summary_path
+
+    @contextmanager
+    def profile(self, name: str, force: bool = False):
+        """
+        Profile the enclosed block if this request is selected.
+
+        Args:
+            name: Label used in output file names (e.g. ``"chat_turn"``)
+            force: Profile regardless of mode and sample rate
+        """
+        if not self.should_profile(force):
+            yield
+            return
+
+        start = time.perf_counter()
+        profiler = self._start()
+        if profiler is None:
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._finish(name, profiler, time.perf_counter() - start)
+
+    def profile_stream(self, stream: Iterable, name: str, force: bool = False) -> Generator:
+        """
+        Profile a streaming response.
+
+        The profiler is only active while the stream is producing a chunk,
+        so time the caller spends rendering between chunks is excluded.
+
+        Args:
+            stream: Chunk iterable (e.g. ``ChatInterface.get_response``)
+            name: Label used in output file names
+            force: Profile regardless of mode and sample rate
+
+        Yields:
+            The chunks of ``stream`` unchanged
+        """
+        if not self.should_profile(force):
+            yield from stream
+            return
+
+        start = time.perf_counter()
+        profiler = self._start()
+        if profiler is None:
+            yield from stream
+            return
+
+        profiler.disable()
+        iterator = iter(stream)
+        try:
+            while True:
+                profiler.enable()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    profiler.disable()
+                yield chunk
+        finally:
+            self._finish(name, profiler, time.perf_counter() - start)
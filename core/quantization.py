@@ -0,0 +1,279 @@
+import json
+import os
+from typing import List, Optional, Tuple
+import faiss
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "float16", "int8", "binary")
+
+CODES_FILE = "codes.index"
+VECTORS_FILE = "vectors.npy"
+META_FILE = "quantized.json"
+
+# Headroom added on each side of the int8 training range, as a share of its width
+RANGE_MARGIN = 0.25
+
+
+class _FullVectors:
+    """
+    Append-only float32 vector storage used for exact rescoring.
+
+    Blocks are either in-memory arrays (freshly added vectors) or a
+    read-only ``np.memmap`` of the saved ``vectors.npy``, so after a load
+    only the rows touched by rescoring are paged into memory.
+    """
+
+    def __init__(self, d: int):
+        self.d = d
+        self._blocks: List[np.ndarray] = []
+        self._offsets: List[int] = []
+        self.ntotal = 0
+
+    def append(self, x: np.ndarray) -> None:
+        self._offsets.append(self.ntotal)
+        self._blocks.append(x)
+        self.ntotal += x.shape[0]
+
+    def take(self, ids: np.ndarray) -> np.ndarray:
+        """Gather rows by global id."""
+        out = np.empty((len(ids), self.d), dtype="float32")
+        block_index = np.searchsorted(self._offsets, ids, side="right") - 1
+        for b in np.unique(block_index):
+            mask = block_index == b
+            out[mask] = self._blocks[b][ids[mask] - self._offsets[b]]
+        return out
+
+    def all(self) -> np.ndarray:
+        if not self._blocks:
+            return np.empty((0, self.d), dtype="float32")
+        return np.ascontiguousarray(np.concatenate(self._blocks, axis=0), dtype="float32")
+
+    def copy(self) -> "_FullVectors":
+        # Blocks are never written to, so copies can share them
+        other = _FullVectors(self.d)
+        other._blocks, other._offsets, other.ntotal = list(self._blocks), list(self._offsets), self.ntotal
+        return other
+
+    def remove(self, keep: np.ndarray) -> "_FullVectors":
+        """Copy without the rows where ``keep`` is False; untouched blocks are shared."""
+        other = _FullVectors(self.d)
+        for block, offset in zip(self._blocks, self._offsets):
+            mask = keep[offset:offset + block.shape[0]]
+            if mask.all():
+                other.append(block)
+            elif mask.any():
+                other.append(np.ascontiguousarray(block[mask]))
+        return other
+
+    def replace(self, x: np.ndarray) -> None:
+        self._blocks, self._offsets, self.ntotal = [], [], 0
+        if len(x):
+            self.append(x)
+
+    def resident_bytes(self) -> int:
+        """Bytes held in RAM (memory-mapped blocks are not counted)."""
+        return sum(block.nbytes for block in self._blocks if not isinstance(block, np.memmap))
+
+
+class QuantizedFlatIndex:
+    """
+    Compressed flat index with exact rescoring.
+
+    Vectors are searched through a compact code index and the best
+    ``k * rescore_factor`` candidates are re-ranked with exact squared L2
+    distances against the original float32 vectors:
+
+    - ``float16``: half-precision scalar codes (2 bytes/dim)
+    - ``int8``:    8-bit scalar quantization over the per-dimension value
+      range seen so far plus ``RANGE_MARGIN`` headroom (1 byte/dim); a
+      batch outside it widens the range (again with headroom) and
+      re-encodes the stored vectors, so codes are never clipped and
+      re-encoding happens a logarithmic number of times
+    - ``binary``:  sign bits searched by Hamming distance (1 bit/dim)
+
+    Implements the subset of the ``faiss.Index`` interface the LangChain
+    ``FAISS`` wrapper uses (``d``, ``ntotal``, ``add``, ``search``,
+    ``reconstruct``, ``remove_ids``), so it can be dropped in as
+    ``FAISS(index=...)``. Distances follow ``IndexFlatL2`` (squared L2), so
+    scores keep their meaning.
+    """
+
+    def __init__(self, d: int, mode: str = "int8", rescore_factor: int = 4):
+        if mode not in QUANTIZATION_MODES or mode == "none":
+            raise ValueError(f"Unsupported quantization mode '{mode}'. Use one of {QUANTIZATION_MODES[1:]}")
+        if mode == "binary" and d % 8:
+            raise ValueError("Binary quantization needs a dimension divisible by 8")
+
+        self.d = d
+        self.mode = mode
+        self.rescore_factor = max(1, rescore_factor)
+        self._codes = self._new_code_index()
+        self._full = _FullVectors(d)
+
+    def _new_code_index(self):
+        if self.mode == "binary":
+            return faiss.IndexBinaryFlat(self.d)
+        qtype = faiss.ScalarQuantizer.QT_fp16 if self.mode == "float16" else faiss.ScalarQuantizer.QT_8bit
+        return faiss.IndexScalarQuantizer(self.d, qtype, faiss.METRIC_L2)
+
+    def clone(self) -> "QuantizedFlatIndex":
+        """
+        Copy for copy-on-write updates: the code index is copied, the
+        float32 blocks (possibly memory-mapped) are shared.
+        """
+        other = QuantizedFlatIndex(self.d, self.mode, self.rescore_factor)
+        if self.mode == "binary":
+            other._codes = faiss.clone_binary_index(self._codes)
+        else:
+            other._codes = faiss.clone_index(self._codes)
+        other._full = self._full.copy()
+        return other
+
+    def _encode_binary(self, x: np.ndarray) -> np.ndarray:
+        return np.packbits(x > 0, axis=1)
+
+    @property
+    def ntotal(self) -> int:
+        return self._full.ntotal
+
+    @property
+    def is_trained(self) -> bool:
+        return self._codes.is_trained
+
+    def add(self, x: np.ndarray) -> None:
+        x = np.ascontiguousarray(x, dtype="float32")
+        if self.mode == "binary":
+            self._codes.add(self._encode_binary(x))
+        else:
+            if self.mode == "int8":
+                self._fit_range(x)
+            self._codes.add(x)
+        self._full.append(x)
+
+    def _fit_range(self, x: np.ndarray) -> None:
+        """Train the 8-bit quantizer, or widen its range if ``x`` falls outside it."""
+        low, high = x.min(axis=0), x.max(axis=0)
+        if self._codes.is_trained:
+            # The quantizer stores per-dimension [vmin..., vdiff...]
+            trained = faiss.vector_to_array(self._codes.sq.trained)
+            old_low, old_high = trained[:self.d], trained[:self.d] + trained[self.d:]
+            if (low >= old_low - 1e-6).all() and (high <= old_high + 1e-6).all():
+                return
+            low, high = np.minimum(low, old_low), np.maximum(high, old_high)
+
+        margin = (high - low) * RANGE_MARGIN
+        codes = self._new_code_index()
+        codes.train(np.stack([low - margin, high + margin]).astype("float32"))
+        for block in self._full._blocks:
+            codes.add(np.ascontiguousarray(block, dtype="float32"))
+        self._codes = codes
+
+    def search(self, x: np.ndarray, k: int, params=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate search on codes followed by exact rescoring.
+
+        ``params`` (e.g. ``faiss.SearchParameters(sel=...)``) is passed to
+        the code index, so ID selectors restrict the candidate scan.
+
+        Returns:
+            (distances, ids) shaped ``[n_queries, k]``; missing slots are
+            ``inf`` / ``-1`` like faiss.
+        """
+        x = np.ascontiguousarray(x, dtype="float32")
+        n = x.shape[0]
+        distances = np.full((n, k), np.inf, dtype="float32")
+        labels = np.full((n, k), -1, dtype="int64")
+        if self.ntotal == 0 or k <= 0:
+            return distances, labels
+
+        fetch = min(self.ntotal, k * self.rescore_factor)
+        codes_query = self._encode_binary(x) if self.mode == "binary" else x
+        if params is None:
+            _, candidates = self._codes.search(codes_query, fetch)
+        else:
+            _, candidates = self._codes.search(codes_query, fetch, params=params)
+
+        for row in range(n):
+            ids = candidates[row][candidates[row] >= 0]
+            if not len(ids):
+                continue
+            exact = ((self._full.take(ids) - x[row]) ** 2).sum(axis=1)
+            order = np.argsort(exact)[:k]
+            distances[row, :len(order)] = exact[order]
+            labels[row, :len(order)] = ids[order]
+
+        return distances, labels
+
+    def reconstruct(self, i: int) -> np.ndarray:
+        return self._full.take(np.array([i]))[0]
+
+    def reconstruct_batch(self, ids: np.ndarray) -> np.ndarray:
+        return self._full.take(np.asarray(ids, dtype="int64"))
+
+    def reconstruct_n(self, start: int, n: int) -> np.ndarray:
+        return self._full.take(np.arange(start, start + n))
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        """Remove vectors and renumber the rest (same semantics as IndexFlat)."""
+        keep = np.ones(self.ntotal, dtype=bool)
+        keep[np.asarray(ids, dtype="int64")] = False
+        removed = int((~keep).sum())
+        if not removed:
+            return 0
+
+        # Codes are dropped in place; the float32 rows only where blocks lost some
+        self._codes.remove_ids(faiss.IDSelectorBatch(np.flatnonzero(~keep)))
+        self._full = self._full.remove(keep)
+        return removed
+
+    def memory_bytes(self) -> dict:
+        """Resident memory split into compressed codes and float32 rescoring vectors."""
+        if self.mode == "binary":
+            codes = int(faiss.serialize_index_binary(self._codes).nbytes)
+        else:
+            codes = int(faiss.serialize_index(self._codes).nbytes)
+        return {"codes": codes, "full_vectors": self._full.resident_bytes()}
+
+    def save(self, folder: str) -> None:
+        os.makedirs(folder, exist_ok=True)
+        if self.mode == "binary":
+            faiss.write_index_binary(self._codes, os.path.join(folder, CODES_FILE))
+        else:
+            faiss.write_index(self._codes, os.path.join(folder, CODES_FILE))
+        np.save(os.path.join(folder, VECTORS_FILE), self._full.all())
+        with open(os.path.join(folder, META_FILE), "w") as f:
+            json.dump({"d": self.d, "mode": self.mode, "rescore_factor": self.rescore_factor}, f)
+
+    @classmethod
+    def load(cls, folder: str, mmap: bool = True) -> "QuantizedFlatIndex":
+        """
+        Load a saved index.
+
+        Args:
+            folder: Directory written by ``save``
+            mmap: Memory-map the float32 vectors instead of reading them into RAM
+        """
+        with open(os.path.join(folder, META_FILE)) as f:
+            meta = json.load(f)
+
+        index = cls(meta["d"], meta["mode"], meta["rescore_factor"])
+        if index.mode == "binary":
+            index._codes = faiss.read_index_binary(os.path.join(folder, CODES_FILE))
+        else:
+            index._codes = faiss.read_index(os.path.join(folder, CODES_FILE))
+
+        vectors = np.load(os.path.join(folder, VECTORS_FILE), mmap_mode="r" if mmap else None)
+        if len(vectors):
+            index._full.append(vectors)
+        return index
+
+    @staticmethod
+    def is_saved_in(folder: str) -> bool:
+        return os.path.exists(os.path.join(folder, META_FILE))
+
+
+def quantized_or_none(d: int, mode: Optional[str], rescore_factor: int) -> Optional[QuantizedFlatIndex]:
+    """Build a QuantizedFlatIndex, or None for ``mode in (None, "none")``."""
+    if not mode or mode == "none":
+        return None
+    return QuantizedFlatIndex(d, mode, rescore_factor)
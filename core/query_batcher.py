@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+from langchain_core.embeddings import Embeddings
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Coalesces concurrent ``embed_query`` calls into batched forward passes.
+
+    Each caller enqueues its text and blocks on a future. A single worker
+    thread takes the first waiting query, gathers whatever else arrives
+    within ``max_wait_ms`` (up to ``max_batch_size``), encodes them with one
+    ``embed_documents`` call and resolves every future. Under load, queries
+    that arrive while a batch is encoding form the next batch, so batches
+    grow with concurrency; a lone query pays at most ``max_wait_ms``.
+
+    Query texts go through the inner model's ``embed_documents``, which is
+    the same encoding as ``embed_query`` for the backends used here (no
+    query-specific instruction or prefix).
+    """
+
+    def __init__(self, inner: Embeddings, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        """
+        Initialize the batcher.
+
+        Args:
+            inner: Embedding model to call
+            max_batch_size: Most queries encoded in one forward pass
+            max_wait_ms: How long the first query of a batch waits for company
+        """
+        self.inner = inner
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._queries = 0
+        self._max_seen = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # Skip callers that gave up (future cancelled) before encoding
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                vectors = self.inner.embed_documents([text for text, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+            with self._stats_lock:
+                self._batches += 1
+                self._queries += len(batch)
+                self._max_seen = max(self._max_seen, len(batch))
+
+    def submit(self, text: str) -> Future:
+        """Queue one query and return a future resolving to its vector."""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Ingestion batches are already large; don't queue them behind queries
+        return self.inner.embed_documents(texts)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "queries": self._queries,
+                "mean_batch_size": self._queries / self._batches if self._batches else 0.0,
+                "max_batch_size_seen": self._max_seen,
+                "queued": self._queue.qsize(),
+            }
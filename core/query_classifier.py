@@ -0,0 +1,222 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import numpy as np
+from core.embeddings import EmbeddingManager
+from core.model_registry import model_registry
+from core.telemetry import telemetry
+from core.vector_store import VectorStoreManager
+
+QUERY_TYPES = ("document", "web", "hybrid")
+
+# Short exemplar queries per route; the query is compared to each by cosine
+PROTOTYPES = {
+    "document": [
+        "what does the document say about this",
+        "summarize the uploaded file",
+        "according to the report, what are the key points",
+        "find the section of the pdf that explains",
+        "what is mentioned on page 3",
+        "explain the clause in the contract",
+    ],
+    "web": [
+        "latest news today",
+        "what is the weather right now",
+        "current stock price",
+        "live score of the match",
+        "who won the election this year",
+        "recent developments this week",
+    ],
+}
+
+# Recency / real-time cues that local documents cannot answer
+WEB_PATTERNS = [
+    r"\b(today|tonight|tomorrow|yesterday|now|currently|current|latest|recent|recently|live|breaking|upcoming)\b",
+    r"\b(this|last|next) (week|month|year|season)\b",
+    r"\b(news|headlines?|weather|forecast|temperature|stock|share price|price of|exchange rate|score|scores|match|election)\b",
+    r"\b20\d\d\b",
+]
+
+# Cues that point at the user's own uploads
+DOCUMENT_PATTERNS = [
+    r"\b(document|documents|doc|docs|file|files|pdf|upload|uploaded|attachment)\b",
+    r"\b(report|contract|agreement|policy|section|clause|chapter|page|paragraph|appendix)\b",
+    r"\b(according to|based on|in the (text|document|file|report))\b",
+    r"\b(summari[sz]e|summary of)\b",
+]
+
+_WEB_RE = [re.compile(p, re.IGNORECASE) for p in WEB_PATTERNS]
+_DOCUMENT_RE = [re.compile(p, re.IGNORECASE) for p in DOCUMENT_PATTERNS]
+
+
+@dataclass
+class QueryRoute:
+    """Routing decision for one query."""
+
+    label: str
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def use_web_search(self) -> bool:
+        return self.label != "document"
+
+
+class QueryClassifier:
+    """
+    Local query router: ``document``, ``web`` or ``hybrid``, without an LLM call.
+
+    Combines three cheap signals into a document score and a web score:
+
+    1. Keyword heuristics: recency/real-time cues (``today``, ``latest``,
+       ``weather``, years...) vs. references to the user's files
+    2. Nearest prototype: cosine similarity of the query embedding to a few
+       exemplar queries per route (prototype vectors are embedded once per
+       process)
+    3. Index coverage: cosine similarity of the best hit in the local index,
+       i.e. whether the uploaded documents can answer at all
+
+    When the keyword cues alone are decisive the embedding step is skipped.
+    The label is ``hybrid`` when the two scores are within ``margin`` of each
+    other; ``confidence`` is how far apart they are, scaled to [0, 1].
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreManager = None,
+        embedding_manager: EmbeddingManager = None,
+        margin: float = 0.15,
+        coverage_threshold: float = 0.45
+    ):
+        """
+        Initialize the classifier.
+
+        Args:
+            vector_store: Local index used for the coverage signal (optional)
+            embedding_manager: Embedding model (the vector store's by default)
+            margin: Score difference below which a query is routed to both sources
+            coverage_threshold: Best-hit cosine similarity at which the index
+                is considered able to answer
+        """
+        self.vector_store = vector_store
+        self.embedding_manager = embedding_manager or (
+            vector_store.embedding_manager if vector_store is not None else None
+        )
+        self.margin = margin
+        self.coverage_threshold = coverage_threshold
+
+    @staticmethod
+    def _keyword_hits(query: str, patterns) -> List[str]:
+        hits = []
+        for pattern in patterns:
+            match = pattern.search(query)
+            if match:
+                hits.append(match.group(0).lower())
+        return hits
+
+    def _embeddings(self):
+        if self.embedding_manager is None:
+            self.embedding_manager = EmbeddingManager()
+        return self.embedding_manager.embeddings
+
+    def _prototypes(self) -> Dict[str, np.ndarray]:
+        embeddings = self._embeddings()
+
+        def embed_prototypes():
+            return {
+                route: np.asarray(embeddings.embed_documents(texts), dtype="float32")
+                for route, texts in PROTOTYPES.items()
+            }
+
+        return model_registry.get_or_create(
+            ("query_prototypes", self.embedding_manager.model_name, self.embedding_manager.backend),
+            embed_prototypes
+        )
+
+    def _coverage(self, query_vector: np.ndarray) -> Optional[float]:
+        """Cosine similarity of the best local hit, or None without an index."""
+        if self.vector_store is None or not self.vector_store.is_initialized:
+            return None
+        vector = query_vector
+        if self.vector_store.reducer is not None:
+            vector = self.vector_store.reducer.transform(vector)
+        hits = self.vector_store.search_with_scores_by_vector(vector.tolist(), k=1)
+        if not hits:
+            return None
+        # Normalized vectors: squared L2 = 2 - 2 * cosine
+        return 1.0 - float(hits[0][1]) / 2.0
+
+    def _decide(self, document: float, web: float, scores: dict, reasons: List[str]) -> QueryRoute:
+        scores.update({"document": round(document, 4), "web": round(web, 4)})
+        difference = document - web
+
+        if abs(difference) < self.margin:
+            confidence = 1.0 - abs(difference) / self.margin
+            return QueryRoute("hybrid", round(confidence, 3), scores, reasons)
+
+        label = "document" if difference > 0 else "web"
+        confidence = min(1.0, 0.5 + (abs(difference) - self.margin))
+        return QueryRoute(label, round(confidence, 3), scores, reasons)
+
+    def route(self, query: str) -> QueryRoute:
+        """
+        Classify a query and explain the decision.
+
+        Args:
+            query: User's question
+
+        Returns:
+            QueryRoute with label, confidence, per-signal scores and reasons
+        """
+        with telemetry.span("route"):
+            web_hits = self._keyword_hits(query, _WEB_RE)
+            document_hits = self._keyword_hits(query, _DOCUMENT_RE)
+            reasons = [f"web cue '{hit}'" for hit in web_hits] + [f"document cue '{hit}'" for hit in document_hits]
+
+            keyword_web = min(1.0, 0.35 * len(web_hits))
+            keyword_document = min(1.0, 0.35 * len(document_hits))
+            scores = {"keyword_web": keyword_web, "keyword_document": keyword_document}
+
+            has_index = self.vector_store is not None and self.vector_store.is_initialized
+            if not has_index:
+                reasons.append("no local documents indexed")
+                # Nothing local to answer from: web unless the user points at files
+                if not document_hits:
+                    return self._decide(0.0, 1.0, scores, reasons)
+
+            # Fast path: unambiguous cues, no embedding needed
+            if abs(keyword_web - keyword_document) >= 0.7:
+                return self._decide(keyword_document, keyword_web, scores, reasons)
+
+            query_vector = np.asarray(self._embeddings().embed_query(query), dtype="float32")
+            prototypes = self._prototypes()
+            prototype_document = float((prototypes["document"] @ query_vector).max())
+            prototype_web = float((prototypes["web"] @ query_vector).max())
+            scores.update({"prototype_document": prototype_document, "prototype_web": prototype_web})
+
+            coverage = self._coverage(query_vector)
+            coverage_score = 0.0
+            if coverage is not None:
+                scores["coverage"] = coverage
+                coverage_score = max(-1.0, min(1.0, (coverage - self.coverage_threshold) / self.coverage_threshold))
+                reasons.append(
+                    "local index covers the query" if coverage >= self.coverage_threshold
+                    else "local index has no close match"
+                )
+
+            document = 0.4 * keyword_document + 0.3 * prototype_document + 0.5 * coverage_score
+            web = 0.4 * keyword_web + 0.3 * prototype_web
+            return self._decide(document, web, scores, reasons)
+
+    def classify(self, query: str) -> str:
+        """
+        Classify a query as ``document``, ``web`` or ``hybrid``.
+
+        Args:
+            query: User's question
+
+        Returns:
+            One of QUERY_TYPES (use ``route`` for the confidence score)
+        """
+        return self.route(query).label
@@ -0,0 +1,489 @@
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from config.settings import settings
+from core.model_registry import model_registry
+from core.telemetry import telemetry
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS_DIR = "segments"
+MANIFEST_FILE = "manifest.json"
+VERSIONS_DIR = "versions"
+VECTORS_FILE = "vectors.npy"
+DOCUMENTS_FILE = "documents.pkl"
+# Next to the segments folder, so removing the folder never removes a held lock
+LOCK_FILE = ".segments.lock"
+
+# One merge at a time per process, never on the save path
+_compaction_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="segment-compact")
+
+Rows = Tuple[List[str], np.ndarray, List[Document]]
+
+
+class _PathState:
+    """In-process state shared by every ``SegmentStore`` of one index directory."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.handle = None
+        self.compacting = False
+        self.compactions = 0
+
+
+class SegmentStore:
+    """
+    LSM-style on-disk layout for a vector index.
+
+    The index is a list of immutable segments under ``<path>/segments``,
+    each holding the docstore ids, index-space vectors and documents of
+    one save. ``append`` writes only what was added since the last save
+    as a new segment, plus tombstones (docstore ids) for what was deleted,
+    so a save costs as much as the delta. ``manifest.json`` lists the live
+    segments and tombstones and is replaced atomically, so readers see
+    either the old or the new set.
+
+    Loading replays the segments in order, skipping tombstoned rows.
+    Once there are more than ``max_segments`` segments, or tombstones
+    exceed ``tombstone_ratio`` of the rows, ``compact_async`` merges all
+    segments into one on a background thread and drops the tombstoned
+    rows; saves made meanwhile are kept.
+
+    Every Streamlit session has its own store object for the same
+    directory, so all manifest changes (append, merge, compaction commit,
+    rollback) run under ``exclusive``: a lock shared by every store of the
+    directory in the process plus an ``fcntl`` lock on a file next to it
+    for other processes. An existing index is never replaced; ``merge``
+    only adds rows to it.
+
+    Every manifest change except a compaction's name reservation is also
+    recorded as a numbered version under ``segments/versions``. The last
+    ``keep_versions`` are retained together with the segments they list,
+    so ``rollback`` can make any of them current again; a segment is
+    deleted only once no retained version lists it.
+    """
+
+    def __init__(self, path: str, max_segments: int = None, tombstone_ratio: float = None, keep_versions: int = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: Index directory (the segments live in its ``segments`` folder)
+            max_segments: Segments tolerated before compacting
+                (settings.INDEX_COMPACT_MAX_SEGMENTS)
+            tombstone_ratio: Deleted share of rows tolerated before
+                compacting (settings.INDEX_COMPACT_TOMBSTONE_RATIO)
+            keep_versions: Manifest versions retained for rollback
+                (settings.INDEX_KEEP_VERSIONS)
+        """
+        self.path = os.path.abspath(path)
+        self.root = os.path.join(self.path, SEGMENTS_DIR)
+        self.max_segments = max(1, max_segments or settings.INDEX_COMPACT_MAX_SEGMENTS)
+        self.tombstone_ratio = settings.INDEX_COMPACT_TOMBSTONE_RATIO if tombstone_ratio is None else tombstone_ratio
+        self.keep_versions = max(1, keep_versions or settings.INDEX_KEEP_VERSIONS)
+        self.versions_root = os.path.join(self.root, VERSIONS_DIR)
+        self._state: _PathState = model_registry.get_or_create(("segment_store", self.path), _PathState)
+
+    @staticmethod
+    def is_saved_in(path: str) -> bool:
+        return os.path.exists(os.path.join(path, SEGMENTS_DIR, MANIFEST_FILE))
+
+    @staticmethod
+    def remove_from(path: str) -> None:
+        store = SegmentStore(path)
+        with store.exclusive():
+            shutil.rmtree(store.root, ignore_errors=True)
+
+    @property
+    def compactions(self) -> int:
+        return self._state.compactions
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Hold the directory's manifest lock, across threads and processes.
+
+        Re-entrant within a thread, so a caller can check the manifest and
+        then append or merge under one hold.
+        """
+        state = self._state
+        with state.lock:
+            if state.depth == 0:
+                os.makedirs(self.path, exist_ok=True)
+                state.handle = open(os.path.join(self.path, LOCK_FILE), "a+")
+                if fcntl is not None:
+                    fcntl.flock(state.handle.fileno(), fcntl.LOCK_EX)
+            state.depth += 1
+            try:
+                yield
+            finally:
+                state.depth -= 1
+                if state.depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(state.handle.fileno(), fcntl.LOCK_UN)
+                    state.handle.close()
+                    state.handle = None
+
+    def manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.root, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "generation": 0, "next_segment": 0, "dimension": None, "segments": [], "tombstones": []}
+
+    def exists(self) -> bool:
+        return self.is_saved_in(self.path)
+
+    def _version_file(self, version: int) -> str:
+        return os.path.join(self.versions_root, f"manifest-{version:06d}.json")
+
+    @staticmethod
+    def _dump(manifest: dict, path: str) -> None:
+        tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+
+    def _write_manifest(self, manifest: dict, released: Iterable[str] = (), record: bool = True) -> None:
+        """
+        Replace the manifest, recording it as a new version unless
+        ``record`` is False, then delete the ``released`` segments and
+        those of pruned versions that no retained version lists.
+        """
+        if record:
+            manifest["version"] = self.manifest().get("version", 0) + 1
+            manifest["saved_at"] = time.time()
+            os.makedirs(self.versions_root, exist_ok=True)
+            self._dump(manifest, self._version_file(manifest["version"]))
+        self._dump(manifest, os.path.join(self.root, MANIFEST_FILE))
+        if record:
+            self._release(set(released) | self._prune_versions(), manifest)
+
+    def _retained(self) -> List[int]:
+        try:
+            names = os.listdir(self.versions_root)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[len("manifest-"):-len(".json")])
+            for name in names if name.startswith("manifest-") and name.endswith(".json")
+        )
+
+    def _read_version(self, version: int) -> dict:
+        try:
+            with open(self._version_file(version)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Index version {version} is not retained in {self.root}") from None
+
+    def _prune_versions(self) -> Set[str]:
+        """Delete all but the newest ``keep_versions`` versions; returns the segments they listed."""
+        listed: Set[str] = set()
+        for version in self._retained()[:-self.keep_versions]:
+            try:
+                listed.update(segment["name"] for segment in self._read_version(version)["segments"])
+                os.remove(self._version_file(version))
+            except (ValueError, FileNotFoundError):
+                # Pruned concurrently (e.g. by another process)
+                continue
+        return listed
+
+    def _release(self, names: Set[str], manifest: dict) -> None:
+        """Delete the segments in ``names`` that neither ``manifest`` nor a retained version lists."""
+        if not names:
+            return
+        names -= {segment["name"] for segment in manifest["segments"]}
+        for version in self._retained():
+            if not names:
+                return
+            try:
+                names -= {segment["name"] for segment in self._read_version(version)["segments"]}
+            except ValueError:
+                continue
+        self._drop_segments(names)
+
+    def _write_segment(self, manifest: dict, ids: List[str], vectors: np.ndarray, documents: List[Document]) -> dict:
+        """Write a segment (unlisted until the manifest is replaced) and return its entry."""
+        name = f"seg-{manifest['next_segment']:06d}"
+        manifest["next_segment"] += 1
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".{name}.{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, VECTORS_FILE), np.ascontiguousarray(vectors, dtype="float32"))
+        with open(os.path.join(tmp, DOCUMENTS_FILE), "wb") as f:
+            pickle.dump((ids, documents), f)
+        os.replace(tmp, os.path.join(self.root, name))
+        return {"name": name, "count": len(ids)}
+
+    def _read_segment(self, name: str, mmap: bool = True) -> Rows:
+        folder = os.path.join(self.root, name)
+        with open(os.path.join(folder, DOCUMENTS_FILE), "rb") as f:
+            ids, documents = pickle.load(f)
+        vectors = np.load(os.path.join(folder, VECTORS_FILE), mmap_mode="r" if mmap else None)
+        return ids, vectors, documents
+
+    def _drop_segments(self, names: Iterable[str]) -> None:
+        for name in names:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def _live_ids(self, manifest: dict) -> Set[str]:
+        tombstones = set(manifest["tombstones"])
+        live: Set[str] = set()
+        for segment in manifest["segments"]:
+            with open(os.path.join(self.root, segment["name"], DOCUMENTS_FILE), "rb") as f:
+                ids, _ = pickle.load(f)
+            live.update(i for i in ids if i not in tombstones)
+        return live
+
+    def merge(self, dimension: int, ids: List[str], vectors: Optional[np.ndarray], documents: List[Document]) -> bool:
+        """
+        Save a whole index into this directory (first save of a store that
+        was not loaded from it).
+
+        Creates the index when there is none; otherwise appends the rows
+        whose ids are not live yet as one segment, so indexes saved by
+        other sessions are kept.
+
+        Returns:
+            True if the index was created
+
+        Raises:
+            ValueError: If the existing index has another vector dimension
+        """
+        with self.exclusive(), telemetry.span("segment_write", count=len(ids), full=True):
+            if not self.exists():
+                manifest = {
+                    "version": 0,
+                    "generation": 1,
+                    # Tells a compaction started before a remove_from apart from this index
+                    "uid": uuid.uuid4().hex,
+                    "next_segment": 0,
+                    "dimension": dimension,
+                    "segments": [],
+                    "tombstones": [],
+                }
+                if ids:
+                    manifest["segments"].append(self._write_segment(manifest, ids, vectors, documents))
+                os.makedirs(self.root, exist_ok=True)
+                self._write_manifest(manifest)
+                return True
+
+            manifest = self.manifest()
+            if manifest["dimension"] not in (None, dimension):
+                raise ValueError(
+                    f"The index at {self.path} stores {manifest['dimension']}-dim vectors, not {dimension}. "
+                    "Load it before saving, or save to another path."
+                )
+            live = self._live_ids(manifest)
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in live]
+            if keep:
+                self.append([ids[i] for i in keep], vectors[keep], [documents[i] for i in keep])
+            return False
+
+    def append(
+        self,
+        ids: List[str],
+        vectors: Optional[np.ndarray],
+        documents: List[Document],
+        tombstones: Iterable[str] = ()
+    ) -> None:
+        """Persist rows added and ids deleted since the last save."""
+        tombstones = set(tombstones)
+        if not ids and not tombstones:
+            return
+        with self.exclusive(), telemetry.span("segment_write", count=len(ids), tombstones=len(tombstones)):
+            manifest = self.manifest()
+            if ids:
+                manifest["segments"].append(self._write_segment(manifest, ids, vectors, documents))
+                if manifest["dimension"] is None:
+                    manifest["dimension"] = int(vectors.shape[1])
+            manifest["tombstones"] = sorted(set(manifest["tombstones"]) | tombstones)
+            self._write_manifest(manifest)
+
+    def read(self, retries: int = 3) -> Tuple[Optional[int], List[Rows]]:
+        """
+        Live rows, segment by segment, in save order.
+
+        Vectors are memory-mapped; segments with tombstoned rows are
+        filtered into memory. Retries when a compaction (possibly in
+        another process) removed a segment between reading the manifest
+        and the segment.
+
+        Returns:
+            (vector dimension, rows per segment)
+        """
+        for attempt in range(retries + 1):
+            manifest = self.manifest()
+            tombstones = set(manifest["tombstones"])
+            try:
+                segments = [
+                    self._filter(self._read_segment(segment["name"]), tombstones)
+                    for segment in manifest["segments"]
+                ]
+                return manifest["dimension"], segments
+            except FileNotFoundError:
+                if attempt == retries:
+                    raise
+
+    @staticmethod
+    def _filter(rows: Rows, tombstones: Set[str]) -> Rows:
+        ids, vectors, documents = rows
+        if not tombstones or tombstones.isdisjoint(ids):
+            return rows
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in tombstones]
+        return [ids[i] for i in keep], vectors[keep], [documents[i] for i in keep]
+
+    def needs_compaction(self, manifest: dict = None) -> bool:
+        manifest = manifest or self.manifest()
+        rows = sum(segment["count"] for segment in manifest["segments"])
+        if len(manifest["segments"]) > self.max_segments:
+            return True
+        return bool(rows) and len(manifest["tombstones"]) / rows > self.tombstone_ratio
+
+    def compact(self) -> bool:
+        """
+        Merge every segment into one, dropping tombstoned rows.
+
+        Runs without the store lock except to swap the manifest; segments
+        and tombstones written meanwhile are carried over, and the result
+        is discarded if the index was removed or rolled back in the meantime.
+
+        Returns:
+            True if a merged segment was committed
+        """
+        with self.exclusive():
+            snapshot = self.manifest()
+            if len(snapshot["segments"]) < 2 and not snapshot["tombstones"]:
+                return False
+            # Reserve the merged segment's name so concurrent appends don't reuse it
+            reserved = {"next_segment": snapshot["next_segment"]}
+            snapshot["next_segment"] += 1
+            self._write_manifest(snapshot, record=False)
+
+        with telemetry.span("segment_compact", segments=len(snapshot["segments"])):
+            tombstones = set(snapshot["tombstones"])
+            ids: List[str] = []
+            documents: List[Document] = []
+            blocks: List[np.ndarray] = []
+            for segment in snapshot["segments"]:
+                segment_ids, vectors, segment_documents = self._filter(self._read_segment(segment["name"]), tombstones)
+                ids.extend(segment_ids)
+                documents.extend(segment_documents)
+                blocks.append(np.asarray(vectors))
+            dimension = snapshot["dimension"] or 0
+            vectors = np.concatenate(blocks, axis=0) if blocks else np.zeros((0, dimension), dtype="float32")
+            merged = self._write_segment(reserved, ids, vectors, documents)
+
+            with self.exclusive():
+                current = self.manifest()
+                merged_names = {segment["name"] for segment in snapshot["segments"]}
+                live_names = {segment["name"] for segment in current["segments"]}
+                # Removed, rolled back, or merged by another compactor (e.g. another process)
+                if (
+                    current.get("uid") != snapshot.get("uid")
+                    or current["generation"] != snapshot["generation"]
+                    or not merged_names <= live_names
+                ):
+                    self._drop_segments([merged["name"]])
+                    return False
+                current["segments"] = [merged] + [s for s in current["segments"] if s["name"] not in merged_names]
+                # Tombstones added since the snapshot may still point into the merged rows
+                current["tombstones"] = sorted(set(current["tombstones"]) - tombstones)
+                self._write_manifest(current, released=merged_names)
+                self._state.compactions += 1
+        return True
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception:
+            # The segments are untouched; the next save retries
+            logger.exception("Compacting %s failed", self.root)
+        finally:
+            self._state.compacting = False
+
+    def compact_async(self) -> bool:
+        """Schedule a compaction if one is due and none is running for this directory."""
+        with self.exclusive():
+            if self._state.compacting or not self.needs_compaction():
+                return False
+            self._state.compacting = True
+        _compaction_pool.submit(self._compact_in_background)
+        return True
+
+    def versions(self) -> List[dict]:
+        """Retained versions, oldest first; ``current`` marks the live one."""
+        live = self.manifest().get("version", 0)
+        result = []
+        for version in self._retained():
+            try:
+                manifest = self._read_version(version)
+            except ValueError:
+                continue
+            result.append({
+                "version": version,
+                "generation": manifest["generation"],
+                "segments": len(manifest["segments"]),
+                "rows": sum(segment["count"] for segment in manifest["segments"]),
+                "tombstones": len(manifest["tombstones"]),
+                "saved_at": manifest.get("saved_at"),
+                "current": version == live,
+            })
+        return result
+
+    def rollback(self, version: int) -> int:
+        """
+        Make a retained version current again.
+
+        The old manifest is committed as a new version (so the rollback
+        can itself be rolled back) under a new generation, which makes a
+        compaction running meanwhile discard its result.
+
+        Returns:
+            The version number the rollback was recorded as
+        """
+        with self.exclusive():
+            target = self._read_version(version)
+            missing = [s["name"] for s in target["segments"] if not os.path.isdir(os.path.join(self.root, s["name"]))]
+            if missing:
+                raise ValueError(f"Index version {version} can no longer be restored: missing {', '.join(missing)}")
+            # Read under the lock, so the new generation follows every committed write
+            current = self.manifest()
+            manifest = dict(
+                target,
+                generation=current["generation"] + 1,
+                # Segment names are never reused, even across a rollback
+                next_segment=max(current["next_segment"], target["next_segment"]),
+            )
+            self._write_manifest(manifest, released=[segment["name"] for segment in current["segments"]])
+            logger.info("Rolled %s back to version %d as version %d", self.root, version, manifest["version"])
+            return manifest["version"]
+
+    def stats(self) -> dict:
+        manifest = self.manifest()
+        return {
+            "version": manifest.get("version", 0),
+            "segments": len(manifest["segments"]),
+            "rows": sum(segment["count"] for segment in manifest["segments"]),
+            "tombstones": len(manifest["tombstones"]),
+            "generation": manifest["generation"],
+            "compactions": self.compactions,
+            "compacting": self._state.compacting,
+        }
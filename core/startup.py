@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Optional
+from core.vector_store import VectorStoreManager
+from core.model_registry import model_registry
+
+WARMUP_TEXTS = [
+    "warm up the embedding model",
+    "a second sentence so the batch path is exercised",
+    "and a third one for good measure",
+]
+
+
+class WarmStartManager:
+    """
+    Restores the persisted index and pre-warms models in the background.
+
+    On a fresh process the first query pays for lazy model initialisation
+    and, without a restore, starts from an empty index. ``start()`` runs a
+    background thread that:
+
+    1. Loads the saved FAISS index from ``index_path`` (shared read-only copy)
+    2. Embeds a small warm-up batch (once per model per process)
+    3. Runs a dummy search against the loaded index
+
+    The UI reads ``state`` to show readiness and callers that mutate the
+    store call ``wait()`` first so they never race the restore.
+
+    States: ``idle`` -> ``loading_index`` -> ``warming`` -> ``ready``
+    (or ``failed`` with ``error`` set).
+    """
+
+    def __init__(self, vector_store_manager: VectorStoreManager, index_path: str = None):
+        """
+        Initialize warm start manager.
+
+        Args:
+            vector_store_manager: Store to restore the saved index into
+            index_path: Saved index directory (defaults to the store's index_path)
+        """
+        self.vector_store = vector_store_manager
+        self.index_path = index_path or vector_store_manager.index_path
+
+        self._state = "idle"
+        self._error: Optional[str] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current readiness state."""
+        return self._state
+
+    @property
+    def error(self) -> Optional[str]:
+        """Error message if warm start failed."""
+        return self._error
+
+    @property
+    def is_ready(self) -> bool:
+        """Check if the warm start has finished (successfully or not)."""
+        return self._done.is_set()
+
+    def start(self) -> "WarmStartManager":
+        """Start the background warm-up thread (no-op if already started)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="warm-start", daemon=True)
+                self._thread.start()
+        return self
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until warm start finishes.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if warm start finished, False on timeout
+        """
+        if self._thread is None:
+            return True
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        try:
+            if self.index_path and os.path.exists(self.index_path) and not self.vector_store.is_initialized:
+                self._state = "loading_index"
+                self.vector_store.load(self.index_path, shared=True)
+
+            self._state = "warming"
+            model_name = self.vector_store.embedding_manager.model_name
+            model_registry.get_or_create(("warmed", model_name), self._warm_up_model)
+
+            if self.vector_store.is_initialized:
+                self.vector_store.search(WARMUP_TEXTS[0], k=1)
+
+            self._state = "ready"
+        except Exception as e:
+            self._error = str(e)
+            self._state = "failed"
+        finally:
+            self._done.set()
+
+    def _warm_up_model(self) -> bool:
+
+        embeddings = self.vector_store.embedding_manager.embeddings
+        embeddings.embed_documents(WARMUP_TEXTS)
+        embeddings.embed_query(WARMUP_TEXTS[0])
+        return True
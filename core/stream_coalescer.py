@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, List
+from config.settings import settings
+from core.telemetry import telemetry
+
+FENCE = "```"
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def split_point(buffer: str, in_fence: bool) -> int:
+    """
+    Length of the prefix of ``buffer`` that can be rendered now.
+
+    Outside a code fence the cut is after the last whitespace, so a word
+    or an inline marker (``**bold``, ``[link](``, a run of backticks) is
+    never split across updates. Inside a fence the cut is after the last
+    newline so code is rendered one whole line at a time. Returns 0 when
+    there is no such boundary yet.
+    """
+    if in_fence:
+        return buffer.rfind("\n") + 1
+    for i in range(len(buffer) - 1, -1, -1):
+        if buffer[i].isspace():
+            return i + 1
+    return 0
+
+
+class StreamStats:
+    """Render events and inter-flush latency of one coalesced stream."""
+
+    __slots__ = ("chunks", "flushes", "chars", "first_flush", "gaps", "_start", "_last_flush")
+
+    def __init__(self, start: float):
+        self.chunks = 0
+        self.flushes = 0
+        self.chars = 0
+        self.first_flush = None
+        self.gaps: List[float] = []
+        self._start = start
+        self._last_flush = None
+
+    def flushed(self, text: str, now: float) -> None:
+        self.flushes += 1
+        self.chars += len(text)
+        if self._last_flush is None:
+            self.first_flush = now - self._start
+        else:
+            self.gaps.append(now - self._last_flush)
+        self._last_flush = now
+
+    def to_dict(self) -> dict:
+        result = {
+            "chunks": self.chunks,
+            "flushes": self.flushes,
+            "chars": self.chars,
+            "reduction": round(self.chunks / self.flushes, 2) if self.flushes else 0.0,
+            "first_flush_ms": round(self.first_flush * 1000, 1) if self.first_flush is not None else None,
+        }
+        if self.gaps:
+            result["gap_p50_ms"] = round(_percentile(self.gaps, 0.5) * 1000, 1)
+            result["gap_p95_ms"] = round(_percentile(self.gaps, 0.95) * 1000, 1)
+            result["gap_max_ms"] = round(max(self.gaps) * 1000, 1)
+        return result
+
+    def summary(self) -> str:
+        stats = self.to_dict()
+        line = f"{stats['chunks']} chunks rendered in {stats['flushes']} updates"
+        if "gap_p95_ms" in stats:
+            line += f" · p95 gap {stats['gap_p95_ms']} ms"
+        return line
+
+
+class CoalescedStream:
+    """
+    Iterable returned by ``StreamCoalescer.wrap``; ``stats`` is filled in
+    while it is consumed (e.g. by ``st.write_stream``).
+    """
+
+    def __init__(self, coalescer: "StreamCoalescer", stream: Iterable[str]):
+        self._coalescer = coalescer
+        self._stream = stream
+        self.stats = StreamStats(coalescer.clock())
+
+    def __iter__(self) -> Iterator[str]:
+        return self._coalescer._coalesce(self._stream, self.stats)
+
+
+class StreamCoalescer:
+    """
+    Batches small token chunks into fewer, larger UI updates.
+
+    Every chunk passed to ``st.write_stream`` is a render event, and LLM
+    streams arrive a token or two at a time. The first chunk is passed
+    through immediately; after that text is buffered and flushed once
+    ``interval_ms`` has passed since the last flush or ``max_chars`` are
+    buffered, cut at a markdown-safe boundary (see ``split_point``). Text
+    without any boundary is held until ``max_hold_chars``.
+
+    Flushes happen when a chunk arrives, so a buffered tail waits at most
+    for the next chunk or the end of the stream.
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = None,
+        max_chars: int = None,
+        max_hold_chars: int = None,
+        enabled: bool = None,
+        clock: Callable[[], float] = time.perf_counter,
+        latency_window: int = 1000
+    ):
+        """
+        Initialize the coalescer.
+
+        Args:
+            interval_ms: Flush when this long has passed since the last
+                flush (settings.STREAM_FLUSH_INTERVAL_MS)
+            max_chars: Flush when this much text is buffered
+                (settings.STREAM_FLUSH_CHARS)
+            max_hold_chars: Flush even without a markdown boundary past
+                this size (4 x max_chars)
+            enabled: Pass streams through unchanged when False
+                (settings.STREAM_COALESCE)
+            clock: Time source, in seconds
+            latency_window: Recent inter-flush gaps kept for ``stats``
+        """
+        self.interval = (settings.STREAM_FLUSH_INTERVAL_MS if interval_ms is None else interval_ms) / 1000.0
+        self.max_chars = max(1, max_chars or settings.STREAM_FLUSH_CHARS)
+        self.max_hold_chars = max(self.max_chars, max_hold_chars or 4 * self.max_chars)
+        self.enabled = settings.STREAM_COALESCE if enabled is None else enabled
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._streams = 0
+        self._chunks = 0
+        self._flushes = 0
+        self._gaps: Deque[float] = deque(maxlen=latency_window or None)
+
+    def wrap(self, stream: Iterable[str]) -> CoalescedStream:
+        """Coalesce ``stream``; iterate the result (once) to render it."""
+        return CoalescedStream(self, stream)
+
+    def _coalesce(self, stream: Iterable[str], stats: StreamStats) -> Iterator[str]:
+        buffer = ""
+        in_fence = False
+        last_flush = None
+
+        def flush(text: str) -> str:
+            nonlocal in_fence, last_flush
+            now = self.clock()
+            if text.count(FENCE) % 2:
+                in_fence = not in_fence
+            stats.flushed(text, now)
+            last_flush = now
+            return text
+
+        try:
+            for chunk in stream:
+                if not chunk:
+                    continue
+                stats.chunks += 1
+                if not self.enabled:
+                    yield flush(chunk)
+                    continue
+
+                buffer += chunk
+                if last_flush is None:
+                    # Never delay the first token
+                    text, buffer = buffer, ""
+                    yield flush(text)
+                    continue
+
+                due = len(buffer) >= self.max_chars or self.clock() - last_flush >= self.interval
+                if not due:
+                    continue
+
+                cut = split_point(buffer, in_fence ^ (buffer.count(FENCE) % 2 == 1))
+                if cut == 0 and len(buffer) >= self.max_hold_chars:
+                    cut = len(buffer)
+                if cut:
+                    text, buffer = buffer[:cut], buffer[cut:]
+                    yield flush(text)
+
+            if buffer:
+                yield flush(buffer)
+        finally:
+            self._record(stats)
+
+    def _record(self, stats: StreamStats) -> None:
+        with self._lock:
+            self._streams += 1
+            self._chunks += stats.chunks
+            self._flushes += stats.flushes
+            self._gaps.extend(stats.gaps)
+        for gap in stats.gaps:
+            telemetry.record("ui_flush_gap", gap)
+
+    def stats(self) -> dict:
+        """Totals across streams and recent inter-flush latency."""
+        with self._lock:
+            result = {
+                "streams": self._streams,
+                "chunks": self._chunks,
+                "flushes": self._flushes,
+                "reduction": round(self._chunks / self._flushes, 2) if self._flushes else 0.0,
+            }
+            gaps = list(self._gaps)
+        if gaps:
+            result["gap_p50_ms"] = round(_percentile(gaps, 0.5) * 1000, 1)
+            result["gap_p95_ms"] = round(_percentile(gaps, 0.95) * 1000, 1)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._streams = self._chunks = self._flushes = 0
+            self._gaps.clear()
+
+
+# Shared by all UI sessions in the process
+stream_coalescer = StreamCoalescer()
@@ -0,0 +1,229 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Generator, Iterable, List, Tuple
+from config.settings import settings
+
+logger = logging.getLogger("rag.telemetry")
+
+# Histogram bucket upper bounds in seconds (Prometheus convention)
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Histogram:
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _NoopSpan:
+    """Returned by ``Telemetry.span`` when telemetry is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Times one pipeline stage and reports it to ``Telemetry`` on exit."""
+
+    __slots__ = ("_telemetry", "stage", "attributes", "_start")
+
+    def __init__(self, telemetry: "Telemetry", stage: str, attributes: dict):
+        self._telemetry = telemetry
+        self.stage = stage
+        self.attributes = attributes
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = "error" if exc_type else "ok"
+        self._telemetry.record(self.stage, time.perf_counter() - self._start, status, self.attributes)
+        return False
+
+    def set(self, **attributes) -> None:
+        """Attach extra attributes (e.g. result counts) to the span's log line."""
+        self.attributes.update(attributes)
+
+
+class Telemetry:
+    """
+    Lightweight per-stage tracing and metrics.
+
+    Each pipeline stage (parse, split, embed, index_add, search, web_search,
+    llm_ttft, llm_stream, ...) is timed with ``span()``. Durations feed a
+    per-stage histogram and counter that can be exported in Prometheus text
+    format, and every span is also emitted as a structured JSON log line on
+    the ``rag.telemetry`` logger.
+
+    When disabled, ``span()`` returns a shared no-op object and
+    ``traced``/``trace_stream`` fall through to the wrapped callable, so the
+    instrumentation costs one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def span(self, stage: str, **attributes):
+        """
+        Context manager timing one stage.
+
+        Args:
+            stage: Stage name (used as the metric label)
+            **attributes: Extra fields for the structured log line
+
+        Returns:
+            A span (no-op when telemetry is disabled)
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, stage, attributes)
+
+    def record(self, stage: str, seconds: float, status: str = "ok", attributes: dict = None) -> None:
+        """Record one stage duration (used by spans, or directly for derived timings)."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+            self._counters[(stage, status)] = self._counters.get((stage, status), 0) + 1
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "event": "span",
+                "stage": stage,
+                "duration_ms": round(seconds * 1000, 3),
+                "status": status,
+                "thread": threading.current_thread().name,
+                **(attributes or {}),
+            }, default=str))
+
+    def traced(self, stage: str) -> Callable:
+        """Decorator that wraps a function call in ``span(stage)``."""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def trace_stream(self, stream: Iterable, prefix: str) -> Generator:
+        """
+        Re-yield ``stream`` while recording ``<prefix>_ttft`` (time to first
+        chunk) and ``<prefix>_stream`` (time to exhaustion).
+
+        Args:
+            stream: Iterable of chunks (e.g. an LLM token stream)
+            prefix: Stage name prefix, e.g. ``"llm"``
+
+        Yields:
+            The chunks of ``stream`` unchanged
+        """
+        if not self.enabled:
+            yield from stream
+            return
+
+        start = time.perf_counter()
+        first = True
+        status = "ok"
+        try:
+            for chunk in stream:
+                if first:
+                    self.record(f"{prefix}_ttft", time.perf_counter() - start)
+                    first = False
+                yield chunk
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.record(f"{prefix}_stream", time.perf_counter() - start, status)
+
+    def snapshot(self) -> dict:
+        """Metrics as a JSON-serialisable dict."""
+        with self._lock:
+            stages = {}
+            for stage, histogram in self._histograms.items():
+                stages[stage] = {
+                    "count": histogram.count,
+                    "sum_seconds": histogram.total,
+                    "mean_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], histogram.counts)),
+                }
+            counters = [
+                {"stage": stage, "status": status, "count": count}
+                for (stage, status), count in self._counters.items()
+            ]
+        return {"stages": stages, "counters": counters}
+
+    def export_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# HELP rag_stage_duration_seconds Duration of RAG pipeline stages.",
+            "# TYPE rag_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'rag_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'rag_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'rag_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'rag_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append("# HELP rag_stage_total Completed RAG pipeline stages by status.")
+            lines.append("# TYPE rag_stage_total counter")
+            for (stage, status), count in sorted(self._counters.items()):
+                lines.append(f'rag_stage_total{{stage="{stage}",status="{status}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide instance used by the core, tools and UI layers
+telemetry = Telemetry(enabled=settings.TELEMETRY_ENABLED)
@@ -0,0 +1,589 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from config.settings import settings
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+from core.embeddings import EmbeddingManager
+from core.metadata_index import RANGE_OPERATORS
+from core.model_registry import model_registry
+from core.telemetry import telemetry
+
+RECORDS_FILE = "records.json"
+VECTORS_FILE = "vectors.npy"
+
+
+def content_hash(model_name: str, text: str) -> str:
+    """Content address of a chunk: the same text under the same model embeds to the same vector."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class _Chunk:
+    __slots__ = ("id", "text", "refcount", "segment")
+
+    def __init__(self, chunk_id: int, text: str, segment):
+        self.id = chunk_id
+        self.text = text
+        self.refcount = 0
+        # Immutable FAISS index holding the chunk's vector
+        self.segment = segment
+
+
+class _Namespace:
+    """Chunk hashes visible to one tenant, with that tenant's metadata for each."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.records: "OrderedDict[str, dict]" = OrderedDict()
+        self.dirty = False
+
+
+class TenantStore:
+    """
+    Multi-tenant vector store with content-addressed chunks.
+
+    Every chunk is keyed by ``content_hash(model, text)`` and embedded at
+    most once while it is resident, however many namespaces (users,
+    sessions, teams) upload it. A namespace is just the set of chunk hashes
+    it may see, plus its own metadata per chunk. Searches pass the union of
+    the requested namespaces as an ``IDSelectorBatch``, so visibility is
+    enforced inside FAISS.
+
+    Vectors live in FAISS ``IndexIDMap2`` segments that are never modified
+    once published: each add appends a segment, released chunks are left
+    behind as garbage, and small neighbouring segments (or all of them,
+    once garbage outweighs live chunks) are merged into new ones. A search
+    takes the lock only to snapshot the visible ids and the current
+    segments, and runs FAISS without it, so tenants' searches do not
+    queue behind each other or behind adds and evictions.
+
+    Each namespace is written to ``root_dir`` (texts, metadata and vectors)
+    whenever ``add_documents`` changes it, so uploads survive a restart.
+    At most ``max_resident`` namespaces stay in memory; the least recently
+    used one's chunks are released, and chunks no other resident namespace
+    references leave the index. Touching an evicted namespace reloads it
+    from disk without re-embedding.
+    """
+
+    def __init__(
+        self,
+        embedding_manager: EmbeddingManager = None,
+        root_dir: str = None,
+        max_resident: int = None
+    ):
+        """
+        Initialize the tenant store.
+
+        Args:
+            embedding_manager: Embedding model (shared registry model by default)
+            root_dir: Directory for evicted namespaces (settings.TENANT_STORE_DIR)
+            max_resident: Namespaces kept in memory (settings.TENANT_MAX_RESIDENT)
+        """
+        self.embedding_manager = embedding_manager or EmbeddingManager()
+        self.root_dir = root_dir or settings.TENANT_STORE_DIR
+        self.max_resident = max(1, max_resident or settings.TENANT_MAX_RESIDENT)
+
+        self._segments: tuple = ()
+        self._garbage = 0
+        self._chunks: Dict[str, _Chunk] = {}
+        self._hash_by_id: Dict[int, str] = {}
+        self._next_id = 0
+        self._resident: "OrderedDict[str, _Namespace]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.embedded_chunks = 0
+        self.reused_chunks = 0
+        self.evictions = 0
+        self.reloads = 0
+
+
+    def _namespace_dir(self, name: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.root_dir, f"{safe}-{digest}")
+
+    def _persist(self, namespace: _Namespace) -> None:
+        folder = self._namespace_dir(namespace.name)
+        os.makedirs(folder, exist_ok=True)
+        hashes = list(namespace.records)
+        records = [
+            {"hash": h, "text": self._chunks[h].text, "metadata": namespace.records[h]}
+            for h in hashes
+        ]
+        vectors = np.stack([self._vector(h) for h in hashes]) if hashes else np.empty((0, 0), "float32")
+
+        with open(os.path.join(folder, RECORDS_FILE), "w", encoding="utf-8") as f:
+            json.dump({"namespace": namespace.name, "records": records}, f)
+        np.save(os.path.join(folder, VECTORS_FILE), vectors)
+        namespace.dirty = False
+
+    def _load(self, name: str) -> _Namespace:
+        namespace = _Namespace(name)
+        folder = self._namespace_dir(name)
+        if not os.path.exists(os.path.join(folder, RECORDS_FILE)):
+            return namespace
+
+        with open(os.path.join(folder, RECORDS_FILE), encoding="utf-8") as f:
+            records = json.load(f)["records"]
+        vectors = np.load(os.path.join(folder, VECTORS_FILE))
+
+        hashes = [r["hash"] for r in records]
+        self._acquire(hashes, [r["text"] for r in records], vectors)
+        for record in records:
+            namespace.records[record["hash"]] = record["metadata"]
+        self.reloads += 1
+        return namespace
+
+
+    def _vector(self, h: str) -> np.ndarray:
+        chunk = self._chunks[h]
+        return chunk.segment.reconstruct(chunk.id)
+
+    @staticmethod
+    def _new_segment(vectors: np.ndarray, ids: np.ndarray):
+        segment = faiss.IndexIDMap2(faiss.IndexFlatL2(vectors.shape[1]))
+        segment.add_with_ids(vectors, ids)
+        return segment
+
+    def _merge(self, segments: tuple):
+        """New segment with the live vectors of ``segments`` (None if none are live)."""
+        live_ids, live_vectors = [], []
+        for segment in segments:
+            ids = faiss.vector_to_array(segment.id_map)
+            keep = np.fromiter((int(i) in self._hash_by_id for i in ids), dtype=bool, count=len(ids))
+            live_ids.append(ids[keep])
+            live_vectors.append(segment.index.reconstruct_n(0, segment.ntotal)[keep])
+        ids = np.concatenate(live_ids)
+        self._garbage -= sum(segment.ntotal for segment in segments) - len(ids)
+        if not len(ids):
+            return None
+        merged = self._new_segment(np.concatenate(live_vectors), ids)
+        for i in ids:
+            self._chunks[self._hash_by_id[int(i)]].segment = merged
+        return merged
+
+    def _compact(self) -> None:
+        # Called with the lock held; published segments are replaced, never changed
+        if self._segments and self._garbage > len(self._chunks):
+            merged = self._merge(self._segments)
+            self._segments = (merged,) if merged is not None else ()
+        # Merging the newest segment into an older one at most twice its size
+        # keeps the segment count logarithmic in the number of adds
+        while len(self._segments) > 1 and self._segments[-1].ntotal * 2 >= self._segments[-2].ntotal:
+            merged = self._merge(self._segments[-2:])
+            self._segments = self._segments[:-2] + ((merged,) if merged is not None else ())
+
+    def _embed(self, texts: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """Embed ``{hash: text}``; called without the lock."""
+        hashes = list(texts)
+        with telemetry.span("embed", chunks=len(hashes)):
+            vectors = np.asarray(self.embedding_manager.embeddings.embed_documents([texts[h] for h in hashes]), dtype="float32")
+        return dict(zip(hashes, vectors))
+
+    def _acquire(
+        self,
+        hashes: List[str],
+        texts: List[str],
+        vectors: Optional[np.ndarray] = None,
+        embedded: Dict[str, np.ndarray] = None
+    ) -> int:
+        """
+        Reference chunks, adding the missing ones.
+
+        Missing chunks take their vector from ``vectors`` (aligned with
+        ``hashes``) or ``embedded`` (by hash); any still without one, e.g.
+        released while the caller embedded, are embedded here.
+
+        Returns:
+            Number of chunks embedded by this call
+        """
+        missing = [i for i, h in enumerate(hashes) if h not in self._chunks]
+        # The same text twice in one batch is still one chunk
+        missing = list({hashes[i]: i for i in missing}.values())
+
+        count = 0
+        if missing:
+            if vectors is not None:
+                new_vectors = np.asarray(vectors, dtype="float32")[missing]
+            else:
+                embedded = dict(embedded or {})
+                absent = {hashes[i]: texts[i] for i in missing if hashes[i] not in embedded}
+                if absent:
+                    embedded.update(self._embed(absent))
+                    self.embedded_chunks += len(absent)
+                    count = len(absent)
+                new_vectors = np.stack([embedded[hashes[i]] for i in missing])
+
+            ids = np.arange(self._next_id, self._next_id + len(missing), dtype="int64")
+            self._next_id += len(missing)
+            segment = self._new_segment(new_vectors, ids)
+            for chunk_id, i in zip(ids, missing):
+                self._chunks[hashes[i]] = _Chunk(int(chunk_id), texts[i], segment)
+                self._hash_by_id[int(chunk_id)] = hashes[i]
+            self._segments = self._segments + (segment,)
+            self._compact()
+
+        self.reused_chunks += len(hashes) - len(missing)
+        for h in hashes:
+            self._chunks[h].refcount += 1
+        return count
+
+    def _release(self, hashes: Iterable[str]) -> None:
+        orphaned = 0
+        for h in hashes:
+            chunk = self._chunks[h]
+            chunk.refcount -= 1
+            if chunk.refcount <= 0:
+                orphaned += 1
+                del self._chunks[h]
+                del self._hash_by_id[chunk.id]
+        if orphaned:
+            # Vectors stay in their segments, unreachable, until a merge drops them
+            self._garbage += orphaned
+            self._compact()
+
+
+    def _namespace(self, name: str, pinned: Iterable[str] = ()) -> _Namespace:
+        """
+        Resident namespace, reloading it and evicting the coldest one if needed.
+
+        Namespaces in ``pinned`` (needed by the same search) are never
+        evicted; the store may briefly exceed ``max_resident`` instead.
+        """
+        namespace = self._resident.get(name)
+        if namespace is not None:
+            self._resident.move_to_end(name)
+            return namespace
+
+        namespace = self._load(name)
+        self._resident[name] = namespace
+        keep = set(pinned) | {name}
+        while len(self._resident) > self.max_resident:
+            cold = next((n for n in self._resident if n not in keep), None)
+            if cold is None:
+                break
+            self._evict(cold)
+        return namespace
+
+    def _evict(self, name: str) -> None:
+        namespace = self._resident.pop(name)
+        if namespace.dirty:
+            self._persist(namespace)
+        self._release(namespace.records.keys())
+        self.evictions += 1
+
+    def evict(self, name: str) -> None:
+        """Write a namespace to disk and drop it from memory."""
+        with self._lock:
+            if name in self._resident:
+                self._evict(name)
+
+    def flush(self) -> None:
+        """Persist every resident namespace with unsaved changes."""
+        with self._lock:
+            for namespace in self._resident.values():
+                if namespace.dirty:
+                    self._persist(namespace)
+
+    def delete_namespace(self, name: str) -> None:
+        with self._lock:
+            namespace = self._resident.pop(name, None)
+            if namespace is not None:
+                self._release(namespace.records.keys())
+            shutil.rmtree(self._namespace_dir(name), ignore_errors=True)
+
+    def add_documents(self, namespace: str, documents: List[Document], vectors: List[List[float]] = None) -> int:
+        """
+        Make ``documents`` visible to ``namespace``, embedding only unseen chunks.
+
+        Args:
+            namespace: Namespace the documents are added to
+            documents: Chunks to add
+            vectors: Vectors for ``documents`` from ``embed_documents``;
+                unseen chunks are embedded here when omitted
+
+        Returns:
+            Number of chunks that had to be embedded
+        """
+        if not documents:
+            return 0
+        model_name = self.embedding_manager.model_name
+        hashes = [content_hash(model_name, doc.page_content) for doc in documents]
+
+        if vectors is not None:
+            embedded, fresh = dict(zip(hashes, np.asarray(vectors, dtype="float32"))), 0
+        else:
+            with self._lock:
+                ns = self._namespace(namespace)
+                unseen = {
+                    h: doc.page_content for h, doc in zip(hashes, documents)
+                    if h not in ns.records and h not in self._chunks
+                }
+            # Embedded without the lock, so other tenants' searches don't wait for an upload
+            embedded = self._embed(unseen) if unseen else {}
+            fresh = len(embedded)
+
+        with self._lock:
+            # Re-checked: the namespace may have been evicted, or the chunks added, meanwhile
+            ns = self._namespace(namespace)
+            new = [(h, doc) for h, doc in zip(hashes, documents) if h not in ns.records]
+            new = list({h: doc for h, doc in new}.items())
+            self.embedded_chunks += fresh
+            count = fresh + self._acquire(
+                [h for h, _ in new], [doc.page_content for _, doc in new], embedded=embedded
+            )
+            for h, doc in new:
+                ns.records[h] = dict(doc.metadata)
+            if new:
+                # One namespace's files are small; write them now rather than on eviction
+                self._persist(ns)
+            return count
+
+    def embed_documents(self, documents: List[Document]) -> List[List[float]]:
+        """
+        Vectors for ``documents``: resident chunks are reused, the rest
+        embedded (without the lock). Pass them to ``add_documents``.
+        """
+        model_name = self.embedding_manager.model_name
+        hashes = [content_hash(model_name, doc.page_content) for doc in documents]
+        with self._lock:
+            known = {h: self._vector(h) for h in set(hashes) if h in self._chunks}
+        unseen = {h: doc.page_content for h, doc in zip(hashes, documents) if h not in known}
+        if unseen:
+            known.update(self._embed(unseen))
+            with self._lock:
+                self.embedded_chunks += len(unseen)
+        return [known[h].tolist() for h in hashes]
+
+    def size(self, namespace: str) -> int:
+        """Chunks visible to ``namespace``."""
+        with self._lock:
+            return len(self._namespace(namespace).records)
+
+    @staticmethod
+    def _matches(metadata: dict, metadata_filter: dict) -> bool:
+        # Same conditions as MetadataIndex: value, list of values, or range operators
+        for field, condition in metadata_filter.items():
+            value = metadata.get(field)
+            if isinstance(condition, dict):
+                unknown = set(condition) - set(RANGE_OPERATORS)
+                if unknown:
+                    raise ValueError(f"Unsupported filter operators {sorted(unknown)} for '{field}'")
+                try:
+                    if value is None or not all(RANGE_OPERATORS[op](value, bound) for op, bound in condition.items()):
+                        return False
+                except TypeError:
+                    return False
+            elif isinstance(condition, (list, tuple, set)):
+                if value not in condition:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def _visible(self, namespaces: List[str], metadata_filter: Optional[dict]) -> "OrderedDict[str, dict]":
+        # Called with the lock held
+        visible: "OrderedDict[str, dict]" = OrderedDict()
+        for namespace in [self._namespace(name, pinned=namespaces) for name in namespaces]:
+            for h, metadata in namespace.records.items():
+                visible.setdefault(h, metadata)
+        if metadata_filter:
+            visible = OrderedDict((h, m) for h, m in visible.items() if self._matches(m, metadata_filter))
+        return visible
+
+    def _search(
+        self,
+        namespaces: Union[str, Iterable[str]],
+        query_vector: List[float],
+        k: int,
+        metadata_filter: Optional[dict],
+        with_vectors: bool = False
+    ) -> List[tuple]:
+        namespaces = [namespaces] if isinstance(namespaces, str) else list(namespaces)
+        query = np.asarray([query_vector], dtype="float32")
+
+        # Only the snapshot is taken under the lock
+        with self._lock:
+            visible = self._visible(namespaces, metadata_filter)
+            segments = self._segments
+            chunks = {self._chunks[h].id: (h, self._chunks[h]) for h in visible}
+        if not chunks:
+            return []
+
+        ids = np.fromiter(chunks, dtype="int64", count=len(chunks))
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(ids))
+        k = min(k, len(ids))
+        hits = []
+        with telemetry.span("search", k=k, namespaces=len(namespaces)):
+            for segment in segments:
+                distances, labels = segment.search(query, k, params=params)
+                hits.extend((float(d), int(label)) for d, label in zip(distances[0], labels[0]) if label >= 0)
+        hits.sort()
+
+        results = []
+        for distance, label in hits[:k]:
+            h, chunk = chunks[label]
+            document = Document(id=h, page_content=chunk.text, metadata=dict(visible[h]))
+            if with_vectors:
+                # A merge may move the chunk meanwhile; old and new segment both hold its vector
+                results.append((document, distance, chunk.segment.reconstruct(label)))
+            else:
+                results.append((document, distance))
+        return results
+
+    def search_with_scores(
+        self,
+        namespaces: Union[str, Iterable[str]],
+        query: str,
+        k: int = None,
+        filter: dict = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search the chunks visible to one or more namespaces.
+
+        Args:
+            namespaces: Namespace name, or several (e.g. ``[user_id, "public"]``)
+            query: Search query text
+            k: Number of results (default from settings)
+            filter: Optional metadata filter, as for ``VectorStoreManager``
+
+        Returns:
+            List of (Document, squared L2 distance) tuples; a chunk visible
+            through several namespaces carries the first one's metadata
+        """
+        query_vector = self.embedding_manager.embeddings.embed_query(query)
+        return self.search_with_scores_by_vector(namespaces, query_vector, k, filter)
+
+    def search_with_scores_by_vector(
+        self,
+        namespaces: Union[str, Iterable[str]],
+        query_vector: List[float],
+        k: int = None,
+        filter: dict = None
+    ) -> List[Tuple[Document, float]]:
+        """Same as ``search_with_scores`` for a precomputed query vector."""
+        return self._search(namespaces, query_vector, k or settings.TOP_K_RESULTS, filter)
+
+    def search(self, namespaces: Union[str, Iterable[str]], query: str, k: int = None, filter: dict = None) -> List[Document]:
+        return [doc for doc, _ in self.search_with_scores(namespaces, query, k, filter)]
+
+    def mmr_search_by_vector(
+        self,
+        namespaces: Union[str, Iterable[str]],
+        query_vector: List[float],
+        k: int = None,
+        lambda_mult: float = 0.5,
+        fetch_k: int = 20,
+        filter: dict = None
+    ) -> List[Document]:
+        """Maximal marginal relevance over the ``fetch_k`` nearest visible chunks."""
+        k = k or settings.TOP_K_RESULTS
+        candidates = self._search(namespaces, query_vector, max(fetch_k, k), filter, with_vectors=True)
+        if not candidates:
+            return []
+        selected = maximal_marginal_relevance(
+            np.asarray(query_vector, dtype="float32"),
+            np.stack([vector for _, _, vector in candidates]),
+            k=k,
+            lambda_mult=lambda_mult
+        )
+        return [candidates[i][0] for i in selected]
+
+    def view(self, namespace: str, shared: Iterable[str] = ()) -> "TenantView":
+        """``VectorStoreManager``-compatible view of one namespace."""
+        return TenantView(self, namespace, shared)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resident_namespaces": len(self._resident),
+                "resident_chunks": len(self._chunks),
+                "indexed_vectors": sum(segment.ntotal for segment in self._segments),
+                "segments": len(self._segments),
+                "embedded_chunks": self.embedded_chunks,
+                "reused_chunks": self.reused_chunks,
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+            }
+
+
+class TenantView:
+    """
+    One namespace of a ``TenantStore`` behind the ``VectorStoreManager``
+    interface used by ``RAGchain``, ``HybridSearchManager``, the query
+    classifier and the ingestion queue, so a session can index and search
+    its own uploads in the process-wide store.
+
+    Searches see the namespace plus the read-only ``shared`` namespaces.
+    There is no file to save or load: the store writes the namespace to its
+    directory after every add and reloads it on demand.
+    Small-to-big expansion and deletes are not supported; ``expand_hits``
+    returns the hits unchanged.
+    """
+
+    index_path = None
+    reducer = None
+
+    def __init__(self, store: TenantStore, namespace: str, shared: Iterable[str] = ()):
+        self.store = store
+        self.namespace = namespace
+        self.namespaces = [namespace] + [name for name in shared if name != namespace]
+
+    @property
+    def embedding_manager(self) -> EmbeddingManager:
+        return self.store.embedding_manager
+
+    @property
+    def is_initialized(self) -> bool:
+        return any(self.store.size(name) for name in self.namespaces)
+
+    def embed_query(self, query: str) -> List[float]:
+        with telemetry.span("embed", count=1):
+            return self.embedding_manager.embeddings.embed_query(query)
+
+    def embed_documents(self, documents: List[Document]) -> List[List[float]]:
+        return self.store.embed_documents(documents)
+
+    def add_documents(self, documents: List[Document], embeddings: List[List[float]] = None) -> "TenantView":
+        self.store.add_documents(self.namespace, documents, vectors=embeddings)
+        return self
+
+    def search(self, query: str, k: int = None, filter: dict = None) -> List[Document]:
+        return self.store.search(self.namespaces, query, k, filter)
+
+    def search_with_scores(self, query: str, k: int = None, filter: dict = None) -> List[tuple]:
+        return self.store.search_with_scores(self.namespaces, query, k, filter)
+
+    def search_with_scores_by_vector(self, query_vector: List[float], k: int = None, filter: dict = None) -> List[tuple]:
+        return self.store.search_with_scores_by_vector(self.namespaces, query_vector, k, filter)
+
+    def mmr_search(self, query: str, k: int = None, lambda_mult: float = 0.5, fetch_k: int = 20, filter: dict = None) -> List[Document]:
+        return self.mmr_search_by_vector(self.embed_query(query), k, lambda_mult, fetch_k, filter)
+
+    def mmr_search_by_vector(
+        self,
+        query_vector: List[float],
+        k: int = None,
+        lambda_mult: float = 0.5,
+        fetch_k: int = 20,
+        filter: dict = None
+    ) -> List[Document]:
+        return self.store.mmr_search_by_vector(self.namespaces, query_vector, k, lambda_mult, fetch_k, filter)
+
+    def expand_hits(self, hits: List[Document], window: int = None, expand: str = None) -> List[Document]:
+        return hits
+
+    def save(self, path: str = None) -> None:
+        self.store.flush()
+
+
+def shared_tenant_store() -> TenantStore:
+    """The process-wide ``TenantStore`` every session's namespace lives in."""
+    return model_registry.get_or_create(("tenant_store",), TenantStore)
@@ -0,0 +1,375 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+from config.settings import settings
+
+DEFAULT_SESSION = "default"
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised before an LLM call that would exceed a token budget.
+
+    ``scope`` is ``"turn"`` (the request alone is too large) or
+    ``"session"`` (the session has used up its budget).
+    """
+
+    def __init__(self, message: str, scope: str):
+        super().__init__(message)
+        self.scope = scope
+
+
+class TokenCounter:
+    """
+    Local token estimate, used before a prompt is sent.
+
+    Uses ``tiktoken`` (optional, ``tokens`` extra) with ``encoding`` when
+    installed; otherwise about four characters per token, which is close
+    for English prose. Model-reported counts replace the estimate once a
+    response arrives.
+    """
+
+    def __init__(self, encoding: str = None):
+        self.encoding = encoding or settings.TOKENIZER_ENCODING
+        self._encoder = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if not self._loaded:
+                try:
+                    import tiktoken
+
+                    self._encoder = tiktoken.get_encoding(self.encoding)
+                except Exception:
+                    self._encoder = None
+                self._loaded = True
+        return self._encoder
+
+    @property
+    def exact(self) -> bool:
+        """True when a real tokenizer is available."""
+        return (self._encoder if self._loaded else self._load()) is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoder = self._encoder if self._loaded else self._load()
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / 4)
+
+
+def _message_text(message) -> str:
+    content = getattr(message, "content", message)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else str(part.get("text", "")) for part in content)
+    return ""
+
+
+class Turn:
+    """
+    Token usage of one LLM turn (a RAG answer, a hybrid prompt, an agent turn).
+
+    Created by ``UsageTracker.begin``, which has already checked budgets
+    and trimmed the context. Use as a context manager around the model
+    call and pass every response message or stream chunk to ``observe``;
+    the turn is recorded on exit, also when a stream is abandoned.
+    """
+
+    def __init__(self, tracker: "UsageTracker", session_id: str, kind: str, context: str, estimated_prompt_tokens: int, trimmed_tokens: int):
+        self.tracker = tracker
+        self.session_id = session_id
+        self.kind = kind
+        self.context = context
+        self.estimated_prompt_tokens = estimated_prompt_tokens
+        self.trimmed_tokens = trimmed_tokens
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.status = "ok"
+        self._completion_text: List[str] = []
+        self._start = 0.0
+        self.latency = 0.0
+
+    def __enter__(self) -> "Turn":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.latency = time.perf_counter() - self._start
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.status = "error"
+        self.tracker._record(self)
+        return False
+
+    def observe(self, message) -> None:
+        """Collect model-reported usage (and completion text for the estimate)."""
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            usage = (getattr(message, "response_metadata", None) or {}).get("token_usage")
+            if usage:
+                usage = {"input_tokens": usage.get("prompt_tokens", 0), "output_tokens": usage.get("completion_tokens", 0)}
+        if usage:
+            # Agent turns make one call per tool round; their usage adds up
+            self.prompt_tokens = (self.prompt_tokens or 0) + int(usage.get("input_tokens", 0))
+            self.completion_tokens = (self.completion_tokens or 0) + int(usage.get("output_tokens", 0))
+        self._completion_text.append(_message_text(message))
+
+    @property
+    def reported(self) -> bool:
+        """True when the counts come from the model rather than the estimate."""
+        return self.prompt_tokens is not None
+
+    def totals(self) -> tuple:
+        """(prompt tokens, completion tokens), model-reported when available."""
+        if self.reported:
+            return self.prompt_tokens, self.completion_tokens or 0
+        return self.estimated_prompt_tokens, self.tracker.counter.count("".join(self._completion_text))
+
+
+class _Usage:
+    __slots__ = (
+        "turns", "prompt_tokens", "completion_tokens", "trimmed_tokens", "refused", "errors",
+        "reported_prompt_tokens", "estimated_prompt_tokens", "latencies"
+    )
+
+    def __init__(self, latency_window: int = 0):
+        self.turns = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.trimmed_tokens = 0
+        self.refused = 0
+        self.errors = 0
+        # Over turns with model-reported usage, to check the local estimate
+        self.reported_prompt_tokens = 0
+        self.estimated_prompt_tokens = 0
+        self.latencies: Deque[float] = deque(maxlen=latency_window or None)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, turn: Turn, prompt_tokens: int, completion_tokens: int) -> None:
+        self.turns += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.trimmed_tokens += turn.trimmed_tokens
+        self.errors += turn.status == "error"
+        if turn.reported:
+            self.reported_prompt_tokens += prompt_tokens
+            self.estimated_prompt_tokens += turn.estimated_prompt_tokens
+        self.latencies.append(turn.latency)
+
+    def merge(self, other: "_Usage") -> None:
+        for name in self.__slots__:
+            if name != "latencies":
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.latencies.extend(other.latencies)
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        turns = self.turns or 1
+        result = {
+            "turns": self.turns,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "avg_prompt_tokens": round(self.prompt_tokens / turns, 1),
+            "avg_completion_tokens": round(self.completion_tokens / turns, 1),
+            "trimmed_tokens": self.trimmed_tokens,
+            "refused": self.refused,
+            "errors": self.errors,
+            "cost": round(
+                self.prompt_tokens / 1000 * settings.LLM_INPUT_COST_PER_1K
+                + self.completion_tokens / 1000 * settings.LLM_OUTPUT_COST_PER_1K,
+                6
+            ),
+        }
+        if latencies:
+            result["latency_p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 1)
+            result["latency_p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+        if self.estimated_prompt_tokens:
+            # > 1 means the local tokenizer undercounts for this model
+            result["reported_to_estimated"] = round(self.reported_prompt_tokens / self.estimated_prompt_tokens, 3)
+        return result
+
+
+class UsageTracker:
+    """
+    Per-turn token accounting with per-turn and per-session budgets.
+
+    Before a call, ``begin`` estimates the prompt with the local tokenizer.
+    If the prompt would not fit in ``per_turn`` tokens (minus the
+    ``completion_reserve`` kept for the answer), lowest-ranked context
+    blocks are dropped; if the request still does not fit, or the session
+    has already used ``per_session`` tokens, ``BudgetExceeded`` is raised
+    before the LLM is called. After the call the model-reported usage is
+    recorded and aggregated per kind and per session.
+
+    A budget of 0 means unlimited. Usage is kept for the ``max_sessions``
+    most recently active sessions; a session evicted from that table
+    starts again with an empty budget.
+    """
+
+    def __init__(
+        self,
+        per_turn: int = None,
+        per_session: int = None,
+        completion_reserve: int = None,
+        counter: TokenCounter = None,
+        latency_window: int = 1000,
+        max_sessions: int = None
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            per_turn: Max prompt + completion tokens per turn (settings.TOKEN_BUDGET_PER_TURN)
+            per_session: Max tokens per session (settings.TOKEN_BUDGET_PER_SESSION)
+            completion_reserve: Tokens of ``per_turn`` kept for the answer
+                (settings.TOKEN_COMPLETION_RESERVE)
+            counter: Local tokenizer (TokenCounter by default)
+            latency_window: Recent turns kept per kind for latency percentiles
+            max_sessions: Sessions whose usage is kept (settings.TOKEN_USAGE_MAX_SESSIONS)
+        """
+        self.per_turn = settings.TOKEN_BUDGET_PER_TURN if per_turn is None else per_turn
+        self.per_session = settings.TOKEN_BUDGET_PER_SESSION if per_session is None else per_session
+        self.completion_reserve = settings.TOKEN_COMPLETION_RESERVE if completion_reserve is None else completion_reserve
+        self.counter = counter or TokenCounter()
+        self.latency_window = latency_window
+        self.max_sessions = settings.TOKEN_USAGE_MAX_SESSIONS if max_sessions is None else max_sessions
+
+        self._by_kind: Dict[str, _Usage] = {}
+        self._by_session: "OrderedDict[str, _Usage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def prompt_budget(self) -> Optional[int]:
+        """Tokens a prompt may use, or None when turns are unlimited."""
+        if not self.per_turn:
+            return None
+        return max(0, self.per_turn - self.completion_reserve)
+
+    def _usage(self, table: Dict[str, _Usage], key: str) -> _Usage:
+        usage = table.get(key)
+        if usage is None:
+            usage = table[key] = _Usage(self.latency_window)
+        return usage
+
+    def _session_usage(self, session_id: str) -> _Usage:
+        # Least recently active sessions are dropped once the table is full
+        usage = self._by_session.get(session_id)
+        if usage is None:
+            usage = self._by_session[session_id] = _Usage(self.latency_window)
+            while self.max_sessions and len(self._by_session) > self.max_sessions:
+                self._by_session.popitem(last=False)
+        else:
+            self._by_session.move_to_end(session_id)
+        return usage
+
+    def _refuse(self, session_id: str, kind: str, message: str, scope: str) -> None:
+        with self._lock:
+            self._usage(self._by_kind, kind).refused += 1
+            self._session_usage(session_id).refused += 1
+        raise BudgetExceeded(message, scope)
+
+    def trim(self, context: str, max_tokens: int) -> str:
+        """
+        Fit ``context`` into ``max_tokens``.
+
+        Contexts are blank-line separated blocks in rank order, so whole
+        blocks are dropped from the end first; a single oversized block is
+        cut short.
+        """
+        if self.counter.count(context) <= max_tokens:
+            return context
+        blocks = context.split("\n\n")
+        while len(blocks) > 1 and self.counter.count("\n\n".join(blocks)) > max_tokens:
+            blocks.pop()
+        trimmed = "\n\n".join(blocks)
+        tokens = self.counter.count(trimmed)
+        if tokens > max_tokens:
+            trimmed = trimmed[:int(len(trimmed) * max_tokens / tokens)]
+        return trimmed
+
+    def begin(self, session_id: Optional[str], kind: str, prompt: str, context: str = "") -> Turn:
+        """
+        Check budgets and fit the context for one turn.
+
+        Args:
+            session_id: Session (or thread) the turn is billed to
+            kind: Turn type for the report, e.g. 'rag', 'hybrid', 'agent'
+            prompt: The prompt without the context (template + question)
+            context: Retrieved context to fit into the remaining budget
+
+        Returns:
+            Turn whose ``context`` is the (possibly trimmed) context
+
+        Raises:
+            BudgetExceeded: If the session budget is spent or the prompt
+                does not fit even without context
+        """
+        session_id = session_id or DEFAULT_SESSION
+        if self.per_session:
+            with self._lock:
+                used = self._session_usage(session_id).total_tokens
+            if used >= self.per_session:
+                self._refuse(session_id, kind, f"Session token budget of {self.per_session} is used up ({used} tokens)", "session")
+
+        fixed = self.counter.count(prompt)
+        context_tokens = self.counter.count(context)
+        fitted, trimmed = context, 0
+
+        budget = self.prompt_budget
+        if budget is not None:
+            if fixed > budget:
+                self._refuse(session_id, kind, f"Request needs about {fixed} prompt tokens; the per-turn limit is {budget}", "turn")
+            if fixed + context_tokens > budget:
+                fitted = self.trim(context, budget - fixed)
+                trimmed = context_tokens - self.counter.count(fitted)
+                context_tokens -= trimmed
+
+        return Turn(self, session_id, kind, fitted, fixed + context_tokens, trimmed)
+
+    def _record(self, turn: Turn) -> None:
+        prompt_tokens, completion_tokens = turn.totals()
+        with self._lock:
+            self._usage(self._by_kind, turn.kind).add(turn, prompt_tokens, completion_tokens)
+            self._session_usage(turn.session_id).add(turn, prompt_tokens, completion_tokens)
+
+    def session(self, session_id: str = None) -> dict:
+        """Usage of one session plus its remaining budget."""
+        session_id = session_id or DEFAULT_SESSION
+        with self._lock:
+            usage = self._session_usage(session_id).to_dict()
+        if self.per_session:
+            usage["budget"] = self.per_session
+            usage["remaining"] = max(0, self.per_session - usage["total_tokens"])
+        return usage
+
+    def report(self) -> dict:
+        """Aggregated usage by turn kind and by session, with the totals."""
+        with self._lock:
+            total = _Usage()
+            for usage in self._by_kind.values():
+                total.merge(usage)
+            return {
+                "budgets": {"per_turn": self.per_turn, "per_session": self.per_session, "completion_reserve": self.completion_reserve},
+                "exact_tokenizer": self.counter.exact,
+                "total": total.to_dict(),
+                "by_kind": {kind: usage.to_dict() for kind, usage in self._by_kind.items()},
+                "by_session": {session: usage.to_dict() for session, usage in self._by_session.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_kind.clear()
+            self._by_session.clear()
+
+
+usage_tracker = UsageTracker()
@@ -1,10 +1,27 @@
 from core.embeddings import EmbeddingManager
+from core.model_registry import model_registry
+from core.telemetry import telemetry
+from core.quantization import QuantizedFlatIndex, quantized_or_none
+from core.dim_reduction import DimensionReducer, ReducedEmbeddings
+from core.metadata_index import MetadataIndex
+from core.chunk_windows import EXPAND_MODES, ChunkNeighborIndex, document_key, join_chunks, merge_spans
+from core.index_snapshot import IndexSnapshot, clone_store
+from core.segment_store import SegmentStore
 from config.settings import settings
-from typing import Optional , List 
+from typing import Optional , List , Set , Tuple
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStoreRetriever
+import faiss
+import numpy as np
+import itertools
 import os 
+import pickle
+import threading
+import weakref
 
 class VectorStoreManager:
     
@@ -18,17 +35,67 @@ class VectorStoreManager:
         embedding_manager (EmbeddingManager): Manages text embeddings
         vector_store (Optional[FAISS]): The FAISS vector store instance
         index_path (str): File path for saving/loading the vector store
+        quantization (str): Vector storage mode - 'none' (float32), 'float16',
+            'int8' or 'binary'. Compressed modes rescore candidates exactly.
+        reduction (str): Embedding dimension reduction - 'none', 'pca' or
+            'truncate' (Matryoshka models), down to ``target_dim``.
+        segmented (bool): Save as append-only segments (``SegmentStore``),
+            so a save only writes what changed since the previous one.
+            Managers saving to the same path add to one shared index.
+
+    Thread safety: the index is published as immutable, versioned
+    ``IndexSnapshot``s. A search reads the current snapshot once and runs
+    against it without locking. Adds and deletes copy the current version,
+    apply the change and swap the new version in; loads and clears build
+    or drop a version and swap. Writers are serialized among themselves,
+    but searches never wait for them, and a search in flight keeps the
+    version it started on.
+
+    The price is on the write side: every add or delete copies the whole
+    FAISS index, docstore and id map, and the metadata and neighbour
+    indexes, so a write costs O(N) in the index size and briefly holds two
+    copies of it. Pass chunks in large batches rather than a few at a time
+    (``IngestionQueue`` publishes each job with one ``add_documents``).
 
     """
     
-    def __init__(self ,embedding_manager : EmbeddingManager = None):
+    def __init__(
+        self ,
+        embedding_manager : EmbeddingManager = None,
+        quantization : str = None,
+        reduction : str = None,
+        target_dim : int = None,
+        segmented : bool = None):
 
         self.embedding_manager = embedding_manager or EmbeddingManager()
+        self.quantization : str = quantization or settings.VECTOR_QUANTIZATION
+        self.reduction : str = reduction or settings.EMBEDDING_REDUCTION
+        self.target_dim : int = target_dim or settings.EMBEDDING_TARGET_DIM
+        self.segmented : bool = settings.SEGMENTED_INDEX if segmented is None else segmented
+
+        # Current version; None until documents are added or an index is loaded
+        self._snapshot : Optional[IndexSnapshot] = None
+        self._versions = itertools.count(1)
+        # Replaced versions some search still holds
+        self._retired : "weakref.WeakSet[IndexSnapshot]" = weakref.WeakSet()
 
-        self._vector_store : Optional[FAISS] = None
+        # Serializes writers (never taken by searches)
+        self._write_lock = threading.Lock()
+        # Serializes building the first store so concurrent adds don't replace each other
+        self._create_lock = threading.Lock()
+        self._save_lock = threading.Lock()
         
         self.index_path : str = settings.FAISS_INDEX_PATH
 
+        # Segments on disk the in-memory index was loaded from or last saved
+        # to, plus what changed since: docstore ids added (always the last
+        # positions of the index) and persisted ids deleted. Guarded by
+        # _write_lock; _lineage changes whenever the index is replaced wholesale.
+        self._segments : Optional[SegmentStore] = None
+        self._unsaved : List[str] = []
+        self._deleted : Set[str] = set()
+        self._lineage = 0
+
     
     
     @property
@@ -37,10 +104,83 @@ class VectorStoreManager:
         Get the FAISS vector store instance.
         
         Returns:
-            Optional[FAISS]: The FAISS vector store instance if initialized, 
-                None otherwise.
+            Optional[FAISS]: The FAISS vector store of the current version if
+                initialized, None otherwise. It is never modified; later
+                writes publish a new one.
+        """
+        snapshot = self._snapshot
+        return snapshot.store if snapshot is not None else None
+
+    @property
+    def reducer(self) -> Optional[DimensionReducer]:
+        """Reducer of the current version (fitted on the first batch, saved with the index)."""
+        snapshot = self._snapshot
+        return snapshot.reducer if snapshot is not None else None
+
+    def snapshot(self) -> IndexSnapshot:
+        """
+        Current version, for several reads that must see the same index.
+
+        Raises:
+            ValueError: If vector store is not initialized
         """
-        return self._vector_store
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise ValueError("Vector store is not initialized. Add documents first.")
+        return snapshot
+
+    def _publish(self, store: FAISS, reducer: Optional[DimensionReducer], base: IndexSnapshot = None, reindex: bool = False) -> IndexSnapshot:
+        """
+        Build the derived indexes for ``store`` and make it the current version.
+
+        Called with ``_write_lock`` held. The metadata and neighbour indexes
+        are extended from ``base`` when positions were only appended, and
+        rebuilt otherwise, so no search ever has to sync them.
+        """
+        if base is not None and not reindex:
+            metadata_index, neighbor_index = base.metadata_index.copy(), base.neighbor_index.copy()
+        else:
+            metadata_index = MetadataIndex(settings.FILTERABLE_METADATA_FIELDS)
+            neighbor_index = ChunkNeighborIndex()
+        metadata_index.sync(store)
+        neighbor_index.sync(store)
+
+        snapshot = IndexSnapshot(next(self._versions), store, reducer, metadata_index, neighbor_index)
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is not None:
+            self._retired.add(previous)
+        return snapshot
+
+    def _replace(self, store: Optional[FAISS], reducer: Optional[DimensionReducer], segments: Optional[SegmentStore]) -> None:
+        # A whole new index (create, load, clear): called with _write_lock held
+        self._lineage += 1
+        self._reset_persisted(segments)
+        if store is None:
+            previous, self._snapshot = self._snapshot, None
+            if previous is not None:
+                self._retired.add(previous)
+        else:
+            self._publish(store, reducer)
+
+    def snapshot_stats(self) -> dict:
+        """Current version and replaced versions still pinned by searches."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot is not None else None,
+            "vectors": snapshot.ntotal if snapshot is not None else 0,
+            "retired_pinned": sorted(old.version for old in list(self._retired)),
+        }
+
+    @property
+    def embedding_function(self) -> Embeddings:
+        """Embeddings as stored in the index (reduced when a reducer is active)."""
+        return self._embeddings_for(self.reducer)
+
+    def _embeddings_for(self, reducer: Optional[DimensionReducer]) -> Embeddings:
+
+        if reducer is None:
+            return self.embedding_manager.embeddings
+        return ReducedEmbeddings(self.embedding_manager.embeddings, reducer)
 
     @property
     def is_initialized(self) -> bool:
@@ -50,9 +190,9 @@ class VectorStoreManager:
             Returns:
                 bool: True if vector store contains documents, False otherwise.
         """
-        return self._vector_store is not None
+        return self._snapshot is not None
     
-    def create_from_documents(self , documents :List[Document] ) -> FAISS :
+    def create_from_documents(self , documents :List[Document], embeddings : List[List[float]] = None ) -> FAISS :
         """
         Create a new FAISS vector store from a list of documents.
         
@@ -64,6 +204,9 @@ class VectorStoreManager:
             documents (List[Document]): A list of LangChain Document objects 
                 to be indexed. Each document should contain text in the 
                 page_content field.
+            embeddings: Unreduced document vectors computed beforehand
+                (e.g. batch by batch by an ingestion job); embedded here
+                when omitted.
                 
         Returns:
             FAISS: The newly created FAISS vector store instance.
@@ -71,39 +214,214 @@ class VectorStoreManager:
         Raises:
             ValueError: If documents list is empty.
         """
-        self._vector_store = FAISS.from_documents(
-            documents= documents,
-            embedding= self.embedding_manager.embeddings
-        )
+        if not documents:
+            raise ValueError("No documents to index.")
+
+        vectors = embeddings
+        if vectors is None:
+            vectors = self._embed_documents(documents, self.embedding_manager.embeddings)
+
+        reducer = None
+        if self.reduction != "none" and self.target_dim:
+            reducer = DimensionReducer.fit(vectors, self.reduction, self.target_dim)
+            vectors = reducer.transform(vectors).tolist()
+
+        # The new store is built aside; searches keep using the old one until the swap
+        with telemetry.span("index_add", count=len(documents)):
+            vector_store = self._new_store(len(vectors[0]), reducer)
+            vector_store.add_embeddings(
+                text_embeddings= list(zip([doc.page_content for doc in documents], vectors)),
+                metadatas= [doc.metadata for doc in documents],
+                ids= self._document_ids(documents)
+            )
+
+        with self._write_lock:
+            self._replace(vector_store, reducer, None)
 
-        return self._vector_store
+        return vector_store
     
 
-    def add_documents(self , documents :List[Document] ) -> FAISS :
+    def _new_store(self, dimension: int, reducer: Optional[DimensionReducer] = None) -> FAISS:
+        """Empty FAISS store using a flat float32 or a quantized index."""
+        index = quantized_or_none(dimension, self.quantization, settings.QUANTIZATION_RESCORE_FACTOR)
+        return FAISS(
+            embedding_function= self._embeddings_for(reducer),
+            index= index if index is not None else faiss.IndexFlatL2(dimension),
+            docstore= InMemoryDocstore(),
+            index_to_docstore_id= {}
+        )
+
+    def _embed_documents(self, documents: List[Document], embeddings: Embeddings = None) -> List[List[float]]:
+
+        with telemetry.span("embed", count=len(documents)):
+            return (embeddings or self.embedding_function).embed_documents(
+                [doc.page_content for doc in documents]
+            )
+
+    def embed_documents(self, documents: List[Document]) -> List[List[float]]:
+        """
+        Embed documents for a later ``add_documents(documents, embeddings=...)``.
+
+        Lets callers embed in small batches (reporting progress, checking
+        for cancellation) and still index a whole file in one step.
+        """
+        return self._embed_documents(documents)
+
+    def _embed_query(self, query: str) -> List[float]:
+
+        with telemetry.span("embed", count=1):
+            return self.embedding_function.embed_query(query)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Query vector in index space, for the ``*_by_vector`` searches."""
+        return self._embed_query(query)
+
+    @staticmethod
+    def _document_ids(documents: List[Document]) -> Optional[List[str]]:
+        # Same rule as VectorStore.from_documents: keep ids only when provided
+        ids = [doc.id for doc in documents]
+        return ids if any(ids) else None
+
+    def add_documents(self , documents :List[Document], embeddings : List[List[float]] = None ) -> FAISS :
         """
             Add documents to the vector store.
-            Creates new store if not initialized.
+            Creates new store if not initialized. Copies the current index
+            (O(N), see the class docstring), so batch the documents.
             
             Args:
                 documents: List of Document objects to add
+                embeddings: Vectors from ``embed_documents``; embedded here
+                    when omitted
                 
             Returns:
                 FAISS vector store instance
         """
         if not self.is_initialized :
-            self._vector_store = self.create_from_documents(documents)
-        else:
-            self._vector_store.add_documents(documents)
-        
-        return self._vector_store
+            with self._create_lock:
+                if not self.is_initialized:
+                    return self.create_from_documents(documents, embeddings)
+
+        vectors = embeddings if embeddings is not None else self._embed_documents(documents)
+
+        with self._write_lock:
+            current = self._snapshot
+            if current is None:
+                raise ValueError("Vector store was cleared while documents were being added.")
+            reducer = current.reducer
+
+            # Embedded before the first store (and its reducer) existed
+            if reducer is not None and len(vectors[0]) != current.store.index.d:
+                vectors = reducer.transform(vectors).tolist()
+
+            with telemetry.span("index_add", count=len(documents)):
+                vector_store = clone_store(current.store)
+                ids = vector_store.add_embeddings(
+                    text_embeddings= list(zip([doc.page_content for doc in documents], vectors)),
+                    metadatas= [doc.metadata for doc in documents],
+                    ids= self._document_ids(documents)
+                )
+                self._publish(vector_store, reducer, base=current)
+            self._unsaved.extend(ids)
+            return vector_store
+
+    def _reset_persisted(self, segments: Optional[SegmentStore]) -> None:
+
+        self._segments = segments
+        self._unsaved = []
+        self._deleted = set()
+
+    def delete(self, ids: List[str] = None, filter: dict = None) -> int:
+        """
+        Remove chunks from the index.
+
+        With a segmented index the next save only records the deleted ids
+        as tombstones; their rows are dropped from disk when the segments
+        are compacted.
+
+        Args:
+            ids: Docstore ids to remove
+            filter: Metadata filter (see ``search``); combined with ``ids``
+                when both are given
+
+        Returns:
+            Number of chunks removed
+        """
+        if not self.is_initialized:
+            raise ValueError("Vector store is not initialized.")
+        if ids is None and not filter:
+            raise ValueError("Pass ids and/or a metadata filter to delete.")
+
+        with self._write_lock:
+            current = self._snapshot
+            store = current.store
+            if filter:
+                positions = current.metadata_index.resolve(filter)
+                targets = {store.index_to_docstore_id[int(position)] for position in positions}
+                if ids is not None:
+                    targets &= set(ids)
+            else:
+                targets = {i for i in ids if isinstance(store.docstore.search(i), Document)}
+            if not targets:
+                return 0
+
+            with telemetry.span("index_delete", count=len(targets)):
+                vector_store = clone_store(store)
+                vector_store.delete(list(targets))
+                # Positions after the deleted rows have shifted
+                self._publish(vector_store, current.reducer, base=current, reindex=True)
+
+            unsaved = set(self._unsaved)
+            self._deleted |= targets - unsaved
+            if targets & unsaved:
+                self._unsaved = [i for i in self._unsaved if i not in targets]
+            return len(targets)
     
-    def search(self,query: str,k: int = None) -> List[Document]:
+    def _search_subset(self, snapshot: IndexSnapshot, query_vector: List[float], positions: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k over a subset of FAISS positions.
+
+        Small subsets are scored directly from their stored vectors, so the
+        cost is proportional to the subset. Larger ones are pushed down into
+        FAISS with an ID selector.
+        """
+        index = snapshot.store.index
+        query = np.asarray([query_vector], dtype="float32")
+
+        if len(positions) <= settings.FILTER_BRUTE_FORCE_MAX:
+            vectors = index.reconstruct_batch(positions)
+            distances = ((vectors - query[0]) ** 2).sum(axis=1)
+            top = np.argsort(distances)[:k]
+            return distances[top], positions[top]
+
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(positions))
+        distances, labels = index.search(query, k, params=params)
+        keep = labels[0] >= 0
+        return distances[0][keep], labels[0][keep]
+
+    def _search_by_vector(self, snapshot: IndexSnapshot, query_vector: List[float], k: int, metadata_filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+
+        store = snapshot.store
+        positions = snapshot.metadata_index.resolve(metadata_filter)
+        if positions is None:
+            return store.similarity_search_with_score_by_vector(query_vector, k=k)
+        if not len(positions):
+            return []
+
+        distances, labels = self._search_subset(snapshot, query_vector, positions, k)
+        return [
+            (store.docstore.search(store.index_to_docstore_id[int(position)]), float(distance))
+            for distance, position in zip(distances, labels)
+        ]
+
+    def search(self,query: str,k: int = None, filter: dict = None) -> List[Document]:
         """
             Search for similar documents.
             
             Args:
                 query: Search query text
                 k: Number of results to return (default from settings)
+                filter: Optional metadata filter, e.g. ``{"source": "a.pdf",
+                    "page": {"gte": 2, "lte": 5}}`` (see MetadataIndex)
                 
             Returns:
                 List of similar Document objects
@@ -111,32 +429,180 @@ class VectorStoreManager:
             Raises:
                 ValueError: If vector store is not initialized
         """
-        if not self.is_initialized:
-            raise ValueError("Vector store is not initialized. Add documents first.")
-        
-        k = k or settings.TOP_K_RESULTS
+        return [doc for doc, _ in self.search_with_scores(query, k=k, filter=filter)]
 
-        return self._vector_store.similarity_search(
-            query=query,
-            k=k
-            )
-    def search_with_scores(self, query: str,k: int = None) -> List[tuple]:
+    def search_with_scores(self, query: str,k: int = None, filter: dict = None) -> List[tuple]:
         """
         Search for similar documents with relevance scores.
         
         Args:
             query: Search query text
             k: Number of results to return
+            filter: Optional metadata filter (see ``search``)
             
         Returns:
             List of (Document, score) tuples
         """
-        if not self.is_initialized:
-            raise ValueError("Vector store is not initialized. Add documents first.")
+        snapshot = self.snapshot()
         
         k = k or settings.TOP_K_RESULTS
-        return self._vector_store.similarity_search_with_score(query, k=k)
+        # Embedded for the version searched, in case a load changes the reducer meanwhile
+        with telemetry.span("embed", count=1):
+            query_vector = self._embeddings_for(snapshot.reducer).embed_query(query)
+
+        with telemetry.span("search", k=k, filtered=bool(filter)):
+            return self._search_by_vector(snapshot, query_vector, k, filter)
+
+    def search_with_scores_by_vector(self, query_vector: List[float], k: int = None, filter: dict = None) -> List[tuple]:
+        """
+        Same as ``search_with_scores`` for an already embedded query.
+
+        The vector must be in index space, i.e. from ``embedding_function``
+        (already reduced when a reducer is active).
+        """
+        snapshot = self.snapshot()
+
+        k = k or settings.TOP_K_RESULTS
+        with telemetry.span("search", k=k, filtered=bool(filter)):
+            return self._search_by_vector(snapshot, query_vector, k, filter)
+
+    def mmr_search(
+        self,
+        query: str,
+        k: int = None,
+        lambda_mult: float = 0.5,
+        fetch_k: int = 20,
+        filter: dict = None
+    ) -> List[Document]:
+        """
+        MMR search restricted to documents matching a metadata filter.
+
+        Candidates come from the filtered ID set instead of being fetched
+        from the whole corpus and discarded afterwards.
+
+        Args:
+            query: Search query text
+            k: Number of results to return
+            lambda_mult: Relevance/diversity trade-off (1 = pure relevance)
+            fetch_k: Candidates to re-rank with MMR
+            filter: Optional metadata filter (see ``search``)
+
+        Returns:
+            List of diverse, relevant Document objects
+        """
+        self.snapshot()
+
+        return self.mmr_search_by_vector(self._embed_query(query), k, lambda_mult, fetch_k, filter)
+
+    def mmr_search_by_vector(
+        self,
+        query_vector: List[float],
+        k: int = None,
+        lambda_mult: float = 0.5,
+        fetch_k: int = 20,
+        filter: dict = None
+    ) -> List[Document]:
+        """Same as ``mmr_search`` for a query vector from ``embed_query``."""
+        snapshot = self.snapshot()
+        store = snapshot.store
+
+        k = k or settings.TOP_K_RESULTS
+        if not filter:
+            with telemetry.span("search_mmr", k=k):
+                return store.max_marginal_relevance_search_by_vector(
+                    query_vector, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+                )
+
+        with telemetry.span("search_mmr", k=k, filtered=True):
+            positions = snapshot.metadata_index.resolve(filter)
+            if not len(positions):
+                return []
+            _, labels = self._search_subset(snapshot, query_vector, positions, max(fetch_k, k))
+            candidates = store.index.reconstruct_batch(labels)
+            selected = maximal_marginal_relevance(
+                np.asarray(query_vector, dtype="float32"),
+                candidates,
+                k=k,
+                lambda_mult=lambda_mult
+            )
+
+        return [store.docstore.search(store.index_to_docstore_id[int(labels[i])]) for i in selected]
     
+    def search_windows(
+        self,
+        query: str,
+        k: int = None,
+        window: int = None,
+        expand: str = None,
+        filter: dict = None
+    ) -> List[Document]:
+        """
+        Small-to-big search: rank small chunks, return their surroundings.
+
+        Each hit is expanded to ``window`` neighbouring chunks on each side
+        (or to its page with ``expand="section"``), neighbours are fetched
+        through the offset index, and overlapping windows of the same
+        document are merged, so the result may hold fewer than ``k``
+        documents. Hits indexed without chunk numbers are returned as is.
+
+        Args:
+            query: Search query text
+            k: Number of chunks to rank (default from settings)
+            window: Neighbours per side (settings.SMALL_TO_BIG_WINDOW)
+            expand: 'window' or 'section' (settings.SMALL_TO_BIG_EXPAND)
+            filter: Optional metadata filter applied to the ranked chunks
+
+        Returns:
+            One Document per merged window, best hit first; metadata is the
+            best hit's plus ``chunk_range`` = [first, last]
+        """
+        hits = [doc for doc, _ in self.search_with_scores(query, k=k, filter=filter)]
+        return self.expand_hits(hits, window=window, expand=expand)
+
+    def expand_hits(self, hits: List[Document], window: int = None, expand: str = None) -> List[Document]:
+        """
+        Expand ranked hits to their neighbouring chunks (see ``search_windows``).
+
+        Args:
+            hits: Documents from this store, best first
+            window: Neighbours per side (settings.SMALL_TO_BIG_WINDOW)
+            expand: 'window' or 'section' (settings.SMALL_TO_BIG_EXPAND)
+        """
+        window = settings.SMALL_TO_BIG_WINDOW if window is None else window
+        expand = expand or settings.SMALL_TO_BIG_EXPAND
+        if expand not in EXPAND_MODES:
+            raise ValueError(f"Unknown expand mode '{expand}'. Use one of {EXPAND_MODES}")
+
+        snapshot = self.snapshot()
+        neighbor_index = snapshot.neighbor_index
+        with telemetry.span("expand_windows", hits=len(hits)):
+            spans, span_hits, expanded = [], [], []
+            for rank, doc in enumerate(hits):
+                span = neighbor_index.span(doc.metadata, window, expand, settings.SMALL_TO_BIG_MAX_CHUNKS)
+                if span is None:
+                    expanded.append((rank, doc))
+                else:
+                    spans.append((document_key(doc.metadata), span))
+                    span_hits.append(rank)
+
+            store = snapshot.store
+            for key, first, last, best in merge_spans(spans):
+                rank = span_hits[best]
+                chunks = []
+                for chunk_index in range(first, last + 1):
+                    position = neighbor_index.position(key, chunk_index)
+                    if position is not None:
+                        chunks.append(store.docstore.search(store.index_to_docstore_id[position]))
+                if not chunks:
+                    # The hit's document is not in this version (replaced since the search ran)
+                    expanded.append((rank, hits[rank]))
+                    continue
+                metadata = dict(hits[rank].metadata)
+                metadata["chunk_range"] = [chunks[0].metadata["chunk_index"], chunks[-1].metadata["chunk_index"]]
+                expanded.append((rank, Document(page_content=join_chunks(chunks), metadata=metadata)))
+
+        return [doc for _, doc in sorted(expanded, key=lambda item: item[0])]
+
     def get_retriever(self, k: int = None) -> VectorStoreRetriever:
         """
             Get a similarity-based retriever interface for the vector store.
@@ -159,7 +625,8 @@ class VectorStoreManager:
             raise ValueError("Vector store is not initialized.")
         
         k = k or settings.TOP_K_RESULTS
-        return self._vector_store.as_retriever(
+        # Bound to the current version; documents added later are not seen
+        return self.vector_store.as_retriever(
             search_type="similarity",
             search_kwargs={"k": k}
         )
@@ -188,7 +655,7 @@ class VectorStoreManager:
             raise ValueError("Vector store is not initialized.")
         
         k = k or settings.TOP_K_RESULTS
-        return self._vector_store.as_retriever(
+        return self.vector_store.as_retriever(
             search_type="mmr",
             search_kwargs={"k": k , "lambda_mult": lambda_mult}
         )
@@ -196,6 +663,10 @@ class VectorStoreManager:
     def save(self, path: str = None) -> None:
         """
         Save vector store to disk.
+
+        Writes the version current when the save starts; searches and
+        writers carry on meanwhile, and changes made during the save are
+        written by the next one.
         
         Args:
             path: Directory path to save (default from settings)
@@ -205,28 +676,220 @@ class VectorStoreManager:
         
         save_path = path or self.index_path
         os.makedirs(save_path , exist_ok= True)
-        self._vector_store.save_local(save_path )
+
+        with self._save_lock:
+            with self._write_lock:
+                snapshot = self._snapshot
+                lineage = self._lineage
+                segments, unsaved, deleted = self._segments, list(self._unsaved), set(self._deleted)
+
+            if not self.segmented:
+                self._write_files(snapshot, save_path)
+                segments = None
+            elif segments is not None and segments.path == os.path.abspath(save_path):
+                self._write_delta(snapshot, segments, unsaved, deleted)
+            else:
+                segments = self._write_base(snapshot, save_path)
+
+            with self._write_lock:
+                if self._lineage == lineage:
+                    saved = set(unsaved)
+                    # Saved rows deleted during the save are on disk now and need tombstones
+                    self._deleted = (self._deleted - deleted) | (saved - set(self._unsaved))
+                    self._unsaved = [i for i in self._unsaved if i not in saved]
+                    self._segments = segments
+
+        # Sessions that load the shared copy from now on should see this version
+        model_registry.evict(self._shared_key(save_path))
+
+    @staticmethod
+    def _rows(snapshot: IndexSnapshot, start: int, stop: int) -> tuple:
+        """Docstore ids, index-space vectors and documents of positions [start, stop)."""
+        store = snapshot.store
+        ids = [store.index_to_docstore_id[position] for position in range(start, stop)]
+        vectors = store.index.reconstruct_n(start, stop - start) if stop > start else None
+        return ids, vectors, [store.docstore.search(i) for i in ids]
+
+    def _write_base(self, snapshot: IndexSnapshot, save_path: str) -> SegmentStore:
+        """
+        Write the whole version as one segment.
+
+        An index saved there by another session is kept: only rows it does
+        not hold yet are added, and its vectors must have been projected
+        the same way.
+        """
+        segments = SegmentStore(save_path)
+        with segments.exclusive():
+            if segments.exists():
+                self._check_compatible(snapshot.reducer, save_path)
+            created = segments.merge(snapshot.store.index.d, *self._rows(snapshot, 0, snapshot.ntotal))
+            if created:
+                if snapshot.reducer is not None:
+                    snapshot.reducer.save(save_path)
+                else:
+                    DimensionReducer.remove_from(save_path)
+        return segments
+
+    @staticmethod
+    def _check_compatible(reducer: Optional[DimensionReducer], save_path: str) -> None:
+        saved = DimensionReducer.load(save_path) if DimensionReducer.is_saved_in(save_path) else None
+        if (reducer is None) != (saved is None) or (reducer is not None and not reducer.same_as(saved)):
+            raise ValueError(
+                f"The index at {save_path} was reduced with another projection. "
+                "Load it before saving, or save to another path."
+            )
+
+    def _write_delta(self, snapshot: IndexSnapshot, segments: SegmentStore, unsaved: List[str], deleted: Set[str]) -> None:
+        """Append what changed since the last save as a segment and tombstones."""
+        ntotal = snapshot.ntotal
+        segments.append(*self._rows(snapshot, ntotal - len(unsaved), ntotal), tombstones=deleted)
+        segments.compact_async()
+
+    def _write_files(self, snapshot: IndexSnapshot, save_path: str) -> None:
+        """Write the version as a single FAISS index and docstore pickle."""
+        SegmentStore.remove_from(save_path)
+
+        store = snapshot.store
+        if isinstance(store.index, QuantizedFlatIndex):
+            # LangChain's save_local only handles native faiss indexes
+            store.index.save(save_path)
+            with open(os.path.join(save_path, "index.pkl"), "wb") as f:
+                pickle.dump((store.docstore, store.index_to_docstore_id), f)
+        else:
+            store.save_local(save_path )
+            if QuantizedFlatIndex.is_saved_in(save_path):
+                os.remove(os.path.join(save_path, "quantized.json"))
+
+        if snapshot.reducer is not None:
+            snapshot.reducer.save(save_path)
+        else:
+            DimensionReducer.remove_from(save_path)
     
-    def load(self, path: str = None) -> FAISS:
+    def _shared_key(self, path: str) -> tuple:
+
+        return ("faiss_index", os.path.abspath(path), self.embedding_manager.model_name)
+
+    def _load_local(self, load_path: str, embeddings: Embeddings = None) -> FAISS:
+
+        embeddings = embeddings or self.embedding_function
+        if QuantizedFlatIndex.is_saved_in(load_path):
+            with open(os.path.join(load_path, "index.pkl"), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            return FAISS(
+                embedding_function= embeddings,
+                index= QuantizedFlatIndex.load(load_path),
+                docstore= docstore,
+                index_to_docstore_id= index_to_docstore_id
+            )
+
+        return FAISS.load_local(
+            load_path ,
+            embeddings= embeddings,
+            allow_dangerous_deserialization= True
+        )
+
+    def _load_segments(self, load_path: str, reducer: Optional[DimensionReducer]) -> FAISS:
+
+        dimension, segments = SegmentStore(load_path).read()
+        vector_store = self._new_store(dimension, reducer)
+        with telemetry.span("index_load", segments=len(segments)):
+            for ids, vectors, documents in segments:
+                if not ids:
+                    continue
+                # Added directly so memory-mapped vectors are not copied into lists
+                start = vector_store.index.ntotal
+                vector_store.index.add(vectors)
+                vector_store.docstore.add(dict(zip(ids, documents)))
+                vector_store.index_to_docstore_id.update({start + i: doc_id for i, doc_id in enumerate(ids)})
+        return vector_store
+
+    def _read_store(self, load_path: str, reducer: Optional[DimensionReducer]) -> FAISS:
+        """Segmented layout if present, else a single saved index."""
+        if SegmentStore.is_saved_in(load_path):
+            return self._load_segments(load_path, reducer)
+        return self._load_local(load_path, self._embeddings_for(reducer))
+
+    def segment_stats(self) -> Optional[dict]:
+        """On-disk segments of the loaded or last saved index, with unsaved changes."""
+        segments = self._segments
+        if segments is None:
+            return None
+        return {**segments.stats(), "unsaved": len(self._unsaved), "unsaved_deletes": len(self._deleted)}
+
+    def load(self, path: str = None, shared: bool = False) -> FAISS:
         """
         Load vector store from disk.
-        
+
+        The loaded index is built aside and swapped in as a new version;
+        searches keep using the previous one until then.
+
         Args:
             path: Directory path to load from (default from settings)
-            
+            shared: Reuse one process-wide copy of the index instead of
+                loading a private one. Versions are never modified, so
+                later writes copy it instead of changing it.
+
         Returns:
             Loaded FAISS vector store
         """
         load_path = path or self.index_path
         if not os.path.exists(load_path) :
             raise FileNotFoundError(f"No saved index found at {load_path}")
-        self._vector_store = FAISS.load_local(
-            load_path ,
-            embeddings= self.embedding_manager.embeddings,
-            allow_dangerous_deserialization= True
-        )
-        return self._vector_store
-    
+
+        # Queries must be projected exactly like the stored vectors
+        reducer = DimensionReducer.load(load_path) if DimensionReducer.is_saved_in(load_path) else None
+
+        if shared:
+            vector_store = model_registry.get_or_create(
+                self._shared_key(load_path),
+                lambda: self._read_store(load_path, reducer)
+            )
+        else:
+            vector_store = self._read_store(load_path, reducer)
+
+        with self._write_lock:
+            self._replace(vector_store, reducer, SegmentStore(load_path) if SegmentStore.is_saved_in(load_path) else None)
+        return vector_store
+
+    def versions(self, path: str = None) -> List[dict]:
+        """
+        Index versions retained on disk (segmented indexes only), oldest first.
+
+        Every save, compaction and rollback records a version; the last
+        settings.INDEX_KEEP_VERSIONS are kept with their segments.
+        """
+        load_path = path or self.index_path
+        if not SegmentStore.is_saved_in(load_path):
+            return []
+        return SegmentStore(load_path).versions()
+
+    def rollback(self, version: int, path: str = None) -> FAISS:
+        """
+        Make a retained on-disk version current again and load it.
+
+        The rollback is itself recorded as a new version, so it can be
+        undone the same way. Unsaved changes in memory are discarded.
+        Other sessions' saves wait until the rolled-back index is loaded,
+        so the loaded index is exactly the version asked for.
+
+        Args:
+            version: A version from ``versions()``
+            path: Index directory (default from settings)
+
+        Returns:
+            Loaded FAISS vector store
+        """
+        load_path = path or self.index_path
+        if not SegmentStore.is_saved_in(load_path):
+            raise ValueError(f"No segmented index at {load_path}; only segmented indexes keep versions.")
+
+        segments = SegmentStore(load_path)
+        with self._save_lock, segments.exclusive():
+            segments.rollback(version)
+            model_registry.evict(self._shared_key(load_path))
+            return self.load(load_path)
+
     def clear(self) -> None:
         """Clear the vector store from memory."""
-        self._vector_store = None
\ No newline at end of file
+        with self._write_lock:
+            self._replace(None, None, None)
@@ -1,6 +1,7 @@
 from langchain_tavily import TavilySearch
 from core.vector_store import VectorStoreManager
 from config.settings import settings
+from core.telemetry import telemetry
 from typing import Literal , List , Optional
 import os 
 
@@ -64,7 +65,8 @@ class TavilySearchTool:
         Returns:
             Search results as formatted string
         """
-        results = self._search.invoke(query)
+        with telemetry.span("web_search"):
+            results = self._search.invoke(query)
         return self._format_results(results)
     
     def search_with_context(self, query: str) -> dict:
@@ -77,7 +79,8 @@ class TavilySearchTool:
         Returns:
             Dictionary with search results and metadata
         """
-        raw_results = self._search.invoke(query)
+        with telemetry.span("web_search"):
+            raw_results = self._search.invoke(query)
         
         return {
             "query": query,
@@ -115,7 +118,8 @@ class HybridSearchManager:
         self,
         query: str,
         use_web_search: bool = False,
-        doc_k: int = 3
+        doc_k: int = 3,
+        filter: dict = None
     ) -> dict:
         """
         Perform hybrid search.
@@ -124,6 +128,7 @@ class HybridSearchManager:
             query: Search query
             use_web_search: Whether to include web search results
             doc_k: Number of documents to retrieve
+            filter: Optional metadata filter for the document search
             
         Returns:
             Dictionary with document and web search results
@@ -136,7 +141,7 @@ class HybridSearchManager:
         
         # Document search (if vector store is initialized)
         if self.vector_store.is_initialized:
-            docs = self.vector_store.search(query, k=doc_k)
+            docs = self.vector_store.search(query, k=doc_k, filter=filter)
             results["document_results"] = docs
         
         # Web search (if enabled)
@@ -150,7 +155,8 @@ class HybridSearchManager:
         self,
         query: str,
         use_web_search: bool = False,
-        doc_k: int = 3
+        doc_k: int = 3,
+        filter: dict = None
     ) -> dict:
         """
         Perform hybrid search using MMR for diverse document results.
@@ -159,6 +165,7 @@ class HybridSearchManager:
             query: Search query
             use_web_search: Whether to include web search results
             doc_k: Number of documents to retrieve
+            filter: Optional metadata filter for the document search
 
         Returns:
             Dictionary with diverse document results and web search results
@@ -171,8 +178,7 @@ class HybridSearchManager:
         
         # Document search (if vector store is initialized)
         if self.vector_store.is_initialized:
-            retriever = self.vector_store.get_mmr_retriever(k=doc_k)
-            docs = retriever.invoke(query)
+            docs = self.vector_store.mmr_search(query, k=doc_k, filter=filter)
             results["document_results"] = docs
         
         # Web search (if enabled)
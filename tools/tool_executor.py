@@ -0,0 +1,278 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import settings
+from core.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    """
+    Process-wide pooled HTTP session for tools.
+
+    Keeps TCP/TLS connections alive across tool calls instead of opening a
+    new connection per ``requests.get``.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=settings.TOOL_HTTP_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class ToolPolicy:
+    """
+    Execution policy for one tool.
+
+    Attributes:
+        ttl: Seconds a successful result is reused (0 disables caching)
+        timeout: Wall-clock limit per attempt, in seconds
+        max_retries: Extra attempts after a retryable failure
+        backoff: Base delay for exponential backoff with jitter, in seconds
+        max_entries: Cache size
+    """
+
+    ttl: float = 0.0
+    timeout: float = 10.0
+    max_retries: int = 2
+    backoff: float = 0.25
+    max_entries: int = 256
+
+
+class ToolTimeout(Exception):
+    """A tool attempt exceeded its policy timeout."""
+
+    def __init__(self, message: str, worker: threading.Thread = None):
+        super().__init__(message)
+        # The timed-out attempt keeps running until its own I/O gives up
+        self.worker = worker
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (ToolTimeout, requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _cache_key(args: tuple, kwargs: dict) -> Hashable:
+    # "London", " london " and "LONDON" are the same question
+    def normalize(value):
+        return value.strip().lower() if isinstance(value, str) else value
+    return tuple(normalize(a) for a in args) + tuple(sorted((k, normalize(v)) for k, v in kwargs.items()))
+
+
+class _ToolStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.errors = 0
+        self.latencies_ms = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float, status: str, retries: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.cache_hits += status == "cache_hit"
+            self.errors += status == "error"
+            self.retries += retries
+            self.latencies_ms.append(elapsed_ms)
+
+    def summary(self) -> dict:
+        with self._lock:
+            ordered = sorted(self.latencies_ms)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "hit_rate": self.cache_hits / self.calls if self.calls else 0.0,
+            "retries": self.retries,
+            "errors": self.errors,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "max_ms": ordered[-1] if ordered else 0.0,
+        }
+
+
+class ToolExecutor:
+    """
+    Runs tool functions with caching, timeouts, retries and metrics.
+
+    Each registered tool has a ``ToolPolicy``. A call first checks the
+    tool's TTL cache (keyed on normalised arguments), then runs the function
+    on a thread of its own, so the policy timeout starts when the attempt
+    starts and calls never queue behind other sessions' tools. Connection
+    errors, timeouts and 429/5xx responses are retried with exponential
+    backoff and jitter; a timed-out attempt is only retried once it has
+    finished, so a hung upstream holds at most one thread per call (tools
+    should also pass the timeout to their HTTP client, which is what ends
+    a hung request). Only successful results are cached. Latency of every call (including
+    cache hits) is recorded per tool, in ``stats()`` and as telemetry stage
+    ``tool_<name>``.
+    """
+
+    def __init__(self):
+        self._policies: Dict[str, ToolPolicy] = {}
+        self._caches: Dict[str, TTLCache] = {}
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, policy: ToolPolicy) -> None:
+        with self._lock:
+            self._policies[name] = policy
+            self._caches[name] = TTLCache(policy.ttl, policy.max_entries)
+            self._stats.setdefault(name, _ToolStats())
+
+    def _attempt(self, name: str, func: Callable, policy: ToolPolicy, args: tuple, kwargs: dict):
+        outcome = {}
+
+        def run():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except BaseException as exc:
+                outcome["error"] = exc
+
+        worker = threading.Thread(target=run, name=f"tool-{name}", daemon=True)
+        worker.start()
+        worker.join(policy.timeout)
+        if worker.is_alive():
+            raise ToolTimeout(f"timed out after {policy.timeout}s", worker)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def call(self, name: str, func: Callable, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` under the policy registered for ``name``.
+
+        Raises:
+            The last error once retries are exhausted (or immediately for
+            non-retryable errors)
+        """
+        if name not in self._policies:
+            self.register(name, ToolPolicy())
+        policy, cache, stats = self._policies[name], self._caches[name], self._stats[name]
+
+        start = time.perf_counter()
+        status = "ok"
+        retries = 0
+        try:
+            key = _cache_key(args, kwargs)
+            if policy.ttl > 0:
+                hit, value = cache.get(key)
+                if hit:
+                    status = "cache_hit"
+                    return value
+
+            for attempt in range(policy.max_retries + 1):
+                try:
+                    result = self._attempt(name, func, policy, args, kwargs)
+                    break
+                except Exception as exc:
+                    if attempt >= policy.max_retries or not _is_retryable(exc):
+                        raise
+                    delay = policy.backoff * (2 ** attempt) * (0.5 + random.random())
+                    logger.debug("tool %s attempt %d failed (%s), retrying in %.2fs", name, attempt + 1, exc, delay)
+                    if isinstance(exc, ToolTimeout) and exc.worker is not None:
+                        # Back off while the hung attempt finishes; give up if it does not
+                        exc.worker.join(delay)
+                        if exc.worker.is_alive():
+                            raise
+                    else:
+                        time.sleep(delay)
+                    retries += 1
+
+            if policy.ttl > 0:
+                cache.put(key, result)
+            return result
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.record(elapsed * 1000, status, retries)
+            telemetry.record(f"tool_{name}", elapsed, status=status)
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: stats.summary() for name, stats in self._stats.items()}
+
+    def clear_cache(self, name: str = None) -> None:
+        for tool_name, cache in self._caches.items():
+            if name is None or tool_name == name:
+                cache.clear()
+
+
+tool_executor = ToolExecutor()
+
+
+def managed_tool(name: str, policy: ToolPolicy) -> Callable:
+    """Route every call of the decorated function through ``tool_executor``."""
+    tool_executor.register(name, policy)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return tool_executor.call(name, func, *args, **kwargs)
+        return wrapper
+    return decorator
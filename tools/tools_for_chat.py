@@ -1,13 +1,39 @@
 from tools.tavily_search import TavilySearchTool
+from tools.tool_executor import ToolPolicy, http_session, managed_tool
 from langchain_core.tools import tool
 from config.settings import settings
-import requests
-import os
 
 # Initialize search tools (module level)
 _tavily_search = TavilySearchTool()
 
 
+@managed_tool("search_web_tavily", ToolPolicy(
+    ttl=settings.WEB_SEARCH_CACHE_TTL,
+    timeout=settings.TOOL_TIMEOUT_SECONDS,
+    max_retries=settings.TOOL_MAX_RETRIES
+))
+def _search_web(query: str) -> str:
+    return _tavily_search.search(query)
+
+
+@managed_tool("get_weather", ToolPolicy(
+    ttl=settings.WEATHER_CACHE_TTL,
+    timeout=settings.TOOL_TIMEOUT_SECONDS,
+    max_retries=settings.TOOL_MAX_RETRIES
+))
+def _fetch_weather(city: str) -> dict:
+    params = {
+        'q': city,              # City name method (easier)
+        'appid': settings.OPENWEATHER_API_KEY,
+        'units': 'metric'       # Celsius (most common globally)
+    }
+
+    # Pooled session: keep-alive connections are reused across calls
+    response = http_session().get(settings.OPENWEATHER_BASE_URL, params=params, timeout=settings.TOOL_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.json()
+
+
 @tool
 def search_web_tavily(query: str) -> str:
     """
@@ -19,7 +45,7 @@ def search_web_tavily(query: str) -> str:
         query: The search query string
     """
     try:
-        result = _tavily_search.search(query)
+        result = _search_web(query)
         return result
     except Exception as e:
         return f"Error searching Tavily: {str(e)}"
@@ -54,19 +80,8 @@ def get_weather(city: str) -> str:
     Args:
         city: City name (e.g., 'London', 'Mumbai', 'New York')
     """
-    api_key = settings.OPENWEATHER_API_KEY
-    base_url = "https://api.openweathermap.org/data/2.5/weather"
-    
     try:
-        params = {
-            'q': city,              # City name method (easier)
-            'appid': api_key,
-            'units': 'metric'       # Celsius (most common globally)
-        }
-        
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch_weather(city)
         
         return str({
             'city': data['name'],
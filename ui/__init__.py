@@ -5,6 +5,10 @@ from ui.components import (
     display_sidebar_info,
     display_file_uploader,
     display_processing_status,
+    display_ingestion_jobs,
+    display_readiness_status,
+    display_profiling_toggle,
+    display_token_usage,
     create_web_search_toggle
 )
 from ui.chat_interface import ChatInterface
@@ -16,6 +20,10 @@ __all__=[
     "display_sidebar_info",
     "display_file_uploader",
     "display_processing_status",
+    "display_ingestion_jobs",
+    "display_readiness_status",
+    "display_profiling_toggle",
+    "display_token_usage",
     "create_web_search_toggle",
     "ChatInterface"
 ]
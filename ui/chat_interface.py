@@ -1,46 +1,162 @@
+import hashlib
+import logging
+import os
+import re
+import uuid
 import streamlit as st
 from core.vector_store import VectorStoreManager
 from core.document_processor import DocumentProcessor
+from core.ingestion_jobs import IngestionQueue
 from core.chain import RAGchain
+from core.startup import WarmStartManager
+from core.telemetry import telemetry
+from core.profiling import TurnProfiler
+from core.query_classifier import QueryClassifier
+from core.token_budget import usage_tracker
+from core.stream_coalescer import stream_coalescer
+from core.tenant_store import TenantView, shared_tenant_store
+from config.settings import settings
 from tools.tavily_search import TavilySearchTool , HybridSearchManager 
-from typing import Optional , Generator
-from ui.components import add_message , save_uploaded_file
+from typing import Optional , Generator, Union
+from langchain_core.language_models import BaseChatModel
+from ui.components import add_message
+
+logger = logging.getLogger(__name__)
+
+
+def session_index_path(namespace: str) -> str:
+    """Directory a UI session's index is auto-saved to, under settings.SESSION_INDEX_DIR."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", namespace)
+    digest = hashlib.sha1(namespace.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(settings.SESSION_INDEX_DIR, f"{safe}-{digest}")
+
 
 class ChatInterface:
 
-    def __init__(self):
+    def __init__(
+        self,
+        vector_store : Union[VectorStoreManager, TenantView] = None,
+        tavily_search : TavilySearchTool = None,
+        llm : BaseChatModel = None,
+        namespace : str = None):
+        """
+        Initialize the chat interface.
+
+        Args:
+            vector_store: Vector store to use. By default a new
+                ``VectorStoreManager`` saving to ``session_index_path``:
+                warm start restores the session's own saved index, or the
+                shared settings.FAISS_INDEX_PATH the first time, and
+                settings.AUTO_SAVE_INDEX saves uploads back to the session
+                path only, so they are never visible to other sessions.
+                With settings.TENANT_STORE (opt-in), the session's
+                namespace of the process-wide ``TenantStore`` instead:
+                identical uploads are embedded once and each session only
+                sees its own, but small-to-big expansion, deletes, versions
+                and dimension reduction are not available there
+            tavily_search: Web search tool (Tavily by default)
+            llm: Chat model for RAG and hybrid answers (Groq by default)
+            namespace: Namespace of this session (user or thread id; a new
+                id by default), naming its tenant namespace or index path
+        """
         
+        # Token usage and budgets are tracked per Streamlit session
+        self.session_id = uuid.uuid4().hex
+        self.namespace = namespace or self.session_id
+
+        restore_path = None
+        if vector_store is None:
+            if settings.TENANT_STORE:
+                vector_store = shared_tenant_store().view(self.namespace, settings.TENANT_SHARED_NAMESPACES)
+            else:
+                vector_store = VectorStoreManager()
+                vector_store.index_path = session_index_path(self.namespace)
+                if not os.path.exists(vector_store.index_path):
+                    restore_path = settings.FAISS_INDEX_PATH
+
         self.doc_processor = DocumentProcessor()
-        self.vector_store = VectorStoreManager()
+        self.vector_store = vector_store
         self.rag_chain : Optional[RAGchain] = None 
-        self.tavily_search = TavilySearchTool()
+        self.tavily_search = tavily_search or TavilySearchTool()
         self.hybrid_search : Optional[HybridSearchManager] = None
+        self._llm : Optional[BaseChatModel] = llm
+        self.profiler = TurnProfiler()
+        self.usage = usage_tracker
+        self.coalescer = stream_coalescer
+        self.query_classifier = QueryClassifier(self.vector_store)
+
+        # Restore the saved index and warm the models without blocking the UI
+        self.warm_start = WarmStartManager(self.vector_store, index_path=restore_path)
+        if settings.WARM_START:
+            self.warm_start.start()
+
+        # Uploads are indexed in the background so the session stays usable
+        self.ingestion = IngestionQueue(
+            self.vector_store,
+            self.doc_processor,
+            wait_ready=self.warm_start.wait,
+            profiler=self.profiler
+        )
     
 
 
     
-    def process_uploaded_files(self, uploaded_files) -> int:
+    def _chat_llm(self) -> BaseChatModel:
+        """Chat model for hybrid answers: the injected one, or a fresh Groq client."""
+        if self._llm is not None:
+            return self._llm
+
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            model=settings.LLM_MODEL,
+            temperature=settings.LLM_TEMPERATURE,
+            api_key=settings.GROQ_API_KEY
+        )
+
+    def submit_ingestion(self, uploaded_files, profile: bool = False) -> str:
+        """
+        Queue uploaded files for background indexing.
+
+        Args:
+            uploaded_files: List of Streamlit UploadedFile objects
+            profile: Force profiling of this ingest job
+
+        Returns:
+            Job id to poll with ``self.ingestion.get``
+        """
+        return self.ingestion.submit(uploaded_files, profile=profile)
+
+    def process_uploaded_files(self, uploaded_files, profile: bool = False) -> int:
         """
         Process uploaded files and add to vector store.
         
         Args:
             uploaded_files: List of Streamlit UploadedFile objects
+            profile: Force profiling of this ingest job
             
         Returns:
             Number of chunks processed
         """
+        with self.profiler.profile("ingest", force=profile):
+            return self._process_uploaded_files(uploaded_files)
+
+    def _process_uploaded_files(self, uploaded_files) -> int:
         all_chunks = []
+        # Lets retrieval be restricted to one upload via filter={"upload_batch": ...}
+        upload_batch = uuid.uuid4().hex
+
+        # New documents must be merged into the restored index, not replaced by it
+        self.warm_start.wait()
         
         for uploaded_file in uploaded_files:
-            # Save file temporarily
-            file_path = save_uploaded_file(uploaded_file)
-            
-            # Process the document
-            chunks = self.doc_processor.process(file_path)
+            # Parse straight from the upload buffer (no temp file)
+            chunks = self.doc_processor.process(uploaded_file, filename=uploaded_file.name)
             
             # Add source metadata
             for chunk in chunks:
                 chunk.metadata["source"] = uploaded_file.name
+                chunk.metadata["upload_batch"] = upload_batch
             
             all_chunks.extend(chunks)
             
@@ -52,13 +168,16 @@ class ChatInterface:
         if all_chunks:
             self.vector_store.add_documents(all_chunks)
             st.session_state.vector_store_initialized = True
+
+            if settings.AUTO_SAVE_INDEX and self.vector_store.index_path:
+                self.vector_store.save()
         
         return len(all_chunks)
     
     def initialize_rag_chain(self):
         """Initialize the RAG chain after documents are loaded."""
         if self.vector_store.is_initialized:
-            self.rag_chain = RAGchain(self.vector_store)
+            self.rag_chain = RAGchain(self.vector_store, llm=self._llm)
             self.hybrid_search = HybridSearchManager(
                 self.vector_store,
                 self.tavily_search
@@ -96,7 +215,7 @@ class ChatInterface:
             # Get document results if available
             doc_results = []
             if self.vector_store.is_initialized:
-                doc_results = self.vector_store.search(query)
+                doc_results = self.rag_chain.retrieve(query)
                 
 
             # Format context
@@ -107,25 +226,18 @@ class ChatInterface:
                 for i, doc in enumerate(doc_results, 1):
                     source = doc.metadata.get("source", "Unknown")
                     context_parts.append(f"[Doc {i}] ({source}):\n{doc.page_content}")
-                    print(f"vectore-store_result:{doc.page_content}")
+                    logger.debug("vector-store result: %s", doc.page_content)
             
             if web_results:
                 context_parts.append("\n=== From Web Search ===")
                 context_parts.append(web_results)
             
             context = "\n\n".join(context_parts) if context_parts else "No context available."
-            print("llm--context",context)
-            print("doc_results--context",doc_results)
+            logger.debug("llm context: %s", context)
             # Generate response with context
-            from langchain_groq import ChatGroq
             from langchain_core.prompts import ChatPromptTemplate
-            from config.settings import settings
             
-            llm = ChatGroq(
-                model=settings.LLM_MODEL,
-                temperature=settings.LLM_TEMPERATURE,
-                api_key=settings.GROQ_API_KEY
-            )
+            llm = self._chat_llm()
             
             prompt = ChatPromptTemplate.from_template(
                 "Based on the following search results, answer the question concisely and accurately.\n\n"
@@ -135,12 +247,15 @@ class ChatInterface:
             )
             
             chain = prompt | llm
-            for chunk in chain.stream({"context": context, "question": query}):
-                yield chunk.content
+            with self.usage.begin(self.session_id, "hybrid", prompt.format(context="", question=query), context) as turn:
+                stream = chain.stream({"context": turn.context, "question": query})
+                for chunk in telemetry.trace_stream(stream, "llm"):
+                    turn.observe(chunk)
+                    yield chunk.content
         
         # Document-only search
         elif self.rag_chain:
-            for chunk in self.rag_chain.query_stream(query):
+            for chunk in self.rag_chain.query_stream(query, session_id=self.session_id):
                 yield chunk
 
 
@@ -187,25 +302,18 @@ class ChatInterface:
                 for i, doc in enumerate(doc_results, 1):
                     source = doc.metadata.get("source", "Unknown")
                     context_parts.append(f"[Doc {i}] ({source}):\n{doc.page_content}")
-                    print(f"vectore-store_result:{doc.page_content}")
+                    logger.debug("vector-store result: %s", doc.page_content)
             
             if web_results:
                 context_parts.append("\n=== From Web Search ===")
                 context_parts.append(web_results)
             
             context = "\n\n".join(context_parts) if context_parts else "No context available."
-            print("llm--context",context)
-            print("doc_results--context",doc_results)
+            logger.debug("llm context: %s", context)
             # Generate response with context
-            from langchain_groq import ChatGroq
             from langchain_core.prompts import ChatPromptTemplate
-            from config.settings import settings
             
-            llm = ChatGroq(
-                model=settings.LLM_MODEL,
-                temperature=settings.LLM_TEMPERATURE,
-                api_key=settings.GROQ_API_KEY
-            )
+            llm = self._chat_llm()
         
             
             prompt = ChatPromptTemplate.from_template(
@@ -235,12 +343,15 @@ class ChatInterface:
                 )
 
             chain = prompt | llm
-            for chunk in chain.stream({"context": context, "question": query}):
-                yield chunk.content
+            with self.usage.begin(self.session_id, "hybrid", prompt.format(context="", question=query), context) as turn:
+                stream = chain.stream({"context": turn.context, "question": query})
+                for chunk in telemetry.trace_stream(stream, "llm"):
+                    turn.observe(chunk)
+                    yield chunk.content
         
         # Document-only search
         elif self.rag_chain:
-            for chunk in self.rag_chain.query_stream_mmr(query):
+            for chunk in self.rag_chain.query_stream_mmr(query, session_id=self.session_id):
                 yield chunk
 
     
@@ -286,8 +397,7 @@ class ChatInterface:
         
         # Get semantic search sources
         if self.vector_store.is_initialized:
-            retriever = self.vector_store.get_mmr_retriever()
-            docs = retriever.invoke(query)
+            docs = self.vector_store.mmr_search(query)
             sources.extend(list(set(doc.metadata.get("source", "Unknown") for doc in docs)))
         
         # Get web search sources
@@ -344,12 +454,6 @@ class ChatInterface:
         """
         from core.agent import AgentManager
         from tools.tools_for_chat import get_all_tools
-        import secrets
-
-
-        if "thread_id" not in st.session_state:
-            # Create new thread_id and store it
-            st.session_state.thread_id = secrets.token_urlsafe(16)
 
         agentmanager = AgentManager()
         tools = get_all_tools()
@@ -358,7 +462,7 @@ class ChatInterface:
 
 
 
-        response = agentmanager.get_response_stream(query , thread_id=st.session_state.thread_id)
+        response = agentmanager.get_response_stream(query , thread_id=st.session_state.thread_id, session_id=self.session_id)
             
 
         return response
\ No newline at end of file
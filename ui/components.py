@@ -1,13 +1,25 @@
 import os 
+import secrets
 import streamlit as st
 from typing import List
-import tempfile
+from config.settings import settings
+from core.chat_history import open_history
 
     
 def init_session_state():
 
-    if 'messages' not in st.session_state :
-        st.session_state.messages = []
+    if 'thread_id' not in st.session_state:
+        # ?thread=<id> resumes a stored conversation
+        st.session_state.thread_id = st.query_params.get("thread") or secrets.token_urlsafe(16)
+
+    if 'history' not in st.session_state :
+        st.session_state.history = open_history(st.session_state.thread_id)
+
+    if 'history_shown' not in st.session_state:
+        st.session_state.history_shown = settings.CHAT_HISTORY_PAGE_SIZE
+
+    if 'history_floor' not in st.session_state:
+        st.session_state.history_floor = 0  # messages before this are hidden, not deleted
         
     if 'vector_store_initialized' not in st.session_state :
         st.session_state.vector_store_initialized = False
@@ -18,15 +30,46 @@ def init_session_state():
     if 'chat_mode' not in st.session_state:
         st.session_state.chat_mode = 'rag'  # 'rag' or 'general'
 
-def display_chat_history():
+    if 'finished_jobs' not in st.session_state:
+        st.session_state.finished_jobs = set()  # (job id, attempt) already reported
+
+def _show_earlier_messages(page_size: int, start: int):
+    st.session_state.history_floor = 0
+    st.session_state.history_shown = len(st.session_state.history) - start + page_size
+
+def display_chat_history(page_size: int = None):
+    """
+    Render the latest messages of the conversation.
+
+    Only the last ``history_shown`` messages are rendered (and read from
+    the history store); older ones are loaded a page at a time from a
+    button, so a rerun costs the same however long the thread is.
+    Messages before ``history_floor`` (set by a mode switch) are hidden
+    until that button shows them again.
 
-    for message in st.session_state.messages :
-        with st.chat_message(message['role']):
-            st.markdown(message['content'])
+    Args:
+        page_size: Messages per page (settings.CHAT_HISTORY_PAGE_SIZE)
+    """
+    page_size = page_size or settings.CHAT_HISTORY_PAGE_SIZE
+    history = st.session_state.history
+    shown = min(st.session_state.history_shown, len(history) - st.session_state.history_floor)
+    start, messages = history.window(shown)
+
+    if start > 0:
+        st.button(
+            f"⬆️ Show {min(page_size, start)} earlier messages ({start} hidden)",
+            key="show_earlier_messages",
+            on_click=_show_earlier_messages,
+            args=(page_size, start)
+        )
 
-            if message.get('sources') :
+    for message in messages :
+        with st.chat_message(message.role):
+            st.markdown(message.content)
+
+            if message.sources :
                 with st.expander("📚 Sources") :
-                    for source in message.get('sources') :
+                    for source in message.sources :
                         st.write(f"- {source}")
 
 def add_message(role: str, content: str, sources: List[str] = None):
@@ -39,22 +82,29 @@ def add_message(role: str, content: str, sources: List[str] = None):
         sources: Optional list of source documents
     """
 
-    message = {'role' :role ,"content" : content }
-
-    if sources :
-        message['sources'] = sources
-
-    st.session_state.messages.append(message)
+    st.session_state.history.append(role, content, sources)
 
 def clear_chat_history():
+    """Delete the thread's transcript, including its persisted messages."""
 
-    st.session_state.messages = []
+    st.session_state.history.clear()
+    st.session_state.history_shown = settings.CHAT_HISTORY_PAGE_SIZE
+    st.session_state.history_floor = 0
 
-def save_uploaded_file(uploaded_file):
+def reset_chat_view():
+    """Start with an empty screen; earlier messages stay stored and can be shown again."""
 
-    temp_dir = tempfile.mkdtemp()
+    st.session_state.history_floor = len(st.session_state.history)
+    st.session_state.history_shown = settings.CHAT_HISTORY_PAGE_SIZE
 
-    file_path = os.path.join(temp_dir ,uploaded_file.name)
+def save_uploaded_file(uploaded_file, directory: str):
+    """
+    Write an upload to ``directory`` (which the caller owns and cleans up).
+
+    Ingestion no longer needs this: DocumentProcessor parses uploads from
+    memory. Kept for callers that need the file on disk.
+    """
+    file_path = os.path.join(directory, os.path.basename(uploaded_file.name))
 
     with open(file_path , 'wb') as f:
         f.write(uploaded_file.getbuffer())
@@ -105,7 +155,7 @@ def display_sidebar_info():
         
         # Clear chat button (common for both)
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.messages = []
+            clear_chat_history()
             st.rerun()
 
 def display_file_uploader():
@@ -135,6 +185,118 @@ def display_processing_status(message: str, status: str = "info"):
     else:
         st.info(message)
 
+def display_ingestion_jobs(queue):
+    """
+    Show background ingestion jobs with per-file progress and ETA.
+
+    Rendered as a fragment that re-runs every second while a job is active,
+    so chatting is not blocked. When a job finishes the whole app re-runs
+    once to pick up the new documents.
+
+    Args:
+        queue: IngestionQueue to poll
+    """
+    if not queue.jobs():
+        return
+    st.fragment(run_every=1.0 if queue.active else None)(_ingestion_jobs_panel)(queue)
+
+def _ingestion_jobs_panel(queue):
+
+    icons = {"queued": "🕒", "running": "⏳", "completed": "✅", "failed": "❌", "cancelled": "🚫"}
+    newly_finished = False
+
+    for job in queue.jobs():
+        label = f"{icons.get(job['state'], '')} Job {job['id'][:8]} - {job['state']}"
+        if job['eta_seconds'] is not None:
+            label += f" (about {job['eta_seconds']:.0f}s left)"
+        st.progress(job['progress'], text=label)
+
+        for file in job['files']:
+            detail = f"{file['embedded']}/{file['chunks']} chunks embedded" if file['stage'] == "embedding" else f"{file['chunks']} chunks"
+            line = f"{file['name']}: {file['stage']} · {detail}"
+            if file['error']:
+                line += f" · {file['error']}"
+            st.caption(line)
+        if job['error']:
+            st.error(job['error'])
+
+        if job['state'] in ("queued", "running"):
+            if st.button("Cancel", key=f"cancel_{job['id']}"):
+                queue.cancel(job['id'])
+        elif job['state'] in ("failed", "cancelled"):
+            if st.button("Retry failed files", key=f"retry_{job['id']}"):
+                queue.retry(job['id'])
+                st.rerun()
+
+        finished = (job['id'], job['attempts'])
+        if job['state'] not in ("queued", "running") and finished not in st.session_state.finished_jobs:
+            st.session_state.finished_jobs.add(finished)
+            for file in job['files']:
+                if file['stage'] == "done" and file['name'] not in st.session_state.uploaded_files:
+                    st.session_state.uploaded_files.append(file['name'])
+            if any(file['stage'] == "done" for file in job['files']):
+                st.session_state.vector_store_initialized = True
+            newly_finished = True
+
+    if not queue.active and st.button("Clear finished jobs"):
+        queue.clear_finished()
+        st.rerun()
+
+    if newly_finished:
+        st.rerun()
+
+def display_readiness_status(state: str, error: str = None):
+    """
+    Display warm start readiness in the sidebar.
+
+    Args:
+        state: WarmStartManager state
+        error: Error message when the warm start failed
+    """
+    labels = {
+        "idle": "⏸️ Warm start disabled",
+        "loading_index": "⏳ Loading saved index...",
+        "warming": "🔥 Warming up models...",
+        "ready": "✅ Ready",
+    }
+    with st.sidebar:
+        if state == "failed":
+            st.warning(f"⚠️ Warm start failed: {error}")
+        else:
+            st.caption(labels.get(state, state))
+
+def display_profiling_toggle() -> bool:
+    """
+    Sidebar toggle to profile chat turns and ingest jobs while it is on.
+
+    Returns:
+        bool: True if requests should be profiled
+    """
+    with st.sidebar:
+        with st.expander("🛠️ Diagnostics"):
+            return st.checkbox(
+                "Profile requests",
+                value=False,
+                help="Writes a profile and hotspot summary of each request to the profile directory until unchecked"
+            )
+
+def display_token_usage(usage: dict):
+    """
+    Show this session's LLM token usage in the sidebar.
+
+    Args:
+        usage: ``UsageTracker.session()`` for the current session
+    """
+    if not usage.get("turns") and not usage.get("refused"):
+        return
+    with st.sidebar:
+        line = f"🔢 {usage['total_tokens']:,} tokens in {usage['turns']} turn(s)"
+        if "budget" in usage:
+            line += f" · {usage['remaining']:,} of {usage['budget']:,} left"
+        st.caption(line)
+        if usage.get("trimmed_tokens"):
+            st.caption(f"✂️ {usage['trimmed_tokens']:,} context tokens trimmed to fit the budget")
+
 def create_web_search_toggle() -> bool:
     """Create a toggle for web search."""
     return st.toggle(
@@ -143,9 +305,13 @@ def create_web_search_toggle() -> bool:
         help="When enabled, the chatbot will also search the web for answers"
     )
 
-def create_web_search_toggle_mmr() -> tuple[bool, bool]:
+def create_web_search_toggle_mmr(routing: bool = False) -> tuple[bool, bool]:
     """
     Create toggles for web search and MMR.
+
+    Args:
+        routing: Web search is chosen per query by the router, so the
+            web search toggle is shown disabled
     
     Returns:
         tuple: (use_web_search, use_mmr)
@@ -155,7 +321,11 @@ def create_web_search_toggle_mmr() -> tuple[bool, bool]:
         use_web_search = st.toggle(
             "🌐 Enable Web Search",
             value=False,
-            help="Search the web in addition to your documents"
+            disabled=routing,
+            help=(
+                "Chosen automatically for each question (QUERY_ROUTING is on)"
+                if routing else "Search the web in addition to your documents"
+            )
         )
     with col2:
         use_mmr = st.toggle(
@@ -192,6 +362,6 @@ def display_mode_switcher():
     # Switch button
     if st.button(button_text, use_container_width=True, type="primary"):
         st.session_state.chat_mode = switch_to
-        st.session_state.messages = []
+        reset_chat_view()
         st.rerun()
 